@@ -0,0 +1,69 @@
+"""Compare the memory held by a DiagramDef and its CompactGraph.
+
+    python benchmarks/compact_memory.py [--services 100000]
+
+Each representation is built while tracemalloc is running, and the script
+reports the bytes still allocated once the build returns.
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+
+from awsdiagram.graph import CompactGraph
+from awsdiagram.models import ConnectionDef, DiagramDef, GroupDef, ServiceDef
+
+TYPES = ["compute.EC2", "compute.Lambda", "database.RDS", "network.ELB", "storage.S3"]
+
+
+def synthetic(services: int, seed: int = 0) -> DiagramDef:
+    rng = random.Random(seed)
+    sids = [f"svc-{i}" for i in range(services)]
+    per_group = 50
+    groups = [
+        GroupDef(name=f"Subnet {g}", services=sids[g : g + per_group])
+        for g in range(0, services, per_group)
+    ]
+    return DiagramDef(
+        name="Synthetic",
+        services={sid: ServiceDef(type=rng.choice(TYPES), label=f"Service {sid}") for sid in sids},
+        groups=[GroupDef(name="VPC", children=groups)],
+        connections=[
+            ConnectionDef(from_=rng.choice(sids), to=rng.choice(sids), label="tcp")
+            for _ in range(services * 2)
+        ],
+    )
+
+
+def retained(build) -> tuple[object, int]:
+    """Build an object under tracemalloc; return it and the bytes it retains."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--services", type=int, default=100_000)
+    args = parser.parse_args()
+
+    diagram, full = retained(lambda: synthetic(args.services))
+    graph, compact = retained(lambda: CompactGraph.from_diagram(diagram))
+    # The compact graph shares the ID and label strings with the DiagramDef it
+    # came from; count them too so the figure is what a worker would hold alone.
+    strings = sum(len(s) + 49 for s in graph.ids) + sum(len(s) + 49 for s in graph.labels)
+
+    print(f"services:      {args.services:,}")
+    print(f"DiagramDef:    {full / 2**20:8.1f} MiB")
+    print(f"CompactGraph:  {(compact + strings) / 2**20:8.1f} MiB")
+    print(f"reduction:     {full / (compact + strings):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
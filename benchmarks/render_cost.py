@@ -0,0 +1,102 @@
+"""Calibrate the render-cost model in awsdiagram.stats.
+
+Times ``dot -Tpng`` on synthetic diagrams of increasing size and fits the
+TIME_COEFFICIENTS and MEMORY_COEFFICIENTS used by ``awsdiagram stats``
+and stats.fit_cost. Needs Graphviz on PATH. Run from the repository root:
+
+    python benchmarks/render_cost.py [--sizes 50,100,200,400,800]
+
+Peak memory is read from RUSAGE_CHILDREN, which only ever grows, so sizes
+are run smallest first and each sample is one process's high-water mark.
+"""
+
+import argparse
+import random
+import resource
+import subprocess
+import sys
+import time
+
+from awsdiagram.models import ConnectionDef, DiagramDef, GroupDef, ServiceDef
+from awsdiagram.renderer import to_dot
+from awsdiagram.stats import compute_stats
+
+TYPES = ["compute.EC2", "compute.Lambda", "database.RDS", "network.ELB", "storage.S3"]
+
+
+def synthetic(nodes: int, groups: int, edge_ratio: float, seed: int) -> DiagramDef:
+    rng = random.Random(seed)
+    sids = [f"s{i}" for i in range(nodes)]
+    services = {sid: ServiceDef(type=rng.choice(TYPES), label=sid) for sid in sids}
+    buckets: list[list[str]] = [[] for _ in range(groups)]
+    for sid in sids:
+        if groups and rng.random() < 0.8:
+            buckets[rng.randrange(groups)].append(sid)
+    connections = [
+        ConnectionDef(from_=rng.choice(sids), to=rng.choice(sids))
+        for _ in range(int(nodes * edge_ratio))
+    ]
+    return DiagramDef(
+        name=f"bench-{nodes}-{groups}",
+        services=services,
+        groups=[GroupDef(name=f"g{i}", services=b) for i, b in enumerate(buckets) if b],
+        connections=connections,
+    )
+
+
+def measure(diagram: DiagramDef) -> tuple[float, float]:
+    source = to_dot(diagram)
+    start = time.perf_counter()
+    subprocess.run(["dot", "-Tpng", "-o", "/dev/null"], input=source, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    maxrss_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return elapsed, maxrss_kb / 1024
+
+
+def least_squares(rows: list[list[float]], ys: list[float]) -> list[float]:
+    """Solve the normal equations with Gaussian elimination; no numpy needed."""
+    k = len(rows[0])
+    a = [[sum(r[i] * r[j] for r in rows) for j in range(k)] for i in range(k)]
+    b = [sum(r[i] * y for r, y in zip(rows, ys)) for i in range(k)]
+    for col in range(k):
+        pivot = max(range(col, k), key=lambda r: abs(a[r][col]))
+        a[col], a[pivot] = a[pivot], a[col]
+        b[col], b[pivot] = b[pivot], b[col]
+        for r in range(col + 1, k):
+            f = a[r][col] / a[col][col]
+            a[r] = [x - f * y for x, y in zip(a[r], a[col])]
+            b[r] -= f * b[col]
+    x = [0.0] * k
+    for r in range(k - 1, -1, -1):
+        x[r] = (b[r] - sum(a[r][c] * x[c] for c in range(r + 1, k))) / a[r][r]
+    return x
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="50,100,200,400,800")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    time_rows, times, mem_rows, mems = [], [], [], []
+    for nodes in sorted(int(s) for s in args.sizes.split(",")):
+        for groups, edge_ratio in ((0, 1.0), (nodes // 20 or 1, 1.5), (nodes // 10 or 1, 2.0)):
+            diagram = synthetic(nodes, groups, edge_ratio, args.seed)
+            stats = compute_stats(diagram)
+            elapsed, peak_mb = measure(diagram)
+            n, e, x = stats.services, stats.edges, stats.cross_cluster_edges
+            time_rows.append([1.0, n, e, n * x])
+            times.append(elapsed)
+            mem_rows.append([1.0, n, e])
+            mems.append(peak_mb)
+            print(f"{n:>6} nodes {e:>6} edges {x:>6} cross  {elapsed:8.2f}s {peak_mb:8.1f} MB",
+                  file=sys.stderr)
+
+    t = least_squares(time_rows, times)
+    m = least_squares(mem_rows, mems)
+    print("TIME_COEFFICIENTS = (" + ", ".join(f"{c:.3g}" for c in t) + ")")
+    print("MEMORY_COEFFICIENTS = (" + ", ".join(f"{c:.3g}" for c in m) + ")")
+
+
+if __name__ == "__main__":
+    main()
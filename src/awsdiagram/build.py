@@ -0,0 +1,251 @@
+"""Incremental, make-style rendering of a whole tree of diagram sources.
+
+A manifest in the output directory records, for every source, a key hashed
+from the source content, the included fragments, the render options and the
+awsdiagram version, plus the outputs it produced. A run rebuilds only the
+sources whose key changed, then deletes outputs nobody produces any more.
+
+Outputs are named after the source without its suffix, so sources that
+differ only in suffix (``app.yaml`` and ``app.tfplan.json``) would write the
+same files. Such sources fail instead of overwriting each other.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from . import __version__
+from .errors import AwsDiagramError
+from .formats import EXPORT_FORMATS, YAML_SUFFIXES
+from .models import DiagramDef
+from .parser import load_yaml_documents_string, parse_all_string, parse_string, read_text
+from .pipeline import RenderOptions, apply_views, default_output, render_view, unique_name
+
+MANIFEST_NAME = ".awsdiagram-manifest.json"
+TERRAFORM_SUFFIXES = (".tfplan.json", ".tfstate.json", ".tfstate")
+
+
+class BuildReport(BaseModel):
+    """What a build did, by source path relative to the source directory."""
+
+    built: list[str] = []
+    skipped: list[str] = []
+    removed: list[str] = []
+    failed: dict[str, str] = {}
+
+
+def build(
+    src_dir: str | Path,
+    out_dir: str | Path,
+    options: RenderOptions,
+    jobs: int | None = None,
+    force: bool = False,
+) -> BuildReport:
+    """Render every stale source under ``src_dir`` into ``out_dir``.
+
+    ``force`` rebuilds every source; outputs of deleted sources are still
+    removed.
+    """
+    src_dir, out_dir = Path(src_dir), Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / MANIFEST_NAME
+    old_entries = _load_manifest(manifest_path)
+    options_hash = _hash_json(
+        {"version": __version__, "options": options.model_dump(exclude={"jobs"})}
+    )
+
+    report = BuildReport()
+    entries: dict[str, dict] = {}
+    stale: list[str] = []
+    sources = [s.relative_to(src_dir).as_posix() for s in discover_sources(src_dir, exclude=out_dir)]
+    claimed: dict[str, list[str]] = {}
+    for rel in sources:
+        claimed.setdefault(_output_stem(rel), []).append(rel)
+    for rel in sources:
+        source = src_dir / rel
+        rivals = [other for other in claimed[_output_stem(rel)] if other != rel]
+        if rivals:
+            report.failed[rel] = (
+                f"Output name '{_output_stem(rel)}' is also used by {', '.join(rivals)}; rename one of them"
+            )
+            if rel in old_entries:
+                entries[rel] = {**old_entries[rel], "key": None}
+            continue
+        old = old_entries.get(rel)
+        if not force and old is not None and _is_fresh(old, source, out_dir, options_hash):
+            entries[rel] = old
+            report.skipped.append(rel)
+        else:
+            stale.append(rel)
+
+    def _build_one(rel: str) -> tuple[str, dict | None, str | None]:
+        try:
+            return rel, _build_source(src_dir, rel, out_dir, options, options_hash), None
+        except AwsDiagramError as e:
+            return rel, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        for rel, entry, error in pool.map(_build_one, stale):
+            if entry is None:
+                report.failed[rel] = error
+                # Keep the previous outputs around until the source is fixed.
+                if rel in old_entries:
+                    entries[rel] = {**old_entries[rel], "key": None}
+            else:
+                entries[rel] = entry
+                report.built.append(rel)
+
+    produced = {out for entry in entries.values() for out in entry["outputs"]}
+    for entry in old_entries.values():
+        for out in entry["outputs"]:
+            if out not in produced:
+                (out_dir / out).unlink(missing_ok=True)
+                report.removed.append(out)
+
+    _write_manifest(manifest_path, entries)
+    return report
+
+
+def discover_sources(src_dir: Path, exclude: Path | None = None) -> list[Path]:
+    """Diagram YAML and Terraform JSON files under ``src_dir``, sorted.
+
+    Anything under ``exclude`` (the output directory, when it sits inside the
+    source tree) is skipped.
+    """
+    excluded = exclude.resolve() if exclude is not None else None
+    return sorted(
+        p
+        for p in src_dir.rglob("*")
+        if p.is_file()
+        and (p.suffix in YAML_SUFFIXES or p.name.endswith(TERRAFORM_SUFFIXES))
+        and (excluded is None or not p.resolve().is_relative_to(excluded))
+    )
+
+
+def _build_source(
+    src_dir: Path, rel: str, out_dir: Path, options: RenderOptions, options_hash: str
+) -> dict:
+    source = src_dir / rel
+    text = read_text(source)
+    included: list[Path] = []
+
+    stem = Path(_output_stem(rel)).name
+    if source.name.endswith(TERRAFORM_SUFFIXES):
+        from .terraform.importer import import_terraform
+
+        diagrams = [parse_string(import_terraform(source), str(source))]
+    else:
+        documents = load_yaml_documents_string(text, str(source))
+        if not any("diagram" in d or "diagrams" in d for d in documents):
+            # An include: fragment; tracked so edits to it are noticed, never rendered.
+            diagrams = []
+        else:
+            diagrams = parse_all_string(text, str(source), included)
+
+    target_dir = out_dir / Path(rel).parent
+    if len(diagrams) > 1:
+        target_dir = target_dir / stem
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    outputs = []
+    taken: set[str] = set()
+    for diagram in diagrams:
+        if len(diagrams) == 1:
+            name = f"{stem}.{_extension(options.outformat)}"
+        else:
+            # Views that share a name get a numeric suffix, as in render_many.
+            name = unique_name(_output_name(diagram, options.outformat), taken)
+        output = target_dir / name
+        _render(diagram, output, options)
+        outputs.append(output.relative_to(out_dir).as_posix())
+
+    deps = {str(p): _hash_file(p) for p in included}
+    return {
+        "key": _entry_key(options_hash, _hash_text(text), deps),
+        "deps": deps,
+        "outputs": outputs,
+    }
+
+
+def _output_stem(rel: str) -> str:
+    """The source path without its suffix, which every output is named after."""
+    path = Path(rel)
+    if path.name.endswith(TERRAFORM_SUFFIXES):
+        return path.with_name(path.name.split(".", 1)[0]).as_posix()
+    return path.with_suffix("").as_posix()
+
+
+def _render(diagram: DiagramDef, output: Path, options: RenderOptions) -> None:
+    if options.outformat in EXPORT_FORMATS:
+        from .exporters import export_file
+
+        export_file(apply_views(diagram, options), output, options.outformat)
+    else:
+        render_view(diagram, str(output), options)
+
+
+def _extension(outformat: str) -> str:
+    return {"mermaid": "mmd"}.get(outformat, outformat)
+
+
+def _output_name(diagram: DiagramDef, outformat: str) -> str:
+    stem = default_output(diagram, outformat).rsplit(".", 1)[0]
+    return f"{stem}.{_extension(outformat)}"
+
+
+def _is_fresh(entry: dict, source: Path, out_dir: Path, options_hash: str) -> bool:
+    if entry.get("key") is None:
+        return False
+    try:
+        source_hash = _hash_text(read_text(source))
+        deps = {path: _hash_file(Path(path)) for path in entry.get("deps", {})}
+    except (AwsDiagramError, OSError):
+        return False
+    if _entry_key(options_hash, source_hash, deps) != entry["key"]:
+        return False
+    return all((out_dir / out).exists() for out in entry["outputs"])
+
+
+def _entry_key(options_hash: str, source_hash: str, deps: dict[str, str]) -> str:
+    return _hash_json({"options": options_hash, "source": source_hash, "deps": deps})
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _hash_file(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def _hash_json(data: object) -> str:
+    return _hash_text(json.dumps(data, sort_keys=True))
+
+
+def _load_manifest(path: Path) -> dict[str, dict]:
+    """Read the previous manifest; a missing or unreadable one means rebuild all."""
+    try:
+        data = json.loads(path.read_text())
+        entries = data["entries"]
+        if not isinstance(entries, dict):
+            return {}
+        return {
+            rel: entry
+            for rel, entry in entries.items()
+            if isinstance(entry, dict) and isinstance(entry.get("outputs"), list)
+        }
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def _write_manifest(path: Path, entries: dict[str, dict]) -> None:
+    data = {"version": __version__, "entries": dict(sorted(entries.items()))}
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
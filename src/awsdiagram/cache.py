@@ -0,0 +1,171 @@
+"""Persistent on-disk cache of validated DiagramDefs.
+
+Entries are keyed by file path, content hash and awsdiagram/pydantic
+versions, so an edit or an upgrade simply misses; entries also record the
+mtimes of any include: fragments and miss when one changes. Values are
+DiagramDef lists stored as JSON, which load without re-running YAML parsing.
+They are validated again on load. The default directory sits in the working
+tree, where a checkout can plant entries, so entries are plain data and never
+executable.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import pydantic
+from pydantic import TypeAdapter
+
+from . import __version__
+from .metrics import inc
+from .models import DiagramDef
+from .parser import parse_all_string, read_text
+
+DEFAULT_CACHE_DIR = ".awsdiagram-cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_SUFFIX = ".json"
+# Bump when the stored models change shape so old entries simply miss.
+_FORMAT = 3
+_DIAGRAMS = TypeAdapter(list[DiagramDef])
+
+
+class ParseCache:
+    """File-keyed cache of parse results with a bounded total size."""
+
+    def __init__(self, directory: str | Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory) / "parse"
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(path: str | Path, text: str) -> str:
+        h = hashlib.sha256()
+        h.update(f"{_FORMAT}\0{__version__}\0{pydantic.VERSION}\0{Path(path).resolve()}\0".encode())
+        h.update(text.encode())
+        return h.hexdigest()
+
+    def get(self, key: str) -> list[DiagramDef] | None:
+        """Return the cached diagrams, or None on a miss or unreadable entry."""
+        entry = self.directory / (key + _SUFFIX)
+        try:
+            with open(entry, "rb") as f:
+                payload = json.load(f)
+            deps = {str(p): int(mtime) for p, mtime in payload["deps"].items()}
+            diagrams = _DIAGRAMS.validate_python(payload["diagrams"])
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Truncated or foreign entries are dropped and treated as a miss.
+            entry.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        if not _deps_unchanged(deps):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            os.utime(entry)  # keep recently used entries out of pruning
+        except OSError:
+            pass
+        return diagrams
+
+    def put(self, key: str, diagrams: list[DiagramDef], deps: list[Path] = ()) -> None:
+        """Store diagrams atomically; cache write failures are ignored.
+
+        ``deps`` are the include: fragments the diagrams were built from.
+        """
+        try:
+            payload = {
+                "deps": {str(p): os.stat(p).st_mtime_ns for p in deps},
+                "diagrams": _DIAGRAMS.dump_python(diagrams, mode="json"),
+            }
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(payload, f, separators=(",", ":"))
+            size = os.path.getsize(tmp)
+            os.replace(tmp, self.directory / (key + _SUFFIX))
+        except OSError:
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += size
+            if self._size > self.max_bytes:
+                self._prune()
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            entry.unlink(missing_ok=True)
+        self._size = 0
+
+    def _entries(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        return [p for p in self.directory.iterdir() if p.suffix == _SUFFIX]
+
+    def _scan_size(self) -> int:
+        total = 0
+        for entry in self._entries():
+            try:
+                total += entry.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _prune(self) -> None:
+        """Delete least recently used entries until under 90% of the limit."""
+        stats = []
+        for entry in self._entries():
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            stats.append((st.st_mtime, st.st_size, entry))
+        stats.sort()
+
+        total = sum(size for _, size, _ in stats)
+        target = self.max_bytes * 0.9
+        for _, size, entry in stats:
+            if total <= target:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+        self._size = total
+
+
+def parse_cached(path: str | Path, cache: ParseCache | None = None) -> list[DiagramDef]:
+    """parse_all() that consults ``cache`` first. Failures are never cached."""
+    text = read_text(path)
+    if cache is None:
+        return parse_all_string(text, str(path))
+
+    key = cache.key(path, text)
+    diagrams = cache.get(key)
+    inc("awsdiagram_cache_requests", cache="parse", result="miss" if diagrams is None else "hit")
+    if diagrams is None:
+        included: list[Path] = []
+        diagrams = parse_all_string(text, str(path), included)
+        cache.put(key, diagrams, included)
+    return diagrams
+
+
+def _deps_unchanged(deps: dict[str, int]) -> bool:
+    for path, mtime in deps.items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
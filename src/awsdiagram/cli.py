@@ -1,31 +1,117 @@
-"""Click CLI: render, validate, import."""
+"""Click CLI: render, export, build, validate, stats, import, serve-http."""
 
+import json
 import sys
+from collections import Counter
+from pathlib import Path
 
 import click
 
 from .errors import AwsDiagramError
-from .parser import parse
-from .renderer import render as render_diagram
-from .resolver import validate_all_types
+from .cache import DEFAULT_CACHE_DIR, ParseCache, parse_cached
+from .metrics import METRICS_FORMATS, REGISTRY
+from .models import DiagramDef
+from .pipeline import RenderOptions, apply_views, default_output, render_many, render_view, unique_name
+from .formats import EXPORT_FORMATS, INTERACTIVE_FORMATS, OUTPUT_FORMATS
+from .quality import DEFAULT_QUALITY, QUALITIES
+from .validation import REPORT_FORMATS, expand_inputs, format_report, validate_files
 
 
 @click.group()
-def main() -> None:
+@click.option("--cache-dir", default=DEFAULT_CACHE_DIR, show_default=True, envvar="AWSDIAGRAM_CACHE_DIR", help="Directory for the parse cache")
+@click.option("--no-cache", is_flag=True, help="Always re-parse and re-validate input files")
+@click.option("--metrics-file", default=None, type=click.Path(dir_okay=False), envvar="AWSDIAGRAM_METRICS_FILE", help="Write stage timings, sizes, cache and Graphviz counters here when the command exits")
+@click.option("--metrics-format", type=click.Choice(METRICS_FORMATS), default="openmetrics", show_default=True, envvar="AWSDIAGRAM_METRICS_FORMAT", help="openmetrics/prometheus replace the file (use prometheus for node_exporter's textfile collector); jsonl appends one line per job")
+@click.pass_context
+def main(
+    ctx: click.Context, cache_dir: str, no_cache: bool, metrics_file: str | None, metrics_format: str
+) -> None:
     """awsdiagram - Generate AWS architecture diagrams from YAML."""
+    ctx.obj = {"cache": None if no_cache else ParseCache(cache_dir)}
+    if metrics_file:
+        job = ctx.invoked_subcommand or "awsdiagram"
+        ctx.call_on_close(lambda: _write_metrics(metrics_file, metrics_format, job))
+
+
+def _write_metrics(path: str, fmt: str, job: str) -> None:
+    """Runs when the command exits, after failures too, so those are counted."""
+    try:
+        REGISTRY.write(path, fmt, job)
+    except AwsDiagramError as e:
+        click.echo(f"Warning: {e}", err=True)
+
+
+def _parse(file: str) -> list[DiagramDef]:
+    """Parse a diagram file through the parse cache selected on the command line."""
+    return parse_cached(file, click.get_current_context().find_root().obj["cache"])
 
 
 @main.command()
 @click.argument("file", type=click.Path(exists=True))
-@click.option("-o", "--output", default=None, help="Output PNG path (default: <diagram-name>.png)")
-def render(file: str, output: str | None) -> None:
-    """Render a YAML diagram definition to PNG."""
+@click.option("-o", "--output", default=None, help="Output path, or directory for multi-diagram files (default: <diagram-name>.<format>)")
+@click.option("-f", "--format", "outformat", type=click.Choice(OUTPUT_FORMATS + INTERACTIVE_FORMATS), default="png", show_default=True, help="Output format; html is an interactive page whose groups expand on click")
+@click.option("--optimize-svg", is_flag=True, help="Share icons as SVG symbols and trim redundant markup")
+@click.option("--inline-icons", is_flag=True, help="Embed icons in the optimized SVG (implies --optimize-svg)")
+@click.option("--focus", default=None, help="Render only the neighborhood of these service IDs (comma-separated)")
+@click.option("--radius", default=1, show_default=True, type=click.IntRange(min=0), help="Hops around --focus to include")
+@click.option("--max-depth", default=None, type=click.IntRange(min=0), help="Collapse groups nested deeper than this into summary nodes (with -f html: group levels laid out up front, default 1)")
+@click.option("--pack", is_flag=True, help="Lay out disconnected components in parallel and pack them with gvpack")
+@click.option("-j", "--jobs", default=None, type=click.IntRange(min=1), help="Parallel layout processes (default: CPU count)")
+@click.option("--original-icons", is_flag=True, help="Use the full-size diagrams icons instead of pre-scaled cached copies")
+@click.option("--tiles", default=None, type=click.IntRange(min=1), help="Lay out once, then draw an N x N grid of PNG tiles in parallel with an HTML viewer")
+@click.option("--quality", type=click.Choice(QUALITIES), default=DEFAULT_QUALITY, show_default=True, help="draft: straight edges, capped layout effort, low DPI, no icons; normal: polyline edges with icons")
+def render(
+    file: str,
+    output: str | None,
+    outformat: str,
+    optimize_svg: bool,
+    inline_icons: bool,
+    focus: str | None,
+    radius: int,
+    max_depth: int | None,
+    pack: bool,
+    jobs: int | None,
+    original_icons: bool,
+    tiles: int | None,
+    quality: str,
+) -> None:
+    """Render a YAML diagram definition to PNG or SVG.
+
+    Files holding several diagrams (multi-document YAML or a 'diagrams:'
+    list) render every diagram in parallel into the --output directory.
+
+    With --tiles, --output names the tile directory (default:
+    <diagram-name>-tiles) holding the tiles, tiles.json and index.html.
+    """
+    if (optimize_svg or inline_icons) and outformat != "svg":
+        raise click.BadParameter("requires --format svg", param_hint="--optimize-svg")
+    if pack and outformat == "html":
+        raise click.BadParameter("cannot be combined with --format html", param_hint="--pack")
+    if tiles is not None and (outformat != "png" or pack):
+        raise click.BadParameter("requires --format png and cannot be combined with --pack", param_hint="--tiles")
+    options = RenderOptions(
+        outformat=outformat,
+        focus=[sid.strip() for sid in focus.split(",")] if focus else [],
+        radius=radius,
+        max_depth=max_depth,
+        pack=pack,
+        jobs=jobs,
+        optimize_svg=optimize_svg,
+        inline_icons=inline_icons,
+        scale_icons=not original_icons,
+        tiles=tiles,
+        quality=quality,
+    )
     try:
-        diagram = parse(file)
-        if output is None:
-            output = diagram.name.lower().replace(" ", "-") + ".png"
-        result = render_diagram(diagram, output)
-        click.echo(f"Rendered: {result}")
+        diagrams = _parse(file)
+        if len(diagrams) == 1:
+            diagram = diagrams[0]
+            default = default_output(diagram, outformat, tiles is not None)
+            results = [render_view(diagram, output or default, options)]
+        else:
+            results = render_many(diagrams, output or ".", options, jobs)
+        for result in results:
+            click.echo(f"Rendered: {result}")
     except AwsDiagramError as e:
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
@@ -33,17 +119,148 @@ def render(file: str, output: str | None) -> None:
 
 @main.command()
 @click.argument("file", type=click.Path(exists=True))
-def validate(file: str) -> None:
-    """Validate a YAML diagram definition without rendering."""
+@click.option("-f", "--format", "fmt", type=click.Choice(EXPORT_FORMATS), required=True, help="Export format")
+@click.option("-o", "--output", default=None, help="Output path, or directory for multi-diagram files (default: <diagram-name>.<ext>)")
+@click.option("--focus", default=None, help="Export only the neighborhood of these service IDs (comma-separated)")
+@click.option("--radius", default=1, show_default=True, type=click.IntRange(min=0), help="Hops around --focus to include")
+@click.option("--max-depth", default=None, type=click.IntRange(min=0), help="Collapse groups nested deeper than this into summary nodes")
+def export(
+    file: str,
+    fmt: str,
+    output: str | None,
+    focus: str | None,
+    radius: int,
+    max_depth: int | None,
+) -> None:
+    """Export to Mermaid, draw.io or JSON without Graphviz."""
+    from .exporters import default_export_output, export_file
+
+    options = RenderOptions(
+        focus=[sid.strip() for sid in focus.split(",")] if focus else [],
+        radius=radius,
+        max_depth=max_depth,
+    )
     try:
-        diagram = parse(file)
-        validate_all_types(diagram.services)
-        click.echo(f"Valid: {file}")
+        diagrams = _parse(file)
+        if len(diagrams) == 1:
+            outputs = [output or default_export_output(diagrams[0], fmt)]
+        else:
+            out_dir = Path(output or ".")
+            out_dir.mkdir(parents=True, exist_ok=True)
+            taken: set[str] = set()
+            outputs = [str(out_dir / unique_name(default_export_output(d, fmt), taken)) for d in diagrams]
+        for diagram, out in zip(diagrams, outputs):
+            result = export_file(apply_views(diagram, options), out, fmt)
+            click.echo(f"Exported: {result}")
     except AwsDiagramError as e:
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
 
 
+@main.command()
+@click.argument("src_dir", type=click.Path(exists=True, file_okay=False))
+@click.option("-o", "--output", "out_dir", required=True, type=click.Path(file_okay=False), help="Output directory")
+@click.option("-f", "--format", "outformat", type=click.Choice(OUTPUT_FORMATS + EXPORT_FORMATS), default="png", show_default=True, help="Output format")
+@click.option("--max-depth", default=None, type=click.IntRange(min=0), help="Collapse groups nested deeper than this into summary nodes")
+@click.option("--optimize-svg", is_flag=True, help="Share icons as SVG symbols and trim redundant markup")
+@click.option("--pack", is_flag=True, help="Lay out disconnected components in parallel and pack them with gvpack")
+@click.option("-j", "--jobs", default=None, type=click.IntRange(min=1), help="Sources rendered in parallel (default: CPU count)")
+@click.option("--force", is_flag=True, help="Ignore the manifest and rebuild everything")
+@click.option("--quality", type=click.Choice(QUALITIES), default=DEFAULT_QUALITY, show_default=True, help="Render quality preset (see render --quality)")
+def build(
+    src_dir: str,
+    out_dir: str,
+    outformat: str,
+    max_depth: int | None,
+    optimize_svg: bool,
+    pack: bool,
+    jobs: int | None,
+    force: bool,
+    quality: str,
+) -> None:
+    """Render a tree of diagrams, rebuilding only what changed."""
+    from .build import build as run_build
+
+    if optimize_svg and outformat != "svg":
+        raise click.BadParameter("requires --format svg", param_hint="--optimize-svg")
+    options = RenderOptions(
+        outformat=outformat, max_depth=max_depth, optimize_svg=optimize_svg, pack=pack, quality=quality
+    )
+    report = run_build(src_dir, out_dir, options, jobs, force)
+    for rel in report.built:
+        click.echo(f"Built: {rel}")
+    for rel in report.removed:
+        click.echo(f"Removed: {rel}")
+    for rel, error in report.failed.items():
+        click.echo(f"Error: {rel}: {error}", err=True)
+    click.echo(
+        f"{len(report.built)} built, {len(report.skipped)} up to date, "
+        f"{len(report.removed)} removed, {len(report.failed)} failed"
+    )
+    if report.failed:
+        sys.exit(1)
+
+
+@main.command()
+@click.argument("inputs", nargs=-1, required=True)
+@click.option("-f", "--format", "report_format", type=click.Choice(REPORT_FORMATS), default="text", show_default=True, help="Report format")
+@click.option("-j", "--jobs", default=None, type=click.IntRange(min=1), help="Files validated in parallel (default: CPU count)")
+def validate(inputs: tuple[str, ...], report_format: str, jobs: int | None) -> None:
+    """Validate YAML diagram definitions without rendering.
+
+    INPUTS are files, directories (searched recursively for .yaml/.yml)
+    or glob patterns. Every problem in every file is reported, and the
+    exit status is 1 if any file is invalid.
+    """
+    try:
+        files = expand_inputs(list(inputs))
+    except AwsDiagramError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    results = validate_files(files, click.get_current_context().find_root().obj["cache"], jobs)
+    click.echo(format_report(results, report_format))
+    if any(r.issues for r in results):
+        sys.exit(1)
+
+
+@main.command()
+@click.argument("file", type=click.Path(exists=True))
+@click.option("--json", "as_json", is_flag=True, help="Print the metrics as JSON")
+def stats(file: str, as_json: bool) -> None:
+    """Report complexity metrics and the predicted render cost."""
+    from .stats import compute_stats
+
+    try:
+        results = [compute_stats(diagram) for diagram in _parse(file)]
+    except AwsDiagramError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    if as_json:
+        click.echo(json.dumps([r.model_dump() for r in results], indent=2))
+        return
+    for r in results:
+        click.echo(f"Diagram: {r.name}")
+        rows = [
+            ("Services", r.services),
+            ("Connections", r.edges),
+            ("Clusters", r.clusters),
+            ("Max group depth", r.max_depth),
+            ("Max fan-in", _with_service(r.max_fan_in, r.max_fan_in_service)),
+            ("Max fan-out", _with_service(r.max_fan_out, r.max_fan_out_service)),
+            ("Cross-cluster edges", r.cross_cluster_edges),
+            ("Components", r.components),
+            ("Predicted render", f"~{r.estimate.seconds:.1f} s, ~{r.estimate.memory_mb:.0f} MB (uncalibrated)"),
+        ]
+        for label, value in rows:
+            click.echo(f"  {label + ':':<21}{value}")
+
+
+def _with_service(count: int, sid: str | None) -> str:
+    return f"{count} ({sid})" if sid else str(count)
+
+
 @main.group(name="import")
 def import_group() -> None:
     """Import infrastructure definitions from external tools."""
@@ -52,15 +269,90 @@ def import_group() -> None:
 @import_group.command()
 @click.argument("file", type=click.Path(exists=True))
 @click.option("-o", "--output", default="infra.yaml", help="Output YAML path")
-def terraform(file: str, output: str) -> None:
-    """Import a Terraform JSON plan/state into YAML DSL."""
+@click.option("--mappings", "mapping_files", multiple=True, type=click.Path(exists=True, dir_okay=False), envvar="AWSDIAGRAM_TF_MAPPINGS", help="Extra type-mapping rules merged over the built-in ones (repeatable)")
+@click.option("--report-unmapped", is_flag=True, help="Print how many resources of each unmapped type were dropped")
+@click.option("--incremental", is_flag=True, help="Keep service IDs stable across imports and patch the existing output in place")
+@click.option("--changes", is_flag=True, help="Diagram only what a plan changes, styled by action (for PR previews)")
+@click.option("--radius", default=1, show_default=True, type=click.IntRange(min=0), help="With --changes, hops of unchanged neighbours to keep for context")
+def terraform(
+    file: str,
+    output: str,
+    mapping_files: tuple[str, ...],
+    report_unmapped: bool,
+    incremental: bool,
+    changes: bool,
+    radius: int,
+) -> None:
+    """Import a Terraform JSON plan/state into YAML DSL.
+
+    With --incremental, an address-to-ID map is kept next to the output
+    (infra.yaml -> infra.tfids.json); later imports reuse its IDs and only
+    rewrite the services whose resources changed.
+
+    With --changes, FILE must be 'terraform show -json <planfile>' output;
+    only created, updated, replaced and destroyed resources are kept, plus
+    unchanged resources within --radius references of them.
+    """
+    if changes and incremental:
+        raise click.UsageError("--changes cannot be combined with --incremental")
+
+    from .terraform.changes import import_terraform_changes
     from .terraform.importer import import_terraform
+    from .terraform.incremental import reimport_terraform
+    from .terraform.rules import build_mapper
 
+    unmapped: Counter = Counter()
     try:
-        yaml_content = import_terraform(file)
+        mapper = build_mapper(list(mapping_files))
+        if incremental:
+            report = reimport_terraform(file, output, mapper, unmapped)
+            click.echo(
+                f"Imported: {output} ({report.added} added, {report.updated} updated, "
+                f"{report.removed} removed, {report.unchanged} unchanged)"
+            )
+            return
+        if changes:
+            yaml_content = import_terraform_changes(file, radius, mapper, unmapped)
+        else:
+            yaml_content = import_terraform(file, mapper, unmapped)
         with open(output, "w") as f:
             f.write(yaml_content)
         click.echo(f"Imported: {output}")
     except AwsDiagramError as e:
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
+    finally:
+        if report_unmapped:
+            _report_unmapped(unmapped)
+
+
+def _report_unmapped(unmapped: Counter) -> None:
+    if not unmapped:
+        click.echo("All resource types are mapped.", err=True)
+        return
+    total = sum(unmapped.values())
+    click.echo(f"Dropped {total} resource(s) of {len(unmapped)} unmapped type(s):", err=True)
+    for res_type, count in sorted(unmapped.items(), key=lambda item: (-item[1], item[0])):
+        click.echo(f"  {count:>7}  {res_type}", err=True)
+
+
+@main.command(name="serve-http")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Interface to bind")
+@click.option("--port", default=8080, show_default=True, type=int, help="Port to listen on (0 picks a free port)")
+@click.option("--workers", default=4, show_default=True, type=click.IntRange(min=1), help="Concurrent renders")
+@click.option("--queue-size", default=16, show_default=True, type=click.IntRange(min=0), help="Renders allowed to wait for a worker")
+@click.option("--cache-size", default=128, show_default=True, type=click.IntRange(min=0), help="Rendered outputs kept in the LRU cache")
+@click.option("-v", "--verbose", is_flag=True, help="Log every request")
+def serve_http(host: str, port: int, workers: int, queue_size: int, cache_size: int, verbose: bool) -> None:
+    """Serve renders over HTTP: POST /render, GET /health, GET /metrics."""
+    from .server import make_server
+
+    server = make_server(host, port, workers, queue_size, cache_size, verbose)
+    bound_host, bound_port = server.server_address[:2]
+    click.echo(f"Serving on http://{bound_host}:{bound_port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -31,3 +31,19 @@ class RenderError(AwsDiagramError):
 
 class TerraformImportError(AwsDiagramError):
     """Failed to import a Terraform plan or state file."""
+
+
+class ServiceBusyError(AwsDiagramError):
+    """The render service has no free worker slots for another request."""
+
+
+class IncludeError(AwsDiagramError):
+    """An include: reference is missing, cyclic, or redefines a service."""
+
+
+class CostLimitError(AwsDiagramError):
+    """A diagram's predicted render cost exceeds the allowed budget."""
+
+
+class MetricsError(AwsDiagramError):
+    """Metrics could not be recorded or written."""
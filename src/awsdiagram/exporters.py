@@ -0,0 +1,233 @@
+"""Layout-free exporters: Mermaid flowcharts, draw.io XML and a JSON graph.
+
+These write straight from a DiagramDef and never touch Graphviz or the
+diagrams library, so they take milliseconds even for large diagrams.
+"""
+
+import json
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from .errors import RenderError
+from .formats import EXPORT_FORMATS
+from .models import DiagramDef, GroupDef
+
+_MERMAID_ID = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_MERMAID_RESERVED = {"end", "graph", "subgraph", "flowchart", "style", "class", "click", "default"}
+
+# draw.io geometry: services are laid out on a simple grid inside each container.
+_NODE_W, _NODE_H = 120, 60
+_GAP = 20
+_HEADER = 30
+_COLUMNS = 4
+
+
+def export(diagram: DiagramDef, fmt: str) -> str:
+    """Export a DiagramDef to one of EXPORT_FORMATS and return the text."""
+    exporters = {"mermaid": to_mermaid, "drawio": to_drawio, "json": to_json}
+    if fmt not in exporters:
+        raise RenderError(
+            f"Unsupported export format '{fmt}'. Expected one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    return exporters[fmt](diagram)
+
+
+def export_file(diagram: DiagramDef, output: str | Path, fmt: str) -> str:
+    """Export to a file. Returns the output path."""
+    text = export(diagram, fmt)
+    try:
+        Path(output).write_text(text, encoding="utf-8")
+    except OSError as e:
+        raise RenderError(f"Failed to write {output}: {e}")
+    return str(output)
+
+
+def default_export_output(diagram: DiagramDef, fmt: str) -> str:
+    suffix = {"mermaid": "mmd", "drawio": "drawio", "json": "json"}[fmt]
+    return diagram.name.lower().replace(" ", "-") + "." + suffix
+
+
+def to_mermaid(diagram: DiagramDef) -> str:
+    """Mermaid ``flowchart`` text with groups as nested subgraphs."""
+    ids = _mermaid_ids(diagram, _group_ids(diagram.groups, "group"))
+    lines = ["---", f"title: {_mermaid_text(diagram.name)}", "---", "flowchart TB"]
+
+    def _node(sid: str, indent: str) -> str:
+        return f'{indent}{ids[sid]}["{_mermaid_text(diagram.services[sid].label)}"]'
+
+    grouped: set[str] = set()
+
+    def _groups(groups: list[GroupDef], prefix: str, indent: str) -> None:
+        for i, group in enumerate(groups):
+            gid = f"{prefix}_{i}"
+            lines.append(f'{indent}subgraph {gid}["{_mermaid_text(group.name)}"]')
+            for sid in group.services:
+                if sid not in grouped:
+                    grouped.add(sid)
+                    lines.append(_node(sid, indent + "    "))
+            _groups(group.children, gid, indent + "    ")
+            lines.append(f"{indent}end")
+
+    _groups(diagram.groups, "group", "    ")
+    for sid in diagram.services:
+        if sid not in grouped:
+            lines.append(_node(sid, "    "))
+
+    for src, dst, label in _edges(diagram):
+        arrow = f"-->|{_mermaid_text(label)}|" if label else "-->"
+        lines.append(f"    {ids[src]} {arrow} {ids[dst]}")
+
+    return "\n".join(lines) + "\n"
+
+
+def to_drawio(diagram: DiagramDef) -> str:
+    """draw.io (mxGraph) XML with groups as nested containers."""
+    mxfile = ET.Element("mxfile", host="awsdiagram")
+    page = ET.SubElement(mxfile, "diagram", id="page0", name=diagram.name)
+    model = ET.SubElement(page, "mxGraphModel")
+    root = ET.SubElement(model, "root")
+    ET.SubElement(root, "mxCell", id="0")
+    ET.SubElement(root, "mxCell", id="1", parent="0")
+
+    placed: set[str] = set()
+
+    def _service(sid: str, parent: str, x: int, y: int) -> None:
+        sdef = diagram.services[sid]
+        style = f"rounded=1;whiteSpace=wrap;html=1;awsType={sdef.type};"
+        root.append(_vertex(f"svc:{sid}", sdef.label, style, parent, x, y, _NODE_W, _NODE_H))
+
+    def _grid(sids: list[str], parent: str, top: int) -> tuple[int, int]:
+        """Place services in rows under ``top``; return the (width, height) used."""
+        for i, sid in enumerate(sids):
+            col, row = i % _COLUMNS, i // _COLUMNS
+            _service(sid, parent, _GAP + col * (_NODE_W + _GAP), top + row * (_NODE_H + _GAP))
+        if not sids:
+            return 0, 0
+        cols = min(len(sids), _COLUMNS)
+        rows = -(-len(sids) // _COLUMNS)
+        return cols * (_NODE_W + _GAP) + _GAP, rows * (_NODE_H + _GAP)
+
+    def _container(group: GroupDef, cell_id: str, parent: str, x: int, y: int) -> tuple[int, int]:
+        """Emit a group container and its contents; return its (width, height)."""
+        cell_index = len(root)
+        sids = [sid for sid in group.services if sid not in placed]
+        placed.update(sids)
+        width, height = _grid(sids, cell_id, _HEADER)
+        cursor = _HEADER + height
+        for i, child in enumerate(group.children):
+            cw, ch = _container(child, f"{cell_id}_{i}", cell_id, _GAP, cursor)
+            width = max(width, cw + 2 * _GAP)
+            cursor += ch + _GAP
+        width = max(width, _NODE_W + 2 * _GAP)
+        height = max(cursor + _GAP, _HEADER + _NODE_H)
+
+        # The container must precede its children in the file, so insert it.
+        style = "swimlane;rounded=1;html=1;container=1;collapsible=1;"
+        root.insert(cell_index, _vertex(cell_id, group.name, style, parent, x, y, width, height))
+        return width, height
+
+    y = _GAP
+    for i, group in enumerate(diagram.groups):
+        _, height = _container(group, f"group_{i}", "1", _GAP, y)
+        y += height + _GAP
+
+    orphans = [sid for sid in diagram.services if sid not in placed]
+    _grid(orphans, "1", y)
+
+    for i, (src, dst, label) in enumerate(_edges(diagram)):
+        edge = ET.SubElement(
+            root,
+            "mxCell",
+            id=f"edge{i}",
+            value=label or "",
+            style="edgeStyle=orthogonalEdgeStyle;rounded=1;html=1;endArrow=classic;",
+            edge="1",
+            parent="1",
+            source=f"svc:{src}",
+            target=f"svc:{dst}",
+        )
+        ET.SubElement(edge, "mxGeometry", relative="1", **{"as": "geometry"})
+
+    ET.indent(mxfile)
+    return ET.tostring(mxfile, encoding="unicode") + "\n"
+
+
+def to_json(diagram: DiagramDef) -> str:
+    """A normalized graph: flat nodes, groups with parent links, one edge per target."""
+    membership: dict[str, str] = {}
+    groups = []
+
+    def _walk(items: list[GroupDef], parent: str | None, prefix: str) -> None:
+        for i, group in enumerate(items):
+            gid = f"{prefix}_{i}"
+            groups.append(
+                {"id": gid, "name": group.name, "parent": parent, "services": list(group.services)}
+            )
+            for sid in group.services:
+                membership.setdefault(sid, gid)
+            _walk(group.children, gid, gid)
+
+    _walk(diagram.groups, None, "group")
+
+    graph = {
+        "name": diagram.name,
+        "nodes": [
+            {"id": sid, "type": sdef.type, "label": sdef.label, "group": membership.get(sid)}
+            for sid, sdef in diagram.services.items()
+        ],
+        "groups": groups,
+        "edges": [
+            {"from": src, "to": dst, "label": label} for src, dst, label in _edges(diagram)
+        ],
+    }
+    return json.dumps(graph, indent=2) + "\n"
+
+
+def _vertex(
+    cell_id: str, value: str, style: str, parent: str, x: int, y: int, width: int, height: int
+) -> ET.Element:
+    cell = ET.Element(
+        "mxCell", id=cell_id, value=value, style=style, vertex="1", parent=parent
+    )
+    geometry = {"x": str(x), "y": str(y), "width": str(width), "height": str(height)}
+    ET.SubElement(cell, "mxGeometry", geometry, **{"as": "geometry"})
+    return cell
+
+
+def _edges(diagram: DiagramDef) -> list[tuple[str, str, str | None]]:
+    edges = []
+    for conn in diagram.connections:
+        targets = conn.to if isinstance(conn.to, list) else [conn.to]
+        for target in targets:
+            edges.append((conn.from_, target, conn.label))
+    return edges
+
+
+def _group_ids(groups: list[GroupDef], prefix: str) -> set[str]:
+    ids = set()
+    for i, group in enumerate(groups):
+        ids.add(f"{prefix}_{i}")
+        ids.update(_group_ids(group.children, f"{prefix}_{i}"))
+    return ids
+
+
+def _mermaid_ids(diagram: DiagramDef, reserved: set[str]) -> dict[str, str]:
+    """Map service IDs to Mermaid-safe node IDs, keeping them readable where possible."""
+    ids: dict[str, str] = {}
+    used = set(reserved)
+    for sid in diagram.services:
+        mid = sid if _MERMAID_ID.match(sid) else re.sub(r"\W", "_", sid)
+        if not _MERMAID_ID.match(mid) or mid.lower() in _MERMAID_RESERVED:
+            mid = f"n_{mid}"
+        base, counter = mid, 2
+        while mid in used:
+            mid = f"{base}_{counter}"
+            counter += 1
+        used.add(mid)
+        ids[sid] = mid
+    return ids
+
+
+def _mermaid_text(text: str) -> str:
+    return text.replace('"', "#quot;").replace("\n", "<br/>")
@@ -0,0 +1,11 @@
+"""Output formats, kept free of heavy imports so the CLI can start quickly."""
+
+# Rendered through Graphviz by the diagrams library.
+OUTPUT_FORMATS = ("png", "svg")
+
+# A page plus per-group layouts that expand on demand (see interactive.py).
+INTERACTIVE_FORMATS = ("html",)
+
+# Written directly from a DiagramDef, without Graphviz or diagrams.
+EXPORT_FORMATS = ("mermaid", "drawio", "json")
+YAML_SUFFIXES = (".yaml", ".yml")
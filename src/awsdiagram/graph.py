@@ -0,0 +1,81 @@
+"""Index-based view of a validated diagram's structure, for stats.
+
+A DiagramDef spends one pydantic model per service, group and connection.
+compute_stats only needs the topology, so CompactGraph keeps just that:
+services become indices into ``ids`` and connections live in flat
+``array`` buffers. Types, labels and attributes are not copied, and the
+graph is not converted back into a DiagramDef.
+"""
+
+from array import array
+from collections.abc import Iterator
+
+from .models import DiagramDef, GroupDef
+
+
+class CompactGroup:
+    """A group whose members are service indices."""
+
+    __slots__ = ("name", "members", "children")
+
+    def __init__(self, name: str, members: array, children: list["CompactGroup"]):
+        self.name = name
+        self.members = members
+        self.children = children
+
+
+class CompactGraph:
+    """Index-based diagram: services ``0..n-1``, connections in CSR arrays.
+
+    Connection ``c`` runs from ``conn_src[c]`` to the services in
+    ``targets[conn_start[c]:conn_start[c + 1]]``.
+    """
+
+    __slots__ = ("name", "ids", "groups", "conn_src", "conn_start", "targets", "_index")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ids: list[str] = []
+        self.groups: list[CompactGroup] = []
+        self.conn_src = array("I")
+        self.conn_start = array("I", [0])
+        self.targets = array("I")
+        self._index: dict[str, int] = {}
+
+    @classmethod
+    def from_diagram(cls, diagram: DiagramDef) -> "CompactGraph":
+        graph = cls(diagram.name)
+        for sid in diagram.services:
+            graph._index[sid] = len(graph.ids)
+            graph.ids.append(sid)
+
+        graph.groups = [graph._compact_group(g) for g in diagram.groups]
+
+        for conn in diagram.connections:
+            graph.conn_src.append(graph._index[conn.from_])
+            for target in conn.to if isinstance(conn.to, list) else [conn.to]:
+                graph.targets.append(graph._index[target])
+            graph.conn_start.append(len(graph.targets))
+        return graph
+
+    def index(self, sid: str) -> int:
+        return self._index[sid]
+
+    def connection_targets(self, c: int) -> array:
+        return self.targets[self.conn_start[c] : self.conn_start[c + 1]]
+
+    def edges(self) -> Iterator[tuple[int, int]]:
+        """Every (source, target) index pair, list connections expanded."""
+        for c, src in enumerate(self.conn_src):
+            for target in self.targets[self.conn_start[c] : self.conn_start[c + 1]]:
+                yield src, target
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _compact_group(self, group: GroupDef) -> CompactGroup:
+        return CompactGroup(
+            group.name,
+            array("I", (self._index[sid] for sid in group.services)),
+            [self._compact_group(child) for child in group.children],
+        )
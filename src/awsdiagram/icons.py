@@ -0,0 +1,119 @@
+"""Pre-scaled copies of the diagrams icons, kept in a per-user cache.
+
+diagrams points every node at its full-size icon (300x300 PNGs for AWS), and
+Graphviz decodes and scales that image again for each node. IconCache writes
+each icon once at the size it is actually drawn, which is the node width
+times the output DPI. The render then points the graph at those copies.
+Entries are keyed by diagrams version and pixel size, so upgrading diagrams
+or changing the DPI simply misses.
+
+Scaling needs Pillow (``pip install awsdiagram[icons]``). Without it, and for
+any icon that cannot be scaled, the original icon path is used unchanged.
+"""
+
+import os
+import sys
+import tempfile
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+import diagrams
+
+from .metrics import inc
+
+# diagrams draws icon nodes 1.4in wide; Graphviz rasterizes at 96 DPI by default.
+NODE_INCHES = 1.4
+DEFAULT_DPI = 96
+ICON_CACHE_ENV = "AWSDIAGRAM_ICON_CACHE"
+
+_RESOURCES = Path(diagrams.__file__).resolve().parent.parent
+
+
+def user_cache_dir() -> Path:
+    """The per-user cache directory for awsdiagram, following platform conventions."""
+    if os.environ.get(ICON_CACHE_ENV):
+        return Path(os.environ[ICON_CACHE_ENV])
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local")
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return base / "awsdiagram" / "icons"
+
+
+def icon_size(dpi: float = DEFAULT_DPI) -> int:
+    """Pixel size an icon is drawn at for the given output DPI."""
+    return max(1, round(NODE_INCHES * dpi))
+
+
+class IconCache:
+    """Scaled icons under ``<directory>/diagrams-<version>/<size>px/``."""
+
+    def __init__(self, directory: str | Path | None = None, size: int = icon_size()):
+        self.size = size
+        self.directory = Path(directory or user_cache_dir()) / f"diagrams-{_diagrams_version()}" / f"{size}px"
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, cls: type) -> str | None:
+        """Path of ``cls``'s icon at this cache's size, or None for icon-less nodes.
+
+        Falls back to the original icon when it cannot be scaled.
+        """
+        icon_dir, icon = getattr(cls, "_icon_dir", None), getattr(cls, "_icon", None)
+        if not (isinstance(icon_dir, str) and isinstance(icon, str)):
+            return None
+        source = _RESOURCES / icon_dir / icon
+        target = self.directory / icon_dir / icon
+        if target.exists():
+            self.hits += 1
+            inc("awsdiagram_cache_requests", cache="icon", result="hit")
+            return str(target)
+        self.misses += 1
+        inc("awsdiagram_cache_requests", cache="icon", result="miss")
+        try:
+            _scale(source, target, self.size)
+        except (ImportError, OSError, ValueError):
+            return str(source)
+        return str(target)
+
+    def images(self, type_map: dict[str, type]) -> dict[str, str]:
+        """Service ID -> scaled icon path for every node class in ``type_map``.
+
+        Each distinct class is scaled at most once per call.
+        """
+        by_class: dict[type, str | None] = {}
+        images = {}
+        for sid, cls in type_map.items():
+            if cls not in by_class:
+                by_class[cls] = self.path(cls)
+            if by_class[cls] is not None:
+                images[sid] = by_class[cls]
+        return images
+
+
+@lru_cache(maxsize=1)
+def _diagrams_version() -> str:
+    try:
+        return version("diagrams")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _scale(source: Path, target: Path, size: int) -> None:
+    """Write ``source`` resized to fit ``size`` x ``size`` to ``target``, atomically."""
+    from PIL import Image
+
+    with Image.open(source) as image:
+        image.thumbnail((size, size), Image.LANCZOS)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                image.save(f, format="PNG", optimize=True)
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
@@ -0,0 +1,266 @@
+"""Interactive HTML output with lazily expanded groups.
+
+The page embeds one layout of the diagram's top ``depth`` group levels, in
+which every deeper group is a summary node (see views.collapse_view). Each
+collapsed group has its own precomputed layout showing its direct contents,
+with its child groups collapsed in turn. These sub-layouts are laid out in
+parallel and written next to the page as small scripts. The page only loads
+a script when its group is expanded, then swaps that layout in. A breadcrumb
+leads back up. Loading by ``<script>`` tag rather than fetch() keeps lazy
+loading working when the page is opened from disk.
+
+Hovering a service highlights its connections and neighbours.
+"""
+
+import html
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from .errors import RenderError
+from .icons import IconCache
+from .metrics import timed
+from .models import DiagramDef, GroupDef
+from .packing import run_graphviz
+from .quality import DEFAULT_QUALITY
+from .renderer import to_dot
+from .resolver import check_graphviz
+from .svg import optimize_svg
+from .views import collapse_view, subset
+
+ROOT_VIEW = "root"
+_ROOT_PATH = "group"
+_XML_PROLOGUE = re.compile(r"^\s*(<\?xml[^>]*\?>\s*)?(<!DOCTYPE[^>]*>\s*)?", re.IGNORECASE)
+
+
+class ViewInfo(BaseModel):
+    """One layout: what the page needs to know before loading it."""
+
+    title: str
+    parent: str | None = None
+    script: str | None = None
+    # SVG node title (a summary service ID) -> the view it expands into.
+    expands: dict[str, str] = {}
+
+
+def render_interactive(
+    diagram_def: DiagramDef,
+    output: str,
+    depth: int = 1,
+    jobs: int | None = None,
+    icon_cache: IconCache | None = None,
+    quality: str = DEFAULT_QUALITY,
+) -> str:
+    """Write ``output`` (an .html file) plus a ``<stem>_files`` directory of group layouts.
+
+    ``depth`` group levels are laid out up front; deeper groups expand on
+    demand. ``quality`` selects the layout preset. Returns the page path.
+    """
+    if not output.endswith(".html"):
+        output = f"{output}.html"
+    check_graphviz()
+
+    views, diagrams = build_views(diagram_def, depth)
+    assets = Path(output).with_name(Path(output).stem + "_files")
+
+    def _layout(key: str) -> str:
+        svg = run_graphviz(["dot", "-Tsvg"], to_dot(diagrams[key], icon_cache=icon_cache, quality=quality))
+        return _XML_PROLOGUE.sub("", optimize_svg(svg, inline_icons=True))
+
+    keys = list(diagrams)
+    with timed("layout"), ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        layouts = dict(zip(keys, pool.map(_layout, keys)))
+
+    try:
+        if len(keys) > 1:
+            assets.mkdir(parents=True, exist_ok=True)
+        for key in keys[1:]:
+            views[key].script = f"{assets.name}/{key}.js"
+            (assets / f"{key}.js").write_text(
+                f"awsdiagramView({json.dumps(key)}, {_script_json(layouts[key])});\n", encoding="utf-8"
+            )
+        Path(output).write_text(page_html(diagram_def.name, views, layouts[ROOT_VIEW]), encoding="utf-8")
+    except OSError as e:
+        raise RenderError(f"Failed to write interactive output {output}: {e}")
+    return output
+
+
+def build_views(diagram_def: DiagramDef, depth: int = 1) -> tuple[dict[str, ViewInfo], dict[str, DiagramDef]]:
+    """The root view and one view per group below ``depth``, keyed by group path.
+
+    A group's path is its position in the tree (``group_0_2`` is the third
+    child of the first top-level group), the same scheme collapse_view uses
+    for summary IDs. The root comes first. Empty groups get no view.
+    """
+    top = collapse_view(diagram_def, depth)
+    expands = _expands(top, diagram_def, diagram_def.groups, _ROOT_PATH)
+    views = {ROOT_VIEW: ViewInfo(title=diagram_def.name, expands=expands)}
+    diagrams = {ROOT_VIEW: top}
+
+    pending = [(key, ROOT_VIEW) for key in views[ROOT_VIEW].expands.values()]
+    while pending:
+        key, parent = pending.pop(0)
+        group = _group_at(diagram_def.groups, key)
+        members = subset(diagram_def, set(_members(group)))
+        scoped = DiagramDef(
+            name=group.name, services=members.services, groups=[group], connections=members.connections
+        )
+        # The group itself stays a cluster; its children become summaries.
+        view = collapse_view(scoped, 1)
+        expands = _expands(view, scoped, diagram_def.groups, f"{_ROOT_PATH}_0", key)
+        views[key] = ViewInfo(title=group.name, parent=parent, expands=expands)
+        diagrams[key] = view
+        pending.extend((child, key) for child in expands.values())
+    return views, diagrams
+
+
+def _expands(
+    view: DiagramDef, source: DiagramDef, groups: list[GroupDef], prefix: str, base: str = _ROOT_PATH
+) -> dict[str, str]:
+    """Summary node ID in ``view`` -> global path of the group it stands for.
+
+    Summaries of groups with no services at any depth stay in the layout
+    but are not expandable: there would be nothing to show.
+    """
+    paths = {sid: base + sid.lstrip("_")[len(prefix) :] for sid in view.services if sid not in source.services}
+    return {sid: path for sid, path in paths.items() if _members(_group_at(groups, path))}
+
+
+def _group_at(groups: list[GroupDef], path: str) -> GroupDef:
+    indices = [int(i) for i in path.split("_")[1:]]
+    group = groups[indices[0]]
+    for i in indices[1:]:
+        group = group.children[i]
+    return group
+
+
+def _members(group: GroupDef) -> list[str]:
+    found = dict.fromkeys(group.services)
+    for child in group.children:
+        found.update(dict.fromkeys(_members(child)))
+    return list(found)
+
+
+def _script_json(value: object) -> str:
+    """JSON that is safe inside a <script> element."""
+    return json.dumps(value).replace("</", "<\\/")
+
+
+def page_html(title: str, views: dict[str, ViewInfo], root_svg: str) -> str:
+    """The viewer page with the root layout inlined."""
+    return _PAGE.format(
+        title=html.escape(title),
+        views=_script_json({key: view.model_dump() for key, view in views.items()}),
+        root=_script_json(root_svg),
+        root_key=json.dumps(ROOT_VIEW),
+    )
+
+
+_PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+  body {{ margin: 0; font-family: sans-serif; }}
+  nav {{ padding: 8px 12px; border-bottom: 1px solid #ddd; }}
+  nav a {{ cursor: pointer; color: #0b5cad; }}
+  #view {{ overflow: auto; height: calc(100vh - 40px); }}
+  #view svg {{ max-width: none; }}
+  .expandable {{ cursor: zoom-in; }}
+  .expandable:hover polygon, .expandable:hover text {{ stroke: #0b5cad; fill: #0b5cad; }}
+  svg.dim .node, svg.dim .edge {{ opacity: 0.2; }}
+  svg.dim .hl {{ opacity: 1; }}
+  svg.dim .edge.hl path {{ stroke: #d84315; stroke-width: 2.5; }}
+  svg.dim .edge.hl polygon {{ stroke: #d84315; fill: #d84315; }}
+</style>
+</head>
+<body>
+<nav id="crumbs"></nav>
+<div id="view"></div>
+<script>
+  const views = {views};
+  const layouts = {{ {root_key}: {root} }};
+  const waiting = {{}};
+
+  window.awsdiagramView = (key, svg) => {{
+    layouts[key] = svg;
+    (waiting[key] || []).forEach((done) => done());
+    delete waiting[key];
+  }};
+
+  function load(key, done) {{
+    if (key in layouts) return done();
+    if (!waiting[key]) {{
+      waiting[key] = [];
+      const script = document.createElement("script");
+      script.src = views[key].script;
+      document.head.appendChild(script);
+    }}
+    waiting[key].push(done);
+  }}
+
+  function titleOf(element) {{
+    const title = element.querySelector(":scope > title");
+    return title ? title.textContent : "";
+  }}
+
+  function show(key) {{
+    load(key, () => {{
+      const view = document.getElementById("view");
+      view.innerHTML = layouts[key];
+      const svg = view.querySelector("svg");
+      const edges = [...svg.querySelectorAll("g.edge")].map((e) => {{
+        const [from, to] = titleOf(e).split("->");
+        return {{ element: e, from, to }};
+      }});
+      for (const node of svg.querySelectorAll("g.node")) {{
+        const id = titleOf(node);
+        if (views[key].expands[id]) {{
+          node.classList.add("expandable");
+          node.addEventListener("click", () => show(views[key].expands[id]));
+        }}
+        node.addEventListener("mouseenter", () => {{
+          svg.classList.add("dim");
+          node.classList.add("hl");
+          for (const edge of edges) {{
+            if (edge.from !== id && edge.to !== id) continue;
+            edge.element.classList.add("hl");
+            const other = edge.from === id ? edge.to : edge.from;
+            for (const n of svg.querySelectorAll("g.node")) {{
+              if (titleOf(n) === other) n.classList.add("hl");
+            }}
+          }}
+        }});
+        node.addEventListener("mouseleave", () => {{
+          svg.classList.remove("dim");
+          svg.querySelectorAll(".hl").forEach((e) => e.classList.remove("hl"));
+        }});
+      }}
+      crumbs(key);
+    }});
+  }}
+
+  function crumbs(key) {{
+    const nav = document.getElementById("crumbs");
+    nav.textContent = "";
+    const chain = [];
+    for (let k = key; k; k = views[k].parent) chain.unshift(k);
+    chain.forEach((k, i) => {{
+      if (i) nav.append(" \\u203a ");
+      const link = document.createElement(i === chain.length - 1 ? "strong" : "a");
+      link.textContent = views[k].title;
+      if (i < chain.length - 1) link.addEventListener("click", () => show(k));
+      nav.append(link);
+    }});
+  }}
+
+  show({root_key});
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,266 @@
+"""Process-wide counters and histograms, exported as OpenMetrics or JSON lines.
+
+The pipeline records into REGISTRY as it runs:
+- how long each stage took: parse, validate, resolve, render, layout, raster
+- the size of each rendered diagram
+- parse, icon and render cache lookups
+- Graphviz failures and timeouts
+
+Batch commands write the registry once at exit, either as a textfile for
+node_exporter's textfile collector or as one JSON line per job.
+``serve-http`` serves it live at ``GET /metrics``.
+
+Every metric is declared in METRICS up front, so exports always list the
+same families whether or not a run touched them.
+"""
+
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from . import __version__
+from .errors import MetricsError
+from .models import DiagramDef
+
+METRICS_FORMATS = ("openmetrics", "prometheus", "jsonl")
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SIZE_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+# name -> (type, help, histogram buckets)
+METRICS: dict[str, tuple[str, str, tuple[float, ...]]] = {
+    "awsdiagram_stage_duration_seconds": (
+        "histogram",
+        "Wall time spent in each pipeline stage.",
+        DURATION_BUCKETS,
+    ),
+    "awsdiagram_diagram_services": ("histogram", "Services per rendered diagram.", SIZE_BUCKETS),
+    "awsdiagram_diagram_edges": ("histogram", "Edges per rendered diagram.", SIZE_BUCKETS),
+    "awsdiagram_diagrams_rendered": ("counter", "Diagrams rendered.", ()),
+    "awsdiagram_cache_requests": ("counter", "Cache lookups by cache and result.", ()),
+    "awsdiagram_graphviz_failures": ("counter", "Failed Graphviz runs by reason.", ()),
+}
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled counters and histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, _Histogram]] = {}
+        self.started = time.time()
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        _declared(name, "counter")
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        buckets = _declared(name, "histogram")
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(len(buckets))
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    hist.counts[i] += 1
+            hist.sum += value
+            hist.count += 1
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        """Observe the block's wall time as ``stage``, whether or not it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("awsdiagram_stage_duration_seconds", time.perf_counter() - start, stage=stage)
+
+    def counter_value(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(tuple(sorted(labels.items())), 0.0)
+
+    def histogram_count(self, name: str, **labels: str) -> int:
+        with self._lock:
+            hist = self._histograms.get(name, {}).get(tuple(sorted(labels.items())))
+            return hist.count if hist is not None else 0
+
+    def drain(self) -> dict:
+        """Everything recorded so far as plain data, clearing the registry.
+
+        Worker processes return this so the parent can merge() it; a
+        registry does not cross process boundaries by itself.
+        """
+        with self._lock:
+            data = {
+                "counters": self._counters,
+                "histograms": {
+                    name: {key: (hist.counts, hist.sum, hist.count) for key, hist in series.items()}
+                    for name, series in self._histograms.items()
+                },
+            }
+            self._counters = {}
+            self._histograms = {}
+        return data
+
+    def merge(self, data: dict) -> None:
+        """Add what another registry drain()ed into this one."""
+        with self._lock:
+            for name, values in data["counters"].items():
+                series = self._counters.setdefault(name, {})
+                for key, value in values.items():
+                    series[key] = series.get(key, 0.0) + value
+            for name, values in data["histograms"].items():
+                series = self._histograms.setdefault(name, {})
+                for key, (counts, total, count) in values.items():
+                    hist = series.get(key)
+                    if hist is None:
+                        hist = series[key] = _Histogram(len(counts))
+                    hist.counts = [a + b for a, b in zip(hist.counts, counts)]
+                    hist.sum += total
+                    hist.count += count
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started = time.time()
+
+    def to_openmetrics(self, prometheus: bool = False) -> str:
+        """Text exposition of every declared metric.
+
+        OpenMetrics names a counter family without its ``_total`` suffix and
+        ends with ``# EOF``. With ``prometheus``, the output instead follows
+        the classic text format that node_exporter's textfile collector reads.
+        """
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, buckets) in METRICS.items():
+                family = f"{name}_total" if kind == "counter" and prometheus else name
+                lines.append(f"# HELP {family} {help_text}")
+                lines.append(f"# TYPE {family} {kind}")
+                if kind == "counter":
+                    for key, value in sorted(self._counters.get(name, {}).items()):
+                        lines.append(f"{name}_total{_labels(key)} {_number(value)}")
+                    continue
+                for key, hist in sorted(self._histograms.get(name, {}).items()):
+                    for bound, count in zip(buckets, hist.counts):
+                        lines.append(f"{name}_bucket{_labels(key, le=repr(float(bound)))} {count}")
+                    lines.append(f"{name}_bucket{_labels(key, le='+Inf')} {hist.count}")
+                    lines.append(f"{name}_sum{_labels(key)} {_number(hist.sum)}")
+                    lines.append(f"{name}_count{_labels(key)} {hist.count}")
+        if not prometheus:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self, job: str) -> dict:
+        """One job's metrics as a JSON-ready dict."""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in sorted(series.items())]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": hist.count,
+                        "sum": hist.sum,
+                        "buckets": dict(zip((_number(b) for b in METRICS[name][2]), hist.counts)),
+                    }
+                    for key, hist in sorted(series.items())
+                ]
+                for name, series in self._histograms.items()
+            }
+        return {
+            "job": job,
+            "version": __version__,
+            "started": self.started,
+            "duration_seconds": time.time() - self.started,
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def write(self, path: str | Path, fmt: str, job: str) -> None:
+        """Write to ``path`` in one of METRICS_FORMATS.
+
+        Text formats replace the file atomically so a collector never reads
+        half of it; ``jsonl`` appends one line per job.
+        """
+        path = Path(path)
+        try:
+            if fmt == "jsonl":
+                with open(path, "a") as f:
+                    f.write(json.dumps(self.to_json(job), separators=(",", ":")) + "\n")
+                return
+            text = self.to_openmetrics(prometheus=fmt == "prometheus")
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(text)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except OSError as e:
+            raise MetricsError(f"Failed to write metrics to {path}: {e}")
+
+
+def record_diagram(diagram: DiagramDef, outformat: str) -> None:
+    """Count a rendered diagram and observe its size."""
+    edges = sum(len(c.to) if isinstance(c.to, list) else 1 for c in diagram.connections)
+    observe("awsdiagram_diagram_services", len(diagram.services))
+    observe("awsdiagram_diagram_edges", edges)
+    inc("awsdiagram_diagrams_rendered", format=outformat)
+
+
+def _declared(name: str, kind: str) -> tuple[float, ...]:
+    try:
+        declared_kind, _, buckets = METRICS[name]
+    except KeyError:
+        raise MetricsError(f"Unknown metric '{name}'")
+    if declared_kind != kind:
+        raise MetricsError(f"Metric '{name}' is a {declared_kind}, not a {kind}")
+    return buckets
+
+
+def _labels(key: tuple, **extra: str) -> str:
+    pairs = [*key, *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    """Integral values without a fraction, others in shortest round-trip form."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timed = REGISTRY.timed
@@ -7,14 +7,47 @@ import re
 from pydantic import BaseModel, field_validator, model_validator
 
 
-_TYPE_PATTERN = re.compile(r"^[a-z][a-z0-9]*\.[A-Z][A-Za-z0-9]*$")
+# An optional provider prefix, then category.ClassName; the prefix defaults to aws.
+_TYPE_PATTERN = re.compile(r"^(?:[a-z][a-z0-9]*:)?[a-z][a-z0-9]*\.[A-Z][A-Za-z0-9_]*$")
+
+# Graphviz node attributes a service may set. Anything that names a file
+# (image, shapefile, fontpath, ...) or a link is left out, because diagrams
+# also arrive in serve-http request bodies.
+NODE_ATTRS = frozenset(
+    {
+        "color",
+        "fillcolor",
+        "fixedsize",
+        "fontcolor",
+        "fontsize",
+        "gradientangle",
+        "height",
+        "labelloc",
+        "margin",
+        "penwidth",
+        "peripheries",
+        "shape",
+        "style",
+        "tooltip",
+        "width",
+        "xlabel",
+    }
+)
+# Passed to the node by name, so setting them as attributes would clash.
+_RESERVED_ATTRS = frozenset({"label", "nodeid"})
 
 
 class ServiceDef(BaseModel):
-    """A single AWS service node."""
+    """A single service node, AWS unless its type names another provider.
+
+    ``attrs`` are extra Graphviz node attributes such as ``color`` or
+    ``fontcolor``, passed through to the rendered node. Only NODE_ATTRS are
+    accepted.
+    """
 
     type: str
     label: str
+    attrs: dict[str, str] = {}
 
     @field_validator("type")
     @classmethod
@@ -22,7 +55,24 @@ class ServiceDef(BaseModel):
         if not _TYPE_PATTERN.match(v):
             raise ValueError(
                 f"Invalid type format '{v}'. "
-                "Expected 'category.ClassName' (e.g. 'compute.EC2')."
+                "Expected '[provider:]category.ClassName' "
+                "(e.g. 'compute.EC2' or 'onprem:network.Nginx')."
+            )
+        return v
+
+    @field_validator("attrs")
+    @classmethod
+    def validate_attrs(cls, v: dict[str, str]) -> dict[str, str]:
+        reserved = sorted(_RESERVED_ATTRS.intersection(v))
+        if reserved:
+            raise ValueError(
+                f"Reserved attribute(s) {', '.join(reserved)}; set the service's label instead."
+            )
+        unsupported = sorted(set(v) - NODE_ATTRS)
+        if unsupported:
+            raise ValueError(
+                f"Unsupported attribute(s) {', '.join(unsupported)}. "
+                f"Allowed: {', '.join(sorted(NODE_ATTRS))}"
             )
         return v
 
@@ -70,3 +120,75 @@ class RootModel(BaseModel):
     """Root wrapper — expects a top-level 'diagram' key."""
 
     diagram: DiagramDef
+
+
+class FragmentDef(BaseModel):
+    """Reusable services, groups and connections pulled in with 'include:'."""
+
+    include: list[str] = []
+    services: dict[str, ServiceDef] = {}
+    groups: list[GroupDef] = []
+    connections: list[ConnectionDef] = []
+
+    @field_validator("include", mode="before")
+    @classmethod
+    def include_as_list(cls, v: object) -> object:
+        return [v] if isinstance(v, str) else v
+
+
+class ViewDef(BaseModel):
+    """One diagram in a multi-diagram document, drawn from shared services."""
+
+    name: str
+    services: dict[str, ServiceDef] = {}
+    groups: list[GroupDef] = []
+    connections: list[ConnectionDef] = []
+
+
+class MultiDiagramRoot(BaseModel):
+    """Root wrapper for a shared 'services' block plus a 'diagrams' list."""
+
+    services: dict[str, ServiceDef] = {}
+    diagrams: list[ViewDef]
+
+    @field_validator("diagrams")
+    @classmethod
+    def diagrams_not_empty(cls, v: list) -> list:
+        if not v:
+            raise ValueError("At least one diagram must be defined")
+        return v
+
+
+class TemplateDef(BaseModel):
+    """A reusable bundle of services, groups and connections.
+
+    IDs are local to the template; labels and group names may use
+    ``${key}`` and any per-instance variables (``$$`` for a literal ``$``).
+    """
+
+    services: dict[str, ServiceDef]
+    groups: list[GroupDef] = []
+    connections: list[ConnectionDef] = []
+
+
+class InstanceDef(BaseModel):
+    """Stamps out a template once per ``for_each`` key.
+
+    ``for_each`` is a list of keys or a mapping of key to extra variables.
+    Each instance's services get IDs from ``id_format``; ``group``, when set,
+    names a group wrapping each instance. ``connections`` wire instances to
+    the rest of the diagram and may use the template's local IDs.
+    """
+
+    template: str
+    for_each: list[str] | dict[str, dict[str, str]]
+    id_format: str = "${key}_${id}"
+    group: str | None = None
+    connections: list[ConnectionDef] = []
+
+
+class TemplateBlock(BaseModel):
+    """The 'templates' and 'instances' sections of a diagram block."""
+
+    templates: dict[str, TemplateDef] = {}
+    instances: list[InstanceDef] = []
@@ -0,0 +1,97 @@
+"""Parallel per-component layout, combined with gvpack and drawn by neato -n2."""
+
+import os
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from .errors import GraphvizNotFoundError, RenderError
+from .icons import IconCache
+from .metrics import inc, timed
+from .models import DiagramDef
+from .quality import DEFAULT_QUALITY, preset
+from .renderer import OUTPUT_FORMATS, render, to_dot
+from .resolver import check_graphviz, validate_all_types
+from .views import components, subset
+
+GRAPHVIZ_TIMEOUT = 3600
+
+
+def render_packed(
+    diagram_def: DiagramDef,
+    output: str,
+    outformat: str = "png",
+    jobs: int | None = None,
+    icon_cache: IconCache | None = None,
+    quality: str = DEFAULT_QUALITY,
+) -> str:
+    """Render each connected component in its own ``dot`` process, then pack.
+
+    Components are laid out in parallel, combined with ``gvpack`` and drawn
+    by a single ``neato -n2`` pass that keeps the computed positions. A
+    diagram with only one component falls back to the regular renderer.
+    ``quality`` selects a preset, as in render(). Returns the output path.
+    """
+    if outformat not in OUTPUT_FORMATS:
+        raise RenderError(
+            f"Unsupported output format '{outformat}'. "
+            f"Expected one of: {', '.join(OUTPUT_FORMATS)}"
+        )
+    settings = preset(quality)
+    check_graphviz()
+    validate_all_types(diagram_def.services)
+
+    parts = components(diagram_def)
+    if len(parts) <= 1:
+        return render(diagram_def, output, outformat, icon_cache=icon_cache, quality=quality)
+
+    for tool in ("gvpack", "neato"):
+        if shutil.which(tool) is None:
+            raise GraphvizNotFoundError(
+                f"Graphviz '{tool}' not found on PATH; it is required for packed layout."
+            )
+
+    if not output.endswith("." + outformat):
+        output = f"{output}.{outformat}"
+
+    # The title is drawn once on the packed graph, not once per component.
+    sources = [
+        to_dot(
+            subset(diagram_def, set(part)), {"label": ""}, f"cluster_c{i}", icon_cache=icon_cache, quality=quality
+        )
+        for i, part in enumerate(parts)
+    ]
+    with timed("layout"):
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+            laid_out = list(pool.map(lambda src: run_graphviz(["dot", "-Tdot"], src), sources))
+        packed = run_graphviz(["gvpack", "-g"], "\n".join(laid_out))
+
+    raster = ["neato", "-s", "-n2", f"-T{outformat}", f"-Glabel={diagram_def.name}"]
+    if settings.dpi is not None and outformat == "png":
+        raster.append(f"-Gdpi={settings.dpi}")
+    with timed("raster"):
+        run_graphviz([*raster, "-o", output], packed)
+    return output
+
+
+def run_graphviz(cmd: list[str], source: str) -> str:
+    """Pipe DOT source through a Graphviz tool and return its stdout."""
+    try:
+        result = subprocess.run(
+            cmd,
+            input=source,
+            capture_output=True,
+            text=True,
+            timeout=GRAPHVIZ_TIMEOUT,
+        )
+    except subprocess.TimeoutExpired:
+        inc("awsdiagram_graphviz_failures", reason="timeout")
+        raise RenderError(f"Graphviz '{cmd[0]}' timed out after {GRAPHVIZ_TIMEOUT}s")
+    except OSError as e:
+        inc("awsdiagram_graphviz_failures", reason="error")
+        raise RenderError(f"Failed to run Graphviz '{cmd[0]}': {e}")
+
+    if result.returncode != 0:
+        inc("awsdiagram_graphviz_failures", reason="error")
+        raise RenderError(f"Graphviz '{cmd[0]}' failed: {result.stderr.strip()}")
+    return result.stdout
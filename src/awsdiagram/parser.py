@@ -1,12 +1,19 @@
 """YAML loading and validation."""
 
+import threading
 from pathlib import Path
 
 import yaml
 from pydantic import ValidationError
 
-from .errors import SchemaValidationError, ServiceReferenceError, YamlLoadError
-from .models import DiagramDef, GroupDef, RootModel
+from .errors import IncludeError, SchemaValidationError, ServiceReferenceError, YamlLoadError
+from .metrics import timed
+from .models import DiagramDef, FragmentDef, GroupDef, MultiDiagramRoot, RootModel, ViewDef
+from .templates import TEMPLATE_KEYS, expand_templates
+
+# Fragments pulled in with include:, memoized per process by (path, mtime).
+_fragment_cache: dict[Path, tuple[int, FragmentDef]] = {}
+_fragment_lock = threading.Lock()
 
 
 def load_yaml(path: str | Path) -> dict:
@@ -16,7 +23,7 @@ def load_yaml(path: str | Path) -> dict:
         raise YamlLoadError(f"File not found: {path}")
 
     try:
-        with open(path) as f:
+        with open(path) as f, timed("parse"):
             data = yaml.safe_load(f)
     except yaml.YAMLError as e:
         raise YamlLoadError(f"Invalid YAML in {path}: {e}")
@@ -27,20 +34,283 @@ def load_yaml(path: str | Path) -> dict:
     return data
 
 
+def load_yaml_documents(path: str | Path) -> list[dict]:
+    """Load every document of a (possibly ``---``-separated) YAML file."""
+    return load_yaml_documents_string(read_text(path), str(path))
+
+
+def load_yaml_documents_string(text: str, source: str = "<string>") -> list[dict]:
+    """Load every document of in-memory YAML content."""
+    try:
+        with timed("parse"):
+            documents = [doc for doc in yaml.safe_load_all(text) if doc is not None]
+    except yaml.YAMLError as e:
+        raise YamlLoadError(f"Invalid YAML in {source}: {e}")
+
+    if not documents:
+        raise YamlLoadError(f"No YAML documents in {source}")
+    for i, data in enumerate(documents, 1):
+        if not isinstance(data, dict):
+            raise YamlLoadError(
+                f"Expected a YAML mapping in {source} (document {i}), got {type(data).__name__}"
+            )
+
+    return documents
+
+
+def read_text(path: str | Path) -> str:
+    """Read a diagram file, raising YamlLoadError if it can't be read."""
+    path = Path(path)
+    if not path.exists():
+        raise YamlLoadError(f"File not found: {path}")
+    try:
+        return path.read_text()
+    except (OSError, UnicodeDecodeError) as e:
+        raise YamlLoadError(f"Failed to read {path}: {e}")
+
+
+def load_yaml_string(text: str, source: str = "<string>") -> dict:
+    """Load YAML from an in-memory string and return the raw dict."""
+    try:
+        with timed("parse"):
+            data = yaml.safe_load(text)
+    except yaml.YAMLError as e:
+        raise YamlLoadError(f"Invalid YAML in {source}: {e}")
+
+    if not isinstance(data, dict):
+        raise YamlLoadError(f"Expected a YAML mapping in {source}, got {type(data).__name__}")
+
+    return data
+
+
 def parse(path: str | Path) -> DiagramDef:
     """Load, validate schema, and cross-reference check. Returns DiagramDef."""
-    data = load_yaml(path)
+    return parse_data(load_yaml(path), str(path))
+
+
+def parse_string(text: str, source: str = "<string>") -> DiagramDef:
+    """Like parse(), but for YAML content that is already in memory."""
+    return parse_data(load_yaml_string(text, source))
+
+
+def parse_data(
+    data: dict, source: str | None = None, included: list[Path] | None = None
+) -> DiagramDef:
+    """Validate an already-loaded YAML dict. Returns DiagramDef.
+
+    ``source`` is the file the dict came from; ``include:`` paths resolve
+    relative to it and are rejected when it is None. Every fragment pulled
+    in is appended to ``included``.
+    """
+    block = data.get("diagram")
+    if isinstance(block, dict) and "include" in block:
+        block = _merge_includes(block, source, included)
+        data = {**data, "diagram": block}
+    if isinstance(block, dict) and any(key in block for key in TEMPLATE_KEYS):
+        data = {**data, "diagram": expand_templates(block)}
+
+    with timed("validate"):
+        try:
+            root = RootModel.model_validate(data)
+        except ValidationError as e:
+            raise SchemaValidationError(f"Schema validation failed:\n{e}") from e
+
+        diagram = root.diagram
+        _validate_references(diagram)
+    return diagram
+
+
+def parse_all(path: str | Path) -> list[DiagramDef]:
+    """Parse every diagram in a file.
+
+    A file may hold several ``---``-separated documents, and each document
+    is either a single ``diagram:`` or a shared ``services:`` block with a
+    ``diagrams:`` list of views. The shared services are validated once and
+    reused by every view.
+    """
+    return parse_all_string(read_text(path), str(path))
+
+
+def parse_all_string(
+    text: str, source: str = "<string>", included: list[Path] | None = None
+) -> list[DiagramDef]:
+    """Like parse_all(), but for YAML content that is already in memory.
+
+    ``source`` must be a real path for ``include:`` to work; fragments that
+    get pulled in are appended to ``included``.
+    """
+    documents = load_yaml_documents_string(text, source)
+    if len(documents) == 1:
+        return parse_document(documents[0], source, included)
+
+    diagrams = []
+    for i, data in enumerate(documents, 1):
+        try:
+            diagrams.extend(parse_document(data, source, included))
+        except (SchemaValidationError, ServiceReferenceError, IncludeError) as e:
+            raise type(e)(f"Document {i}: {e}")
+    return diagrams
+
+
+def parse_document(
+    data: dict, source: str | None = None, included: list[Path] | None = None
+) -> list[DiagramDef]:
+    """Validate one YAML document, which may define several diagrams."""
+    if "diagrams" not in data:
+        return [parse_data(data, source, included)]
+
+    if "include" in data:
+        # Fragments feed the shared services block that every view draws from.
+        data = _merge_includes(data, source, included)
+        if data["groups"] or data["connections"]:
+            raise IncludeError(
+                "Fragments included by a 'diagrams:' file may only define services; "
+                "put their groups and connections in a view"
+            )
+
+    with timed("validate"):
+        try:
+            root = MultiDiagramRoot.model_validate(data)
+        except ValidationError as e:
+            raise SchemaValidationError(f"Schema validation failed:\n{e}") from e
+
+        return [_expand_view(view, root.services) for view in root.diagrams]
+
+
+def _expand_view(view: ViewDef, shared: dict) -> DiagramDef:
+    """Build a view's DiagramDef from the shared services it references.
+
+    A view that references no services at all shows every shared service.
+    """
+    referenced = _group_service_ids(view.groups)
+    for conn in view.connections:
+        referenced.add(conn.from_)
+        referenced.update(conn.to if isinstance(conn.to, list) else [conn.to])
+
+    if referenced:
+        services = {sid: sdef for sid, sdef in shared.items() if sid in referenced}
+    else:
+        services = dict(shared)
+    services.update(view.services)
 
     try:
-        root = RootModel.model_validate(data)
+        diagram = DiagramDef(
+            name=view.name,
+            services=services,
+            groups=view.groups,
+            connections=view.connections,
+        )
     except ValidationError as e:
-        raise SchemaValidationError(f"Schema validation failed:\n{e}")
+        raise SchemaValidationError(
+            f"Diagram '{view.name}': schema validation failed:\n{e}"
+        ) from e
 
-    diagram = root.diagram
-    _validate_references(diagram)
+    try:
+        _validate_references(diagram)
+    except ServiceReferenceError as e:
+        raise ServiceReferenceError(f"Diagram '{view.name}': {e}")
     return diagram
 
 
+def load_fragment(path: str | Path) -> FragmentDef:
+    """Load and validate an include: fragment, memoized by path and mtime.
+
+    A fragment file holds top-level ``services``/``groups``/``connections``
+    (and may ``include`` further fragments); a whole diagram file works too,
+    in which case its ``diagram`` block is used and its name ignored.
+    """
+    path = Path(path).resolve()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        raise IncludeError(f"Included file not found: {path}")
+
+    with _fragment_lock:
+        cached = _fragment_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    data = load_yaml(path)
+    if isinstance(data.get("diagram"), dict):
+        data = data["diagram"]
+    try:
+        fragment = FragmentDef.model_validate(data)
+    except ValidationError as e:
+        raise SchemaValidationError(f"Invalid fragment {path}:\n{e}") from e
+
+    with _fragment_lock:
+        _fragment_cache[path] = (mtime, fragment)
+    return fragment
+
+
+def _merge_includes(block: dict, source: str | None, included: list[Path] | None) -> dict:
+    """Return ``block`` with its include: fragments merged in ahead of its own content."""
+    refs = block.get("include") or []
+    if isinstance(refs, str):
+        refs = [refs]
+    if not isinstance(refs, list) or not all(isinstance(r, str) for r in refs):
+        raise SchemaValidationError("'include' must be a path or a list of paths")
+    if source is None or source.startswith("<"):
+        raise IncludeError("include: is only supported when parsing a file")
+
+    source_path = Path(source).resolve()
+    origins: dict[str, Path] = {}
+    services: dict = {}
+    groups: list = []
+    connections: list = []
+
+    for path, fragment in _walk_fragments(refs, source_path, [source_path], set()):
+        if included is not None:
+            included.append(path)
+        for sid, sdef in fragment.services.items():
+            if sid in origins:
+                raise IncludeError(
+                    f"Service '{sid}' is defined in both {origins[sid]} and {path}"
+                )
+            origins[sid] = path
+            services[sid] = sdef
+        groups.extend(fragment.groups)
+        connections.extend(fragment.connections)
+
+    own_services = block.get("services") or {}
+    if isinstance(own_services, dict):
+        for sid in own_services:
+            if sid in origins:
+                raise IncludeError(
+                    f"Service '{sid}' in {source_path} is already defined in included {origins[sid]}"
+                )
+        services.update(own_services)
+
+    merged = {key: value for key, value in block.items() if key != "include"}
+    merged["services"] = services
+    merged["groups"] = groups + list(block.get("groups") or [])
+    merged["connections"] = connections + list(block.get("connections") or [])
+    return merged
+
+
+def _walk_fragments(refs: list[str], including: Path, stack: list[Path], seen: set[Path]):
+    """Yield (path, fragment) depth-first, nested includes first, each file once."""
+    for ref in refs:
+        path = (including.parent / ref).resolve()
+        if path in stack:
+            chain = " -> ".join(str(p) for p in stack[stack.index(path):] + [path])
+            raise IncludeError(f"Include cycle: {chain}")
+        if path in seen:
+            continue
+        seen.add(path)
+        fragment = load_fragment(path)
+        yield from _walk_fragments(fragment.include, path, stack + [path], seen)
+        yield path, fragment
+
+
+def _group_service_ids(groups: list[GroupDef]) -> set[str]:
+    ids: set[str] = set()
+    for group in groups:
+        ids.update(group.services)
+        ids.update(_group_service_ids(group.children))
+    return ids
+
+
 def _validate_references(diagram: DiagramDef) -> None:
     """Check that all service references in groups and connections exist."""
     valid_ids = set(diagram.services.keys())
@@ -0,0 +1,136 @@
+"""Render pipeline shared by the CLI and batch modes: view → layout → output."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from .metrics import record_diagram
+from .models import DiagramDef
+from .quality import DEFAULT_QUALITY, preset
+from .views import collapse_view, focus_view
+
+
+class RenderOptions(BaseModel):
+    """Everything besides the DiagramDef that affects a rendered file."""
+
+    outformat: str = "png"
+    focus: list[str] = []
+    radius: int = 1
+    max_depth: int | None = None
+    pack: bool = False
+    jobs: int | None = None
+    optimize_svg: bool = False
+    inline_icons: bool = False
+    scale_icons: bool = True
+    tiles: int | None = None
+    quality: str = DEFAULT_QUALITY
+
+
+def default_output(diagram: DiagramDef, outformat: str, tiles: bool = False) -> str:
+    """The file name a diagram renders to when no output path is given.
+
+    Tiled output is a directory, ``<diagram-name>-tiles``.
+    """
+    stem = diagram.name.lower().replace(" ", "-")
+    return f"{stem}-tiles" if tiles else f"{stem}.{outformat}"
+
+
+def unique_name(name: str, taken: set[str]) -> str:
+    """``name``, or ``<stem>-2<suffix>``, ``-3`` and so on if it is in ``taken``; adds it."""
+    stem, suffix = os.path.splitext(name)
+    counter = 2
+    while name in taken:
+        name = f"{stem}-{counter}{suffix}"
+        counter += 1
+    taken.add(name)
+    return name
+
+
+def apply_views(diagram: DiagramDef, options: RenderOptions) -> DiagramDef:
+    """Apply the focus and level-of-detail views selected in ``options``."""
+    if options.focus:
+        diagram = focus_view(diagram, options.focus, options.radius)
+    if options.max_depth is not None:
+        diagram = collapse_view(diagram, options.max_depth)
+    return diagram
+
+
+def render_view(diagram: DiagramDef, output: str, options: RenderOptions) -> str:
+    """Render one diagram with the given options. Returns the output path.
+
+    For tiled output ``output`` is a directory and the HTML viewer's path is
+    returned. For ``html`` output, ``max_depth`` (default 1) sets how many
+    group levels are laid out up front instead of dropping deeper ones.
+    """
+    interactive = options.outformat == "html"
+    if interactive:
+        diagram = apply_views(diagram, options.model_copy(update={"max_depth": None}))
+    else:
+        diagram = apply_views(diagram, options)
+    settings = preset(options.quality)
+    # Imported here so that commands which never render skip loading diagrams.
+    from .icons import DEFAULT_DPI, IconCache, icon_size
+
+    dpi = settings.dpi or DEFAULT_DPI
+    # Draft renders draw no icons, so there is nothing to scale.
+    icon_cache = IconCache(size=icon_size(dpi)) if options.scale_icons and settings.icons else None
+    if interactive:
+        from .interactive import render_interactive
+
+        depth = 1 if options.max_depth is None else options.max_depth
+        result = render_interactive(
+            diagram, output, depth, options.jobs, icon_cache=icon_cache, quality=options.quality
+        )
+        record_diagram(diagram, options.outformat)
+        return result
+    if options.tiles:
+        from .tiles import render_tiles
+
+        result = render_tiles(
+            diagram, output, options.tiles, options.jobs, icon_cache=icon_cache, dpi=dpi, quality=options.quality
+        )
+        record_diagram(diagram, "tiles")
+        return result
+    if options.pack:
+        from .packing import render_packed
+
+        result = render_packed(
+            diagram, output, options.outformat, options.jobs, icon_cache=icon_cache, quality=options.quality
+        )
+    else:
+        from .renderer import render
+
+        result = render(diagram, output, options.outformat, icon_cache=icon_cache, quality=options.quality)
+    if options.optimize_svg or options.inline_icons:
+        from .svg import optimize_svg_file
+
+        optimize_svg_file(result, inline_icons=options.inline_icons)
+    record_diagram(diagram, options.outformat)
+    return result
+
+
+def render_many(
+    diagrams: list[DiagramDef],
+    output_dir: str | Path,
+    options: RenderOptions,
+    jobs: int | None = None,
+) -> list[str]:
+    """Render several diagrams in parallel into ``output_dir``.
+
+    Graphviz runs as a subprocess, so a thread pool is enough to keep one
+    layout per core busy. Diagrams that share a name get a numeric suffix.
+    Returns the output paths in input order.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    outputs = []
+    taken: set[str] = set()
+    for diagram in diagrams:
+        name = unique_name(default_output(diagram, options.outformat, bool(options.tiles)), taken)
+        outputs.append(str(output_dir / name))
+
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        return list(pool.map(lambda d, out: render_view(d, out, options), diagrams, outputs))
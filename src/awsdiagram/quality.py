@@ -0,0 +1,66 @@
+"""Render quality presets: how much Graphviz effort and fidelity a render gets.
+
+Most of the layout time for a large diagram goes to orthogonal edge routing
+and to crossing minimization and network simplex, which are iterative.
+``draft`` draws straight edges and caps those iterations. It also
+rasterizes at a lower DPI and draws services as plain labelled boxes, so
+icons are never loaded or scaled. ``normal`` keeps the icons but routes
+edges as polylines and halves the crossing-minimization effort. ``final``
+is the default, full-fidelity look.
+"""
+
+from pydantic import BaseModel
+
+from .errors import RenderError
+
+QUALITIES = ("draft", "normal", "final")
+DEFAULT_QUALITY = "final"
+
+
+class QualityPreset(BaseModel):
+    """Graphviz settings for one quality level."""
+
+    # Layered over the renderer's own graph attributes.
+    graph_attr: dict[str, str] = {}
+    # Raster DPI; None leaves Graphviz's default of 96.
+    dpi: int | None = None
+    icons: bool = True
+
+
+PRESETS: dict[str, QualityPreset] = {
+    "draft": QualityPreset(
+        graph_attr={
+            "splines": "line",
+            "mclimit": "0.1",
+            "nslimit": "1",
+            "nslimit1": "1",
+            "searchsize": "10",
+            "remincross": "false",
+        },
+        dpi=48,
+        icons=False,
+    ),
+    "normal": QualityPreset(graph_attr={"splines": "polyline", "mclimit": "0.5"}),
+    "final": QualityPreset(),
+}
+
+# Attributes for services drawn without icons: a box sized to its label.
+PLAIN_NODE_ATTRS = {
+    "shape": "box",
+    "style": "rounded",
+    "image": "",
+    "labelloc": "c",
+    "fixedsize": "false",
+    "width": "1.2",
+    "height": "0.5",
+}
+
+
+def preset(quality: str) -> QualityPreset:
+    """The preset for ``quality``, one of QUALITIES."""
+    try:
+        return PRESETS[quality]
+    except KeyError:
+        raise RenderError(
+            f"Unknown quality '{quality}'. Expected one of: {', '.join(QUALITIES)}"
+        )
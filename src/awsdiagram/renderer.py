@@ -1,60 +1,150 @@
-"""Builds Diagram/Cluster/Node/Edge objects and renders to PNG."""
+"""Builds Diagram/Cluster/Node/Edge objects and renders to PNG or SVG."""
 
-from diagrams import Cluster, Diagram, Edge
+from diagrams import Cluster, Diagram, Edge, setdiagram
+from graphviz import nohtml
 
 from .errors import RenderError
+from .formats import OUTPUT_FORMATS
+from .icons import IconCache
+from .metrics import inc, timed
 from .models import DiagramDef, GroupDef
+from .quality import DEFAULT_QUALITY, PLAIN_NODE_ATTRS, QualityPreset, preset
 from .resolver import check_graphviz, validate_all_types
 
 
-def render(diagram_def: DiagramDef, output: str) -> str:
-    """Render a DiagramDef to a PNG file. Returns the output path."""
+def render(
+    diagram_def: DiagramDef,
+    output: str,
+    outformat: str = "png",
+    icon_cache: IconCache | None = None,
+    quality: str = DEFAULT_QUALITY,
+) -> str:
+    """Render a DiagramDef to a PNG or SVG file. Returns the output path.
+
+    With ``icon_cache``, nodes use its pre-scaled icons instead of the
+    full-size originals. ``quality`` selects a preset from quality.py.
+    """
+    if outformat not in OUTPUT_FORMATS:
+        raise RenderError(
+            f"Unsupported output format '{outformat}'. "
+            f"Expected one of: {', '.join(OUTPUT_FORMATS)}"
+        )
+    settings = preset(quality)
     check_graphviz()
     type_map = validate_all_types(diagram_def.services)
 
     # diagrams library appends the format extension, so strip it
-    if output.endswith(".png"):
-        output = output[:-4]
-
-    nodes: dict[str, object] = {}
+    if output.endswith("." + outformat):
+        output = output[: -len(outformat) - 1]
 
+    images = icon_cache.images(type_map) if icon_cache is not None and settings.icons else {}
+    kwargs = _diagram_kwargs(diagram_def, output, outformat, settings)
+    if settings.dpi is not None and outformat == "png":
+        kwargs["graph_attr"]["dpi"] = str(settings.dpi)
     try:
-        with Diagram(
-            diagram_def.name,
-            filename=output,
-            outformat="png",
-            show=False,
-            direction="TB",
-            graph_attr={"fontname": "Inter", "fontsize": "12"},
-            node_attr={"fontname": "Inter", "fontsize": "12"},
-            edge_attr={"fontname": "Inter", "fontsize": "12"},
-        ):
-            # Render groups (clusters) and their services
-            grouped_ids: set[str] = set()
-            _render_groups(diagram_def.groups, diagram_def, type_map, nodes, grouped_ids)
-
-            # Render orphan services (not in any group)
-            for sid, sdef in diagram_def.services.items():
-                if sid not in grouped_ids:
-                    cls = type_map[sid]
-                    nodes[sid] = cls(sdef.label)
-
-            # Wire connections
-            for conn in diagram_def.connections:
-                src = nodes[conn.from_]
-                targets = conn.to if isinstance(conn.to, list) else [conn.to]
-                for target_id in targets:
-                    target = nodes[target_id]
-                    if conn.label:
-                        src >> Edge(label=conn.label) >> target
-                    else:
-                        src >> target
+        # dot lays out and rasterizes in one process, so this is a single stage.
+        with timed("render"), Diagram(**kwargs):
+            _build(diagram_def, type_map, images=images, plain=not settings.icons)
     except Exception as e:
         if "graphviz" in str(e).lower() or "dot" in str(e).lower():
+            inc("awsdiagram_graphviz_failures", reason="error")
             raise RenderError(f"Graphviz rendering failed: {e}")
         raise RenderError(f"Rendering failed: {e}")
 
-    return output + ".png"
+    return output + "." + outformat
+
+
+def to_dot(
+    diagram_def: DiagramDef,
+    graph_attr: dict[str, str] | None = None,
+    cluster_prefix: str = "cluster",
+    icon_cache: IconCache | None = None,
+    quality: str = DEFAULT_QUALITY,
+) -> str:
+    """Build the diagram and return its DOT source without running Graphviz.
+
+    The result is deterministic: node IDs are the service IDs and cluster IDs
+    are derived from each group's position in the tree, so an unchanged
+    DiagramDef always produces byte-identical DOT. ``graph_attr`` overrides
+    the default graph attributes and ``cluster_prefix`` namespaces the
+    cluster IDs so several outputs can be combined into one graph.
+    ``icon_cache`` points nodes at pre-scaled icons and ``quality`` selects
+    a preset, as in render(). The preset's DPI is left to the caller, which
+    knows the output format.
+    """
+    settings = preset(quality)
+    type_map = validate_all_types(diagram_def.services)
+    images = icon_cache.images(type_map) if icon_cache is not None and settings.icons else {}
+    kwargs = _diagram_kwargs(diagram_def, "diagram", "png", settings)
+    kwargs["graph_attr"].update(graph_attr or {})
+    with _SourceOnlyDiagram(**kwargs) as diagram:
+        _build(diagram_def, type_map, cluster_prefix, images, plain=not settings.icons)
+    return diagram.dot.source
+
+
+class _SourceOnlyDiagram(Diagram):
+    """A Diagram that builds its DOT graph but never invokes Graphviz."""
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        setdiagram(None)
+
+
+def _diagram_kwargs(
+    diagram_def: DiagramDef, output: str, outformat: str, settings: QualityPreset | None = None
+) -> dict:
+    graph_attr = {"fontname": "Inter", "fontsize": "12"}
+    graph_attr.update(settings.graph_attr if settings is not None else {})
+    return dict(
+        name=nohtml(diagram_def.name),
+        filename=output,
+        outformat=outformat,
+        show=False,
+        direction="TB",
+        graph_attr=graph_attr,
+        node_attr={"fontname": "Inter", "fontsize": "12"},
+        edge_attr={"fontname": "Inter", "fontsize": "12"},
+    )
+
+
+def _build(
+    diagram_def: DiagramDef,
+    type_map: dict[str, type],
+    cluster_prefix: str = "cluster",
+    images: dict[str, str] | None = None,
+    plain: bool = False,
+) -> None:
+    """Instantiate clusters, nodes and edges inside the active Diagram.
+
+    ``images`` maps service IDs to icon paths that replace the class default.
+    With ``plain``, services are drawn as labelled boxes without icons.
+    Every label is marked nohtml, so text like ``<<IMG SRC="..."/>>`` is
+    drawn literally and never parsed as an HTML-like label.
+    """
+    nodes: dict[str, object] = {}
+    images = images or {}
+
+    # Render groups (clusters) and their services
+    grouped_ids: set[str] = set()
+    _render_groups(
+        diagram_def.groups, diagram_def, type_map, nodes, grouped_ids, cluster_prefix, images, plain
+    )
+
+    # Render orphan services (not in any group)
+    for sid, sdef in diagram_def.services.items():
+        if sid not in grouped_ids:
+            cls = type_map[sid]
+            nodes[sid] = cls(nohtml(sdef.label), nodeid=sid, **_node_attrs(sid, sdef.attrs, images, plain))
+
+    # Wire connections
+    for conn in diagram_def.connections:
+        src = nodes[conn.from_]
+        targets = conn.to if isinstance(conn.to, list) else [conn.to]
+        for target_id in targets:
+            target = nodes[target_id]
+            if conn.label:
+                src >> Edge(label=nohtml(conn.label)) >> target
+            else:
+                src >> target
 
 
 def _render_groups(
@@ -63,12 +153,37 @@ def _render_groups(
     type_map: dict[str, type],
     nodes: dict[str, object],
     grouped_ids: set[str],
+    prefix: str = "cluster",
+    images: dict[str, str] | None = None,
+    plain: bool = False,
 ) -> None:
     """Recursively render groups as Clusters, instantiating nodes inside them."""
-    for group in groups:
-        with Cluster(group.name, graph_attr={"fontname": "Inter bold", "fontsize": "12"}):
+    for i, group in enumerate(groups):
+        cluster_id = f"{prefix}_{i}"
+        with Cluster(nohtml(group.name), graph_attr={"fontname": "Inter bold", "fontsize": "12"}) as cluster:
+            # diagrams names clusters after their label, which merges groups
+            # that share a name; use the group's tree position instead.
+            cluster.dot.name = cluster_id
             for sid in group.services:
                 cls = type_map[sid]
-                nodes[sid] = cls(diagram_def.services[sid].label)
+                sdef = diagram_def.services[sid]
+                nodes[sid] = cls(nohtml(sdef.label), nodeid=sid, **_node_attrs(sid, sdef.attrs, images or {}, plain))
                 grouped_ids.add(sid)
-            _render_groups(group.children, diagram_def, type_map, nodes, grouped_ids)
+            _render_groups(
+                group.children, diagram_def, type_map, nodes, grouped_ids, cluster_id, images, plain
+            )
+
+
+def _node_attrs(
+    sid: str, attrs: dict[str, str], images: dict[str, str], plain: bool = False
+) -> dict[str, str]:
+    """A service's own attrs, plus its scaled icon if there is one.
+
+    Plain nodes get box attributes instead of an icon; the service's attrs
+    still win.
+    """
+    if plain:
+        return {**PLAIN_NODE_ATTRS, **attrs}
+    if sid in images:
+        return {"image": images[sid], **attrs}
+    return attrs
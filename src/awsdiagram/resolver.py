@@ -1,41 +1,97 @@
-"""Dynamic type resolution: maps 'category.ClassName' to diagrams.aws.* classes."""
+"""Dynamic type resolution: maps '[provider:]category.ClassName' to diagrams classes.
 
+A bare 'compute.EC2' is an AWS type. Other providers are named with a
+prefix, as in 'onprem:network.Nginx' or 'k8s:compute.Pod'. Each provider has
+a catalog that is created the first time one of its types is resolved. The
+catalog imports a category module only when a type in that category is
+looked up, so an all-AWS diagram never imports the other providers.
+"""
+
+import functools
 import importlib
+import pkgutil
 import shutil
 
 from .errors import GraphvizNotFoundError, TypeResolutionError
+from .metrics import timed
 from .models import ServiceDef
 
+DEFAULT_PROVIDER = "aws"
+PROVIDERS = ("aws", "onprem", "k8s", "saas")
 
-def resolve_type(type_str: str) -> type:
-    """Resolve a type string like 'compute.EC2' to diagrams.aws.compute.EC2."""
-    parts = type_str.split(".", 1)
-    if len(parts) != 2:
-        raise TypeResolutionError(
-            f"Invalid type format '{type_str}'. Expected 'category.ClassName'."
-        )
 
-    category, classname = parts
-    module_path = f"diagrams.aws.{category}"
+class ProviderCatalog:
+    """The node classes of one provider package, ``diagrams.<provider>``."""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.package = f"diagrams.{provider}"
+        self._modules: dict[str, object] = {}
+
+    @functools.cached_property
+    def categories(self) -> list[str]:
+        """Category modules in the package, listed without importing them."""
+        package = importlib.import_module(self.package)
+        return sorted(m.name for m in pkgutil.iter_modules(package.__path__) if not m.name.startswith("_"))
+
+    def module(self, category: str):
+        """Import ``category`` on first use."""
+        if category in self._modules:
+            return self._modules[category]
+        try:
+            mod = importlib.import_module(f"{self.package}.{category}")
+        except ModuleNotFoundError:
+            raise TypeResolutionError(
+                f"Unknown category '{category}'. "
+                f"No module '{self.package}.{category}' found. "
+                f"Available: {', '.join(self.categories)}"
+            )
+        self._modules[category] = mod
+        return mod
 
-    try:
-        mod = importlib.import_module(module_path)
-    except ModuleNotFoundError:
+    def lookup(self, category: str, classname: str) -> type:
+        mod = self.module(category)
+        cls = getattr(mod, classname, None)
+        if not isinstance(cls, type):
+            available = [n for n in dir(mod) if not n.startswith("_")]
+            raise TypeResolutionError(
+                f"Unknown class '{classname}' in {self.package}.{category}. "
+                f"Available: {', '.join(available)}"
+            )
+        return cls
+
+
+@functools.lru_cache(maxsize=None)
+def catalog(provider: str) -> ProviderCatalog:
+    """The memoized catalog for ``provider``, one of PROVIDERS."""
+    if provider not in PROVIDERS:
         raise TypeResolutionError(
-            f"Unknown category '{category}'. "
-            f"No module 'diagrams.aws.{category}' found. "
-            f"Check available categories at: diagrams.aws.*"
+            f"Unknown provider '{provider}'. Available: {', '.join(PROVIDERS)}"
         )
+    return ProviderCatalog(provider)
 
-    cls = getattr(mod, classname, None)
-    if cls is None:
-        available = [n for n in dir(mod) if not n.startswith("_")]
+
+def split_type(type_str: str) -> tuple[str, str, str]:
+    """Split '[provider:]category.ClassName' into (provider, category, class name)."""
+    provider, sep, rest = type_str.rpartition(":")
+    parts = rest.split(".", 1)
+    if len(parts) != 2 or (sep and not provider):
         raise TypeResolutionError(
-            f"Unknown class '{classname}' in diagrams.aws.{category}. "
-            f"Available: {', '.join(available)}"
+            f"Invalid type format '{type_str}'. Expected '[provider:]category.ClassName'."
         )
+    return provider or DEFAULT_PROVIDER, parts[0], parts[1]
 
-    return cls
+
+@functools.lru_cache(maxsize=None)
+def resolve_type(type_str: str) -> type:
+    """Resolve a type string like 'compute.EC2' to diagrams.aws.compute.EC2.
+
+    'onprem:network.Nginx' resolves to diagrams.onprem.network.Nginx in the
+    same way. Results are memoized, so every diagram rendered in a process
+    shares one resolution per distinct type.
+    """
+    provider, category, classname = split_type(type_str)
+    return catalog(provider).lookup(category, classname)
 
 
 def check_graphviz() -> None:
@@ -53,11 +109,12 @@ def validate_all_types(services: dict[str, ServiceDef]) -> dict[str, type]:
     type_map = {}
     errors = []
 
-    for sid, sdef in services.items():
-        try:
-            type_map[sid] = resolve_type(sdef.type)
-        except TypeResolutionError as e:
-            errors.append(f"  {sid}: {e}")
+    with timed("resolve"):
+        for sid, sdef in services.items():
+            try:
+                type_map[sid] = resolve_type(sdef.type)
+            except TypeResolutionError as e:
+                errors.append(f"  {sid}: {e}")
 
     if errors:
         raise TypeResolutionError(
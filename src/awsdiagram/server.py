@@ -0,0 +1,303 @@
+"""Local HTTP render service: POST YAML or Terraform JSON, get PNG/SVG back."""
+
+import hashlib
+import json
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from . import __version__
+from .errors import (
+    AwsDiagramError,
+    GraphvizNotFoundError,
+    RenderError,
+    ServiceBusyError,
+    TerraformImportError,
+    YamlLoadError,
+)
+from .icons import IconCache
+from .metrics import OPENMETRICS_CONTENT_TYPE, REGISTRY, inc, record_diagram
+from .parser import parse_string
+from .renderer import OUTPUT_FORMATS, render
+from .svg import optimize_svg_file
+
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+SOURCE_KINDS = ("yaml", "terraform")
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+class RenderCache:
+    """Thread-safe LRU cache of rendered outputs keyed by content hash."""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        inc("awsdiagram_cache_requests", cache="render", result="miss" if data is None else "hit")
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class RenderService:
+    """Runs renders on a bounded worker pool and caches their output.
+
+    At most ``workers`` renders run at once and at most ``queue_size`` more
+    wait for a worker; anything beyond that is rejected with ServiceBusyError
+    rather than queued without bound.
+    """
+
+    def __init__(self, workers: int = 4, queue_size: int = 16, cache_size: int = 128):
+        self.workers = workers
+        self.cache = RenderCache(cache_size)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="awsdiagram-render"
+        )
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    @staticmethod
+    def cache_key(body: bytes, source: str, outformat: str) -> str:
+        """Content hash of a request; also used as its ETag."""
+        h = hashlib.sha256()
+        h.update(f"{__version__}\0{source}\0{outformat}\0".encode())
+        h.update(body)
+        return h.hexdigest()
+
+    def render(self, body: bytes, source: str, outformat: str) -> tuple[str, bytes]:
+        """Render a request body, serving repeats from the cache. Returns (key, data)."""
+        key = self.cache_key(body, source, outformat)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return key, cached
+
+        if not self._slots.acquire(blocking=False):
+            raise ServiceBusyError("All render workers are busy, retry later.")
+        try:
+            data = self._executor.submit(render_bytes, body, source, outformat).result()
+        finally:
+            self._slots.release()
+
+        self.cache.put(key, data)
+        return key, data
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def render_bytes(body: bytes, source: str, outformat: str) -> bytes:
+    """Run the parse/resolve/render pipeline on an in-memory document.
+
+    SVG icons are inlined, so clients never see paths on the server.
+    """
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise YamlLoadError(f"Request body is not valid UTF-8: {e}")
+
+    if source == "terraform":
+        from .terraform.importer import import_terraform_data
+
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise TerraformImportError(f"Failed to read Terraform JSON: {e}")
+        text = import_terraform_data(data)
+
+    diagram = parse_string(text, source="request body")
+    with tempfile.TemporaryDirectory(prefix="awsdiagram-") as tmp:
+        path = render(diagram, str(Path(tmp) / "diagram"), outformat, icon_cache=IconCache())
+        if outformat == "svg":
+            optimize_svg_file(path, inline_icons=True)
+        data = Path(path).read_bytes()
+    record_diagram(diagram, outformat)
+    return data
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """Routes ``GET /health``, ``GET /metrics`` and ``POST /render``."""
+
+    server: "RenderHTTPServer"
+    server_version = f"awsdiagram/{__version__}"
+
+    def do_GET(self) -> None:
+        if urlparse(self.path).path == "/metrics":
+            body = REGISTRY.to_openmetrics().encode()
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if urlparse(self.path).path != "/health":
+            self._send_error(HTTPStatus.NOT_FOUND, f"No route for GET {self.path}")
+            return
+        service = self.server.service
+        self._send_json(
+            HTTPStatus.OK,
+            {
+                "status": "ok",
+                "version": __version__,
+                "graphviz": shutil.which("dot") is not None,
+                "workers": service.workers,
+                "cache_entries": len(service.cache),
+                "cache_hits": service.cache.hits,
+                "cache_misses": service.cache.misses,
+            },
+        )
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/render":
+            self._send_error(HTTPStatus.NOT_FOUND, f"No route for POST {self.path}")
+            return
+
+        query = parse_qs(url.query)
+        outformat = query.get("format", ["png"])[0]
+        if outformat not in OUTPUT_FORMATS:
+            self._send_error(
+                HTTPStatus.BAD_REQUEST,
+                f"Unsupported format '{outformat}'. Expected one of: {', '.join(OUTPUT_FORMATS)}",
+            )
+            return
+
+        content_type = self.headers.get("Content-Type", "")
+        default_source = "terraform" if "json" in content_type else "yaml"
+        source = query.get("source", [default_source])[0]
+        if source not in SOURCE_KINDS:
+            self._send_error(
+                HTTPStatus.BAD_REQUEST,
+                f"Unsupported source '{source}'. Expected one of: {', '.join(SOURCE_KINDS)}",
+            )
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_error(HTTPStatus.BAD_REQUEST, "Invalid Content-Length header")
+            return
+        if length == 0:
+            self._send_error(HTTPStatus.LENGTH_REQUIRED, "Request body is required")
+            return
+        if length > MAX_BODY_BYTES:
+            self._send_error(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Request body exceeds {MAX_BODY_BYTES} bytes",
+            )
+            return
+        body = self.rfile.read(length)
+
+        service = self.server.service
+        etag = f'"{service.cache_key(body, source, outformat)}"'
+        if etag in _parse_etags(self.headers.get("If-None-Match", "")):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        try:
+            _, data = service.render(body, source, outformat)
+        except ServiceBusyError as e:
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, str(e), e, {"Retry-After": "1"})
+            return
+        except (GraphvizNotFoundError, RenderError) as e:
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e), e)
+            return
+        except AwsDiagramError as e:
+            self._send_error(HTTPStatus.UNPROCESSABLE_ENTITY, str(e), e)
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CONTENT_TYPES[outformat])
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: HTTPStatus, payload: dict, headers: dict | None = None) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(
+        self,
+        status: HTTPStatus,
+        message: str,
+        exc: Exception | None = None,
+        headers: dict | None = None,
+    ) -> None:
+        payload = {"error": message, "status": status.value}
+        if exc is not None:
+            payload["type"] = type(exc).__name__
+        self._send_json(status, payload, headers)
+
+
+class RenderHTTPServer(ThreadingHTTPServer):
+    """HTTP server that owns a RenderService."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], service: RenderService, verbose: bool = False):
+        super().__init__(address, RenderRequestHandler)
+        self.service = service
+        self.verbose = verbose
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.service.shutdown()
+
+
+def make_server(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    workers: int = 4,
+    queue_size: int = 16,
+    cache_size: int = 128,
+    verbose: bool = False,
+) -> RenderHTTPServer:
+    """Create (but don't start) a render server. Port 0 picks a free port."""
+    service = RenderService(workers=workers, queue_size=queue_size, cache_size=cache_size)
+    return RenderHTTPServer((host, port), service, verbose=verbose)
+
+
+def _parse_etags(header: str) -> set[str]:
+    return {tag.strip() for tag in header.split(",") if tag.strip()}
@@ -0,0 +1,150 @@
+"""Complexity metrics for a DiagramDef and a predicted Graphviz render cost.
+
+The prediction is a linear model over a few structural features. The
+shipped coefficients are uncalibrated placeholders, so treat predictions as
+rough orders of magnitude. Calibrate by timing ``dot`` on synthetic diagrams
+with ``benchmarks/render_cost.py`` on the target machine and Graphviz
+release, then paste its output below. Until then fit_cost is not wired into
+``render``; only the ``stats`` command reports predictions.
+"""
+
+from pydantic import BaseModel
+
+from .errors import CostLimitError
+from .graph import CompactGraph, CompactGroup
+from .models import DiagramDef
+from .views import DisjointSet, collapse_view
+
+# UNCALIBRATED placeholders, not measured values: replace them with the output
+# of benchmarks/render_cost.py. Features: 1, nodes, edges, nodes * cross-cluster edges.
+TIME_COEFFICIENTS = (0.9, 0.0035, 0.0021, 4.0e-6)
+# Peak RSS in MB (features: 1, nodes, edges), also uncalibrated.
+MEMORY_COEFFICIENTS = (85.0, 0.11, 0.012)
+
+
+class RenderEstimate(BaseModel):
+    """Predicted wall time and peak memory of a single render."""
+
+    seconds: float
+    memory_mb: float
+
+
+class DiagramStats(BaseModel):
+    """Structural metrics of one diagram."""
+
+    name: str
+    services: int
+    edges: int
+    clusters: int
+    max_depth: int
+    max_fan_in: int
+    max_fan_in_service: str | None
+    max_fan_out: int
+    max_fan_out_service: str | None
+    cross_cluster_edges: int
+    components: int
+    estimate: RenderEstimate
+
+
+def compute_stats(diagram: DiagramDef | CompactGraph) -> DiagramStats:
+    """Measure ``diagram`` and predict what rendering it will cost."""
+    graph = diagram if isinstance(diagram, CompactGraph) else CompactGraph.from_diagram(diagram)
+    n = len(graph)
+    innermost = [-1] * n
+    sets = DisjointSet(range(n))
+    clusters = 0
+    max_depth = 0
+
+    def _walk(groups: list[CompactGroup], depth: int) -> None:
+        nonlocal clusters, max_depth
+        for group in groups:
+            for i in group.members:
+                innermost[i] = clusters
+            clusters += 1
+            max_depth = max(max_depth, depth)
+            _walk(group.children, depth + 1)
+
+    _walk(graph.groups, 1)
+
+    # Members of one top-level group lay out together, as in views.components().
+    for group in graph.groups:
+        members = _all_members(group)
+        for i in members[1:]:
+            sets.union(members[0], i)
+
+    fan_in = [0] * n
+    fan_out = [0] * n
+    edges = 0
+    cross = 0
+    for src, dst in graph.edges():
+        edges += 1
+        fan_out[src] += 1
+        fan_in[dst] += 1
+        if innermost[src] != innermost[dst]:
+            cross += 1
+        sets.union(src, dst)
+
+    max_fan_in, max_fan_in_service = _busiest(fan_in, graph.ids)
+    max_fan_out, max_fan_out_service = _busiest(fan_out, graph.ids)
+    return DiagramStats(
+        name=graph.name,
+        services=n,
+        edges=edges,
+        clusters=clusters,
+        max_depth=max_depth,
+        max_fan_in=max_fan_in,
+        max_fan_in_service=max_fan_in_service,
+        max_fan_out=max_fan_out,
+        max_fan_out_service=max_fan_out_service,
+        cross_cluster_edges=cross,
+        components=len({sets.find(i) for i in range(n)}),
+        estimate=estimate(n, edges, cross),
+    )
+
+
+def estimate(nodes: int, edges: int, cross_cluster_edges: int) -> RenderEstimate:
+    """Predict render time and memory from the model's features."""
+    t0, t_node, t_edge, t_cross = TIME_COEFFICIENTS
+    m0, m_node, m_edge = MEMORY_COEFFICIENTS
+    return RenderEstimate(
+        seconds=t0 + t_node * nodes + t_edge * edges + t_cross * nodes * cross_cluster_edges,
+        memory_mb=m0 + m_node * nodes + m_edge * edges,
+    )
+
+
+def _busiest(counts: list[int], ids: list[str]) -> tuple[int, str | None]:
+    """The highest count and its service, or (0, None) when nothing is connected."""
+    top = max(range(len(counts)), key=counts.__getitem__, default=None)
+    if top is None or not counts[top]:
+        return 0, None
+    return counts[top], ids[top]
+
+
+def _all_members(group: CompactGroup) -> list[int]:
+    members = list(group.members)
+    for child in group.children:
+        members.extend(_all_members(child))
+    return members
+
+
+def fit_cost(diagram: DiagramDef, max_seconds: float, degrade: bool = False) -> DiagramDef:
+    """Return ``diagram`` if its predicted render time is within ``max_seconds``.
+
+    Otherwise, with ``degrade``, collapse groups one nesting level at a time
+    until the prediction fits; without it, or if even fully collapsed groups
+    don't fit, raise CostLimitError.
+    """
+    stats = compute_stats(diagram)
+    if stats.estimate.seconds <= max_seconds:
+        return diagram
+
+    if degrade:
+        for depth in range(stats.max_depth - 1, -1, -1):
+            collapsed = collapse_view(diagram, depth)
+            if compute_stats(collapsed).estimate.seconds <= max_seconds:
+                return collapsed
+
+    raise CostLimitError(
+        f"Diagram '{diagram.name}' is predicted to take {stats.estimate.seconds:.1f}s "
+        f"to render, over the {max_seconds:g}s limit"
+    )
@@ -0,0 +1,118 @@
+"""Post-processing for Graphviz SVG output: shared icon symbols and trimming."""
+
+import base64
+import mimetypes
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from .errors import RenderError
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+_HREF = f"{{{XLINK_NS}}}href"
+
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+
+# Attribute values that match the SVG defaults and can be dropped.
+_DEFAULT_ATTRS = {
+    "stroke": "none",
+    "text-anchor": "start",
+    "font-style": "normal",
+    "font-weight": "normal",
+    "stroke-width": "1",
+    "opacity": "1",
+}
+
+
+def optimize_svg(svg: str, inline_icons: bool = False) -> str:
+    """Rewrite Graphviz SVG so each distinct icon is defined only once.
+
+    Every ``<image>`` is replaced by a ``<use>`` of a shared ``<symbol>``,
+    comments and default-valued attributes are dropped, and with
+    ``inline_icons`` the icon files are embedded as data URIs so the result
+    is a single self-contained file.
+    """
+    try:
+        root = ET.fromstring(svg)
+    except ET.ParseError as e:
+        raise RenderError(f"Invalid SVG: {e}")
+
+    symbols: dict[tuple[str, str, str, str], str] = {}
+    defs = ET.Element(f"{{{SVG_NS}}}defs")
+
+    for parent in root.iter():
+        for i, child in enumerate(list(parent)):
+            if child.tag != f"{{{SVG_NS}}}image":
+                continue
+            href = child.get(_HREF) or child.get("href", "")
+            width = _strip_px(child.get("width", "0"))
+            height = _strip_px(child.get("height", "0"))
+            aspect = child.get("preserveAspectRatio", "")
+            key = (href, width, height, aspect)
+
+            symbol_id = symbols.get(key)
+            if symbol_id is None:
+                symbol_id = f"icon{len(symbols)}"
+                symbols[key] = symbol_id
+                defs.append(_make_symbol(symbol_id, href, width, height, aspect, inline_icons))
+
+            use = ET.Element(f"{{{SVG_NS}}}use")
+            use.set(_HREF, f"#{symbol_id}")
+            for attr in ("x", "y"):
+                if child.get(attr) is not None:
+                    use.set(attr, child.get(attr))
+            use.set("width", width)
+            use.set("height", height)
+            parent.remove(child)
+            parent.insert(i, use)
+
+    if symbols:
+        root.insert(0, defs)
+
+    for element in root.iter():
+        for attr, default in _DEFAULT_ATTRS.items():
+            if element.get(attr) == default:
+                del element.attrib[attr]
+
+    return ET.tostring(root, encoding="unicode", xml_declaration=False)
+
+
+def optimize_svg_file(path: str | Path, inline_icons: bool = False) -> None:
+    """Optimize an SVG file in place."""
+    path = Path(path)
+    try:
+        svg = path.read_text(encoding="utf-8")
+    except OSError as e:
+        raise RenderError(f"Failed to read SVG {path}: {e}")
+    path.write_text(optimize_svg(svg, inline_icons), encoding="utf-8")
+
+
+def _make_symbol(
+    symbol_id: str, href: str, width: str, height: str, aspect: str, inline: bool
+) -> ET.Element:
+    symbol = ET.Element(f"{{{SVG_NS}}}symbol", {"id": symbol_id, "viewBox": f"0 0 {width} {height}"})
+    image = ET.SubElement(symbol, f"{{{SVG_NS}}}image")
+    image.set(_HREF, _data_uri(href) if inline else href)
+    image.set("width", width)
+    image.set("height", height)
+    if aspect:
+        image.set("preserveAspectRatio", aspect)
+    return symbol
+
+
+def _data_uri(href: str) -> str:
+    """Embed a local icon file as a data URI; leave anything else untouched."""
+    if not href or href.startswith(("data:", "http:", "https:")):
+        return href
+    path = Path(href.removeprefix("file://"))
+    try:
+        data = path.read_bytes()
+    except OSError as e:
+        raise RenderError(f"Failed to inline icon {path}: {e}")
+    mime = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def _strip_px(value: str) -> str:
+    return value[:-2] if value.endswith("px") else value
@@ -0,0 +1,154 @@
+"""Expansion of 'templates:' and their 'instances:' into a diagram block.
+
+Each template is validated once. Instances are then generated directly as
+model objects, so parsing costs template size plus instance count rather
+than the size of the equivalent hand-written YAML. Generated models skip
+re-validation when the surrounding DiagramDef is built.
+"""
+
+from collections.abc import Iterator
+from string import Template
+
+from pydantic import ValidationError
+
+from .errors import SchemaValidationError
+from .models import ConnectionDef, GroupDef, InstanceDef, ServiceDef, TemplateBlock, TemplateDef
+
+TEMPLATE_KEYS = ("templates", "instances")
+
+
+def expand_templates(block: dict) -> dict:
+    """Return ``block`` with every instance's services, groups and connections added."""
+    try:
+        spec = TemplateBlock.model_validate({k: block[k] for k in TEMPLATE_KEYS if k in block})
+    except ValidationError as e:
+        raise SchemaValidationError(f"Schema validation failed:\n{e}") from e
+
+    services = dict(block.get("services") or {})
+    groups = list(block.get("groups") or [])
+    connections = list(block.get("connections") or [])
+    compiled: dict[str, _CompiledTemplate] = {}
+
+    for instance in spec.instances:
+        if instance.template not in spec.templates:
+            raise SchemaValidationError(
+                f"Instance references unknown template '{instance.template}'. "
+                f"Defined templates: {', '.join(spec.templates) or 'none'}"
+            )
+        if instance.template not in compiled:
+            compiled[instance.template] = _CompiledTemplate(spec.templates[instance.template])
+        template = compiled[instance.template]
+
+        for key, variables in _keys(instance):
+            new_services, new_groups, new_connections = template.instantiate(
+                instance, key, variables
+            )
+            for sid, sdef in new_services:
+                if sid in services:
+                    raise SchemaValidationError(
+                        f"Instance '{key}' of template '{instance.template}' generates "
+                        f"service ID '{sid}', which is already defined"
+                    )
+                services[sid] = sdef
+            groups.extend(new_groups)
+            connections.extend(new_connections)
+
+    expanded = {k: v for k, v in block.items() if k not in TEMPLATE_KEYS}
+    expanded.update(services=services, groups=groups, connections=connections)
+    return expanded
+
+
+class _CompiledTemplate:
+    """A template with its label and name patterns parsed once."""
+
+    def __init__(self, template: TemplateDef):
+        self.template = template
+        self.labels = {lid: Template(s.label) for lid, s in template.services.items()}
+        self.grouped = _group_members(template.groups)
+
+    def instantiate(
+        self, instance: InstanceDef, key: str, variables: dict[str, str]
+    ) -> tuple[list[tuple[str, ServiceDef]], list[GroupDef], list[ConnectionDef]]:
+        values = {**variables, "key": key}
+        id_pattern = Template(instance.id_format)
+        ids = {
+            lid: _substitute(id_pattern, {**values, "id": lid}, instance)
+            for lid in self.template.services
+        }
+
+        services = [
+            (
+                ids[lid],
+                ServiceDef.model_construct(
+                    type=sdef.type,
+                    label=_substitute(self.labels[lid], values, instance),
+                    attrs=sdef.attrs,
+                ),
+            )
+            for lid, sdef in self.template.services.items()
+        ]
+
+        groups = [_rename_group(g, ids, values, instance) for g in self.template.groups]
+        if instance.group is not None:
+            loose = [ids[lid] for lid in self.template.services if lid not in self.grouped]
+            groups = [
+                GroupDef.model_construct(
+                    name=_substitute(Template(instance.group), values, instance),
+                    services=loose,
+                    children=groups,
+                )
+            ]
+
+        connections = [
+            _rename_connection(c, ids, values, instance)
+            for c in self.template.connections + instance.connections
+        ]
+        return services, groups, connections
+
+
+def _keys(instance: InstanceDef) -> Iterator[tuple[str, dict[str, str]]]:
+    if isinstance(instance.for_each, dict):
+        yield from instance.for_each.items()
+    else:
+        for key in instance.for_each:
+            yield key, {}
+
+
+def _substitute(pattern: Template, values: dict[str, str], instance: InstanceDef) -> str:
+    try:
+        return pattern.substitute(values)
+    except KeyError as e:
+        raise SchemaValidationError(
+            f"Template '{instance.template}' uses undefined variable {e} in '{pattern.template}'"
+        )
+    except ValueError as e:
+        raise SchemaValidationError(
+            f"Template '{instance.template}': invalid placeholder in '{pattern.template}': {e}"
+        )
+
+
+def _rename_group(
+    group: GroupDef, ids: dict[str, str], values: dict[str, str], instance: InstanceDef
+) -> GroupDef:
+    return GroupDef.model_construct(
+        name=_substitute(Template(group.name), values, instance),
+        services=[ids.get(sid, sid) for sid in group.services],
+        children=[_rename_group(child, ids, values, instance) for child in group.children],
+    )
+
+
+def _rename_connection(
+    conn: ConnectionDef, ids: dict[str, str], values: dict[str, str], instance: InstanceDef
+) -> ConnectionDef:
+    """Map local IDs to generated ones; other IDs refer to the enclosing diagram."""
+    to = [ids.get(t, t) for t in conn.to] if isinstance(conn.to, list) else ids.get(conn.to, conn.to)
+    label = None if conn.label is None else _substitute(Template(conn.label), values, instance)
+    return ConnectionDef.model_construct(from_=ids.get(conn.from_, conn.from_), to=to, label=label)
+
+
+def _group_members(groups: list[GroupDef]) -> set[str]:
+    members: set[str] = set()
+    for group in groups:
+        members.update(group.services)
+        members.update(_group_members(group.children))
+    return members
@@ -0,0 +1,228 @@
+"""Change-scoped diagrams from a plan's ``resource_changes``.
+
+Only resources the plan creates, updates, replaces or destroys are kept,
+plus the resources within ``radius`` hops of them. Hops follow references
+between resources, taken from the plan's ``configuration`` section and from
+attribute values that mention another resource's ``id`` or ``arn``. Those
+references also become the diagram's connections. Changed nodes are styled
+and labelled by action so a PR preview shows at a glance what moves.
+"""
+
+import json
+import re
+from collections import Counter, deque
+from collections.abc import Iterator
+from pathlib import Path
+
+import yaml
+
+from ..errors import TerraformImportError
+from .importer import CLOUD_GROUP, group_key, group_name, make_service_id, resource_label
+from .rules import TypeMapper, default_mapper
+
+ACTION_STYLES: dict[str, dict[str, str]] = {
+    "create": {"shape": "box", "style": "rounded,bold", "color": "#2e7d32", "fontcolor": "#2e7d32"},
+    "update": {"shape": "box", "style": "rounded,bold", "color": "#f9a825", "fontcolor": "#8d6e00"},
+    "replace": {"shape": "box", "style": "rounded,bold", "color": "#ef6c00", "fontcolor": "#ef6c00"},
+    "delete": {"shape": "box", "style": "rounded,dashed", "color": "#c62828", "fontcolor": "#c62828"},
+    "no-op": {"fontcolor": "#9e9e9e"},
+}
+
+_INDEX = re.compile(r"\[[^\]]*\]")
+_NON_RESOURCE_REFS = ("var", "local", "module", "each", "count", "path", "self", "terraform")
+
+
+def import_terraform_changes(
+    path: str | Path,
+    radius: int = 1,
+    mapper: TypeMapper | None = None,
+    unmapped: Counter | None = None,
+) -> str:
+    """Read a JSON plan and return YAML DSL for just the changed resources."""
+    path = Path(path)
+    if not path.exists():
+        raise TerraformImportError(f"File not found: {path}")
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, OSError) as e:
+        raise TerraformImportError(f"Failed to read Terraform JSON: {e}")
+    return import_terraform_changes_data(data, radius, mapper, unmapped)
+
+
+def import_terraform_changes_data(
+    data: dict,
+    radius: int = 1,
+    mapper: TypeMapper | None = None,
+    unmapped: Counter | None = None,
+) -> str:
+    """Like import_terraform_changes(), for an already-loaded plan."""
+    if not isinstance(data, dict) or not isinstance(data.get("resource_changes"), list):
+        raise TerraformImportError(
+            "No resource_changes found. Expected the output of "
+            "'terraform show -json <planfile>'."
+        )
+    mapper = mapper or default_mapper()
+
+    resources = list(_changed_resources(data["resource_changes"], mapper, unmapped))
+    if not any(res["action"] != "no-op" for res in resources):
+        raise TerraformImportError("The plan makes no changes to mappable resources.")
+
+    references = _references(resources, data.get("configuration") or {})
+    keep = _neighborhood(resources, references, radius)
+    return _build_yaml([resources[i] for i in sorted(keep)], references, keep)
+
+
+def plan_action(actions: list[str]) -> str:
+    """Collapse a change's action list into create/update/replace/delete/no-op."""
+    if "delete" in actions and "create" in actions:
+        return "replace"
+    for action in ("create", "update", "delete"):
+        if action in actions:
+            return action
+    return "no-op"
+
+
+def _changed_resources(
+    changes: list[dict], mapper: TypeMapper, unmapped: Counter | None
+) -> Iterator[dict]:
+    """One pass over resource_changes, yielding mapped managed resources."""
+    for rc in changes:
+        if rc.get("mode", "managed") != "managed":
+            continue
+        res_type = rc.get("type", "")
+        diagram_type = mapper.lookup(res_type)
+        if diagram_type is None:
+            if unmapped is not None and not mapper.covers(res_type):
+                unmapped[res_type] += 1
+            continue
+        change = rc.get("change") or {}
+        action = plan_action(change.get("actions") or [])
+        after = change.get("after")
+        before = change.get("before")
+        yield {
+            "address": rc.get("address", f"{res_type}.{rc.get('name', 'unnamed')}"),
+            "type": res_type,
+            "name": rc.get("name", "unnamed"),
+            "diagram_type": diagram_type,
+            "action": action,
+            "values": after if isinstance(after, dict) else before or {},
+            "before": before or {},
+        }
+
+
+def _references(resources: list[dict], configuration: dict) -> dict[int, set[int]]:
+    """Directed references between resources: index → indices it refers to."""
+    by_config: dict[str, list[int]] = {}
+    by_value: dict[str, int] = {}
+    for i, res in enumerate(resources):
+        by_config.setdefault(_INDEX.sub("", res["address"]), []).append(i)
+        for values in (res["before"], res["values"]):
+            for key in ("id", "arn"):
+                if isinstance(values.get(key), str) and values[key]:
+                    by_value[values[key]] = i
+
+    refs: dict[int, set[int]] = {}
+    for source, targets in _config_references(configuration.get("root_module") or {}, ""):
+        for i in by_config.get(source, []):
+            for target in targets:
+                refs.setdefault(i, set()).update(j for j in by_config.get(target, []) if j != i)
+
+    for i, res in enumerate(resources):
+        for text in _strings(res["values"]):
+            j = by_value.get(text)
+            if j is not None and j != i:
+                refs.setdefault(i, set()).add(j)
+    return refs
+
+
+def _config_references(module: dict, prefix: str) -> Iterator[tuple[str, set[str]]]:
+    """(resource address, referenced resource addresses) from a configuration module."""
+    for resource in module.get("resources") or []:
+        targets = set()
+        for ref in _expression_refs(resource.get("expressions") or {}):
+            parts = ref.split(".")
+            if parts[0] in _NON_RESOURCE_REFS:
+                continue
+            length = 3 if parts[0] == "data" else 2
+            if len(parts) >= length:
+                targets.add(prefix + _INDEX.sub("", ".".join(parts[:length])))
+        yield prefix + resource.get("address", ""), targets
+    for name, call in (module.get("module_calls") or {}).items():
+        yield from _config_references(call.get("module") or {}, f"{prefix}module.{name}.")
+
+
+def _expression_refs(expressions: object) -> Iterator[str]:
+    if isinstance(expressions, dict):
+        for key, value in expressions.items():
+            if key == "references" and isinstance(value, list):
+                yield from (r for r in value if isinstance(r, str))
+            else:
+                yield from _expression_refs(value)
+    elif isinstance(expressions, list):
+        for item in expressions:
+            yield from _expression_refs(item)
+
+
+def _strings(value: object) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def _neighborhood(resources: list[dict], refs: dict[int, set[int]], radius: int) -> set[int]:
+    adjacency: dict[int, set[int]] = {}
+    for i, targets in refs.items():
+        for j in targets:
+            adjacency.setdefault(i, set()).add(j)
+            adjacency.setdefault(j, set()).add(i)
+
+    keep = {i for i, res in enumerate(resources) if res["action"] != "no-op"}
+    queue = deque((i, 0) for i in keep)
+    while queue:
+        i, depth = queue.popleft()
+        if depth == radius:
+            continue
+        for j in adjacency.get(i, ()):
+            if j not in keep:
+                keep.add(j)
+                queue.append((j, depth + 1))
+    return keep
+
+
+def _build_yaml(resources: list[dict], refs: dict[int, set[int]], keep: set[int]) -> str:
+    services: dict[str, dict] = {}
+    network: dict[str, list[str]] = {}
+    sid_of: dict[int, str] = {}
+
+    for index, res in zip(sorted(keep), resources):
+        sid = make_service_id(res["name"], res["type"], services)
+        sid_of[index] = sid
+        label = resource_label(res)
+        service = {"type": res["diagram_type"], "label": label}
+        if res["action"] != "no-op":
+            service["label"] = f"{label}\n({res['action']})"
+        service["attrs"] = dict(ACTION_STYLES[res["action"]])
+        services[sid] = service
+
+        key = group_key(res)
+        if key is not None:
+            network.setdefault(key, []).append(sid)
+
+    connections = [
+        {"from": sid_of[i], "to": [sid_of[j] for j in sorted(refs[i]) if j in sid_of]}
+        for i in sorted(refs)
+        if i in sid_of and any(j in sid_of for j in refs[i])
+    ]
+
+    block: dict = {"name": "Planned Changes", "services": services}
+    if network:
+        children = [{"name": group_name(key), "services": sids} for key, sids in network.items()]
+        block["groups"] = [{"name": CLOUD_GROUP, "children": children}]
+    block["connections"] = connections
+    return yaml.dump({"diagram": block}, default_flow_style=False, sort_keys=False)
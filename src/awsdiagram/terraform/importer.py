@@ -2,34 +2,73 @@
 
 import json
 import re
+from collections import Counter
+from collections.abc import Iterable
 from pathlib import Path
 
 import yaml
 
 from ..errors import TerraformImportError
-from .mappings import TERRAFORM_TO_DIAGRAMS
+from .rules import TypeMapper, default_mapper
+from .state import is_raw_state, iter_state_resources, raw_state_version, state_resources
 
+CLOUD_GROUP = "AWS Cloud"
 
-def import_terraform(path: str | Path) -> str:
-    """Read a Terraform JSON file and return YAML DSL string."""
+
+def import_terraform(
+    path: str | Path, mapper: TypeMapper | None = None, unmapped: Counter | None = None
+) -> str:
+    """Read a Terraform JSON file and return YAML DSL string.
+
+    Raw state files (``terraform.tfstate``) are streamed resource by
+    resource; plan and ``terraform show -json`` output is loaded whole.
+    Resource types no rule in ``mapper`` covers are counted in ``unmapped``.
+    """
+    return _build_yaml(load_resources(path), mapper, unmapped)
+
+
+def import_terraform_data(
+    data: dict, mapper: TypeMapper | None = None, unmapped: Counter | None = None
+) -> str:
+    """Convert already-loaded Terraform JSON into a YAML DSL string."""
+    return _build_yaml(resources_from_data(data), mapper, unmapped)
+
+
+def load_resources(path: str | Path) -> Iterable[dict]:
+    """The resources in a Terraform JSON file, streamed for raw state files."""
     path = Path(path)
     if not path.exists():
         raise TerraformImportError(f"File not found: {path}")
 
     try:
+        if raw_state_version(path) is not None:
+            return iter_state_resources(path)
         with open(path) as f:
             data = json.load(f)
     except (json.JSONDecodeError, OSError) as e:
         raise TerraformImportError(f"Failed to read Terraform JSON: {e}")
 
+    return resources_from_data(data)
+
+
+def resources_from_data(data: dict) -> Iterable[dict]:
+    """The resources in already-loaded plan, show -json or raw state JSON."""
+    if not isinstance(data, dict):
+        raise TerraformImportError(
+            f"Expected a JSON object, got {type(data).__name__}"
+        )
+
+    if is_raw_state(data):
+        return state_resources(data)
+
     resources = _extract_resources(data)
     if not resources:
         raise TerraformImportError(
             "No resources found. Expected Terraform plan "
-            "(planned_values.root_module) or state (values.root_module) format."
+            "(planned_values.root_module), state (values.root_module) "
+            "or raw state (version 4 resources) format."
         )
-
-    return _build_yaml(resources)
+    return resources
 
 
 def _extract_resources(data: dict) -> list[dict]:
@@ -56,8 +95,11 @@ def _collect_child_modules(module: dict, resources: list[dict]) -> None:
         _collect_child_modules(child, resources)
 
 
-def _build_yaml(resources: list[dict]) -> str:
+def _build_yaml(
+    resources: Iterable[dict], mapper: TypeMapper | None = None, unmapped: Counter | None = None
+) -> str:
     """Build YAML DSL from extracted Terraform resources."""
+    mapper = mapper or default_mapper()
     services: dict[str, dict] = {}
     vpc_groups: dict[str, list[str]] = {}
     subnet_groups: dict[str, list[str]] = {}
@@ -65,31 +107,25 @@ def _build_yaml(resources: list[dict]) -> str:
 
     for res in resources:
         res_type = res.get("type", "")
-        diagram_type = TERRAFORM_TO_DIAGRAMS.get(res_type)
+        diagram_type = mapper.lookup(res_type)
         if diagram_type is None:
+            if unmapped is not None and not mapper.covers(res_type):
+                unmapped[res_type] += 1
             continue
 
         # Build a unique service ID
         name = res.get("name", "unnamed")
-        sid = _make_service_id(name, res_type, services)
-
-        # Use tags.Name for label if available, else humanize the name
-        values = res.get("values") or {}
-        tags = values.get("tags") or {}
-        label = tags.get("Name") or _humanize(name)
-
-        services[sid] = {"type": diagram_type, "label": label}
+        sid = make_service_id(name, res_type, services)
+        services[sid] = {"type": diagram_type, "label": resource_label(res)}
 
         # Infer grouping from vpc_id / subnet_id
-        subnet_id = values.get("subnet_id")
-        vpc_id = values.get("vpc_id")
-
-        if subnet_id:
-            subnet_groups.setdefault(subnet_id, []).append(sid)
-        elif vpc_id:
-            vpc_groups.setdefault(vpc_id, []).append(sid)
-        else:
+        key = group_key(res)
+        if key is None:
             ungrouped.append(sid)
+        elif key.startswith("subnet:"):
+            subnet_groups.setdefault(key, []).append(sid)
+        else:
+            vpc_groups.setdefault(key, []).append(sid)
 
     if not services:
         raise TerraformImportError(
@@ -100,12 +136,10 @@ def _build_yaml(resources: list[dict]) -> str:
     groups = []
     if vpc_groups or subnet_groups:
         children = []
-        for vpc_id, sids in vpc_groups.items():
-            children.append({"name": f"VPC ({vpc_id[:12]}...)", "services": sids})
-        for subnet_id, sids in subnet_groups.items():
-            children.append({"name": f"Subnet ({subnet_id[:12]}...)", "services": sids})
+        for key, sids in [*vpc_groups.items(), *subnet_groups.items()]:
+            children.append({"name": group_name(key), "services": sids})
 
-        groups.append({"name": "AWS Cloud", "children": children})
+        groups.append({"name": CLOUD_GROUP, "children": children})
 
     diagram = {
         "diagram": {
@@ -122,7 +156,29 @@ def _build_yaml(resources: list[dict]) -> str:
     return yaml.dump(diagram, default_flow_style=False, sort_keys=False)
 
 
-def _make_service_id(name: str, res_type: str, existing: dict) -> str:
+def resource_label(res: dict) -> str:
+    """tags.Name when the resource has one, else its humanized name."""
+    values = res.get("values") or {}
+    tags = values.get("tags") or {}
+    return tags.get("Name") or _humanize(res.get("name", "unnamed"))
+
+
+def group_key(res: dict) -> str | None:
+    """``subnet:<id>`` or ``vpc:<id>`` for the network a resource sits in, if any."""
+    values = res.get("values") or {}
+    if values.get("subnet_id"):
+        return f"subnet:{values['subnet_id']}"
+    if values.get("vpc_id"):
+        return f"vpc:{values['vpc_id']}"
+    return None
+
+
+def group_name(key: str) -> str:
+    kind, ident = key.split(":", 1)
+    return f"{'Subnet' if kind == 'subnet' else 'VPC'} ({ident[:12]}...)"
+
+
+def make_service_id(name: str, res_type: str, existing: dict) -> str:
     """Create a unique, valid service ID."""
     # Sanitize: lowercase, replace non-alphanum with underscore
     sid = re.sub(r"[^a-z0-9]", "_", name.lower()).strip("_")
@@ -0,0 +1,267 @@
+"""Incremental Terraform re-import that keeps service IDs stable.
+
+Next to the imported YAML sits an ID map recording, for every Terraform
+resource address, the service ID it was given, the network it was grouped
+under and a hash of its mapped type and ``values``. A re-import reuses those IDs, only recomputes resources
+whose hash changed, and patches the existing YAML in place, so hand-added
+connections, groups and label edits on untouched services survive.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+import yaml
+from pydantic import BaseModel
+
+from ..errors import TerraformImportError
+from .importer import (
+    CLOUD_GROUP,
+    group_key,
+    group_name,
+    load_resources,
+    make_service_id,
+    resource_label,
+)
+from .rules import TypeMapper, default_mapper
+
+ID_MAP_VERSION = 1
+
+# libyaml makes loading and dumping a 30k-service import several times faster.
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+class ReimportReport(BaseModel):
+    """How many resources each re-import step touched."""
+
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+
+
+def id_map_path(output: str | Path) -> Path:
+    """Where the ID map for ``output`` lives: ``infra.yaml`` → ``infra.tfids.json``."""
+    return Path(output).with_suffix(".tfids.json")
+
+
+def reimport_terraform(
+    path: str | Path,
+    output: str | Path,
+    mapper: TypeMapper | None = None,
+    unmapped: Counter | None = None,
+) -> ReimportReport:
+    """Import ``path`` into ``output``, patching the previous import if there is one.
+
+    Resources are first classified against the ID map alone; the previous
+    YAML is only loaded and rewritten when something was added, changed or
+    removed.
+    """
+    mapper = mapper or default_mapper()
+    output = Path(output)
+    map_path = id_map_path(output)
+    state = _load_id_map(map_path) if output.exists() else {}
+    previous = state.get("resources", {})
+
+    report = ReimportReport()
+    entries: dict[str, dict] = {}
+    pending: list[tuple[str, str, str, dict]] = []
+    seen_names: Counter = Counter()
+
+    for res in load_resources(path):
+        res_type = res.get("type", "")
+        diagram_type = mapper.lookup(res_type)
+        if diagram_type is None:
+            if unmapped is not None and not mapper.covers(res_type):
+                unmapped[res_type] += 1
+            continue
+
+        address = res.get("address")
+        if not address:
+            name = f"{res_type}.{res.get('name', 'unnamed')}"
+            seen_names[name] += 1
+            address = name if seen_names[name] == 1 else f"{name}#{seen_names[name]}"
+        digest = _digest(diagram_type, res.get("values"))
+
+        entry = previous.get(address)
+        if entry is not None and entry["hash"] == digest:
+            entries[address] = entry
+            report.unchanged += 1
+        else:
+            pending.append((address, digest, diagram_type, res))
+
+    kept = {entry["id"] for entry in entries.values()}
+    kept.update(previous[a]["id"] for a, _, _, _ in pending if a in previous)
+    gone = {entry["id"] for entry in previous.values()} - kept
+    report.removed = len(gone)
+    if not pending and not gone and previous:
+        return report
+
+    document = _load_document(output, state.get("snapshot")) if previous else _empty_document()
+    block = document["diagram"]
+    services: dict = block.get("services") or {}
+    block["services"] = services
+    for sid in gone:
+        services.pop(sid, None)
+
+    moves: dict[str, str | None] = {}
+    for address, digest, diagram_type, res in pending:
+        entry = previous.get(address)
+        key = group_key(res)
+        if entry is not None and entry["id"] in services:
+            sid = entry["id"]
+            report.updated += 1
+            # Maps written before networks were recorded have no "group".
+            if entry.get("group", "") != key:
+                moves[sid] = key
+        else:
+            sid = make_service_id(res.get("name", "unnamed"), res.get("type", ""), services)
+            report.added += 1
+            moves[sid] = key
+        services[sid] = {"type": diagram_type, "label": resource_label(res)}
+        entries[address] = {"id": sid, "hash": digest, "group": key}
+
+    if not services:
+        raise TerraformImportError("No mappable AWS resources found in the Terraform plan.")
+
+    _patch_groups(block, moves, gone)
+    _patch_connections(block, gone)
+    _write_atomic(output, yaml.dump(document, Dumper=_Dumper, default_flow_style=False, sort_keys=False))
+    state = {
+        "version": ID_MAP_VERSION,
+        "resources": entries,
+        "snapshot": {"stamp": _stamp(output), "document": document},
+    }
+    _write_atomic(map_path, json.dumps(state, separators=(",", ":")))
+    return report
+
+
+def _digest(diagram_type: str, values: object) -> str:
+    payload = json.dumps([diagram_type, values], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _empty_document() -> dict:
+    return {"diagram": {"name": "Imported Infrastructure", "services": {}}}
+
+
+def _load_id_map(path: Path) -> dict:
+    """The previous ID map; missing, unreadable or outdated means start over.
+
+    Besides ``resources`` (address → {id, hash, group}) it holds a JSON snapshot of
+    the YAML it wrote, stamped with that file's mtime and size, so an
+    untouched output doesn't have to be re-parsed as YAML.
+    """
+    try:
+        data = json.loads(path.read_text())
+        if data.get("version") != ID_MAP_VERSION:
+            return {}
+        data["resources"] = {
+            address: entry
+            for address, entry in data["resources"].items()
+            if isinstance(entry, dict) and {"id", "hash"} <= entry.keys()
+        }
+        return data
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return {}
+
+
+def _load_document(path: Path, snapshot: dict | None) -> dict:
+    if isinstance(snapshot, dict) and snapshot.get("stamp") == _stamp(path):
+        return snapshot["document"]
+    try:
+        document = yaml.load(path.read_text(), Loader=_Loader)
+    except (OSError, yaml.YAMLError) as e:
+        raise TerraformImportError(f"Failed to read previous import {path}: {e}")
+    if not isinstance(document, dict) or not isinstance(document.get("diagram"), dict):
+        raise TerraformImportError(
+            f"Previous import {path} has no 'diagram' block; delete it and its "
+            f"{id_map_path(path).name} to start over."
+        )
+    return document
+
+
+def _stamp(path: Path) -> list[int]:
+    st = path.stat()
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _patch_groups(block: dict, moves: dict[str, str | None], gone: set[str]) -> None:
+    """Move services into the network group they now belong to.
+
+    ``moves`` holds new services and those whose network changed; they are
+    taken out of the imported network groups only. Removed services are
+    dropped from every group. Other memberships, including hand-made
+    groups, are left as they are.
+    """
+    groups = block.get("groups") or []
+
+    def _strip(items: list[dict], drop: set[str]) -> None:
+        for group in items:
+            if group.get("services"):
+                group["services"] = [sid for sid in group["services"] if sid not in drop]
+            _strip(group.get("children") or [], drop)
+
+    _strip(groups, gone)
+    for group in groups:
+        if group.get("name") == CLOUD_GROUP:
+            for child in group.get("children") or []:
+                if child.get("services"):
+                    child["services"] = [sid for sid in child["services"] if sid not in moves]
+
+    placed = {sid: key for sid, key in moves.items() if key is not None}
+    if placed:
+        cloud = next((g for g in groups if g.get("name") == CLOUD_GROUP), None)
+        if cloud is None:
+            cloud = {"name": CLOUD_GROUP, "children": []}
+            groups.append(cloud)
+        children = cloud.setdefault("children", [])
+        by_name = {child.get("name"): child for child in children}
+        for sid, key in placed.items():
+            name = group_name(key)
+            if name not in by_name:
+                by_name[name] = {"name": name, "services": []}
+                children.append(by_name[name])
+            by_name[name].setdefault("services", []).append(sid)
+
+    for group in groups:
+        if group.get("name") == CLOUD_GROUP and group.get("children"):
+            group["children"] = [c for c in group["children"] if c.get("services") or c.get("children")]
+    groups = [g for g in groups if g.get("services") or g.get("children")]
+    if groups:
+        block["groups"] = groups
+    else:
+        block.pop("groups", None)
+
+
+def _patch_connections(block: dict, gone: set[str]) -> None:
+    """Drop connection endpoints that point at removed services."""
+    connections = []
+    for conn in block.get("connections") or []:
+        if conn.get("from") in gone:
+            continue
+        to = conn.get("to")
+        if isinstance(to, list):
+            to = [t for t in to if t not in gone]
+            if not to:
+                continue
+            conn["to"] = to
+        elif to in gone:
+            continue
+        connections.append(conn)
+    block["connections"] = connections
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    try:
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except OSError as e:
+        raise TerraformImportError(f"Failed to write {path}: {e}")
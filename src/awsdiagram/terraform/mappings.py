@@ -88,3 +88,22 @@ TERRAFORM_TO_DIAGRAMS: dict[str, str] = {
     "aws_codecommit_repository": "devtools.Codecommit",
     "aws_codedeploy_app": "devtools.Codedeploy",
 }
+
+# Pattern rules applied when no exact mapping matches. A trailing '*' is a
+# prefix rule (the longest matching prefix wins); other patterns use fnmatch
+# syntax. None marks plumbing resources that are deliberately left out of
+# diagrams, so they don't show up as coverage gaps in --report-unmapped.
+TERRAFORM_RULES: dict[str, str | None] = {
+    "aws_cloudwatch_event_*": "integration.Eventbridge",
+    "aws_cloudwatch_log_*": "management.CloudwatchLogs",
+    "aws_s3_bucket_*": None,
+    "aws_iam_*_policy_attachment": None,
+    "aws_iam_*_policy": None,
+    "aws_security_group_rule": None,
+    "aws_vpc_security_group_*_rule": None,
+    "aws_route": None,
+    "aws_route_table_association": None,
+    "aws_lb_listener*": None,
+    "aws_lb_target_group_attachment": None,
+    "aws_lambda_permission": None,
+}
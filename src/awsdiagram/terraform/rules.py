@@ -0,0 +1,130 @@
+"""Compiled Terraform type → diagrams type lookup.
+
+Rules come from the built-in tables in ``mappings`` plus any override files,
+later sources taking precedence. They compile into an exact-match dict, a
+prefix dict probed once per prefix length of the resource type, and one
+combined regex for the remaining glob patterns. A later source replaces an
+earlier rule for the same pattern; across kinds, an exact match beats the
+longest prefix, which beats the first matching glob. Results are memoized per
+resource type, so a plan with 50k resources pays for each distinct type once
+regardless of how many rules there are.
+"""
+
+import fnmatch
+import functools
+import re
+from collections.abc import Mapping
+from pathlib import Path
+
+import yaml
+from pydantic import ValidationError
+
+from ..errors import TerraformImportError
+from ..models import ServiceDef
+from .mappings import TERRAFORM_RULES, TERRAFORM_TO_DIAGRAMS
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+class TypeMapper:
+    """Maps Terraform resource types to diagrams type strings."""
+
+    def __init__(self, *sources: Mapping[str, str | None]):
+        self._exact: dict[str, str | None] = {}
+        self._prefixes: dict[str, str | None] = {}
+        globs: list[tuple[str, str | None]] = []
+        for source in sources:
+            source_globs = []
+            for pattern, target in source.items():
+                if not _GLOB_CHARS.search(pattern):
+                    self._exact[pattern] = target
+                elif pattern.endswith("*") and not _GLOB_CHARS.search(pattern[:-1]):
+                    self._prefixes[pattern[:-1]] = target
+                else:
+                    source_globs.append((pattern, target))
+            # Globs are tried in order, so a later source's globs go first.
+            replaced = {pattern for pattern, _ in source_globs}
+            globs = source_globs + [g for g in globs if g[0] not in replaced]
+
+        # fnmatch.translate names its own groups g0, g1, ... on some Python
+        # versions, so rule groups use a prefix it never produces. A rule's
+        # group encloses any of those, so it is always match.lastgroup.
+        self._glob_targets = {f"rule{i}": target for i, (_, target) in enumerate(globs)}
+        self._glob = (
+            re.compile("|".join(f"(?P<rule{i}>{fnmatch.translate(p)})" for i, (p, _) in enumerate(globs)))
+            if globs
+            else None
+        )
+        self._prefix_lengths = sorted({len(p) for p in self._prefixes}, reverse=True)
+        self._memo: dict[str, tuple[bool, str | None]] = {}
+
+    def lookup(self, tf_type: str) -> str | None:
+        """The diagrams type for ``tf_type``, or None if it is unmapped or ignored."""
+        return self._resolve(tf_type)[1]
+
+    def covers(self, tf_type: str) -> bool:
+        """Whether any rule, including an ignore rule, matches ``tf_type``."""
+        return self._resolve(tf_type)[0]
+
+    def _resolve(self, tf_type: str) -> tuple[bool, str | None]:
+        result = self._memo.get(tf_type)
+        if result is None:
+            result = self._match(tf_type)
+            self._memo[tf_type] = result
+        return result
+
+    def _match(self, tf_type: str) -> tuple[bool, str | None]:
+        if tf_type in self._exact:
+            return True, self._exact[tf_type]
+        for length in self._prefix_lengths:
+            if length <= len(tf_type):
+                prefix = tf_type[:length]
+                if prefix in self._prefixes:
+                    return True, self._prefixes[prefix]
+        if self._glob is not None:
+            match = self._glob.match(tf_type)
+            if match:
+                return True, self._glob_targets[match.lastgroup]
+        return False, None
+
+
+def load_mapping_file(path: str | Path) -> dict[str, str | None]:
+    """Read an override file: a ``mappings:`` table of pattern → type (or null)."""
+    try:
+        with open(path) as f:
+            data = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError) as e:
+        raise TerraformImportError(f"Failed to read mapping file {path}: {e}")
+
+    rules = data.get("mappings") if isinstance(data, dict) else None
+    if not isinstance(rules, dict):
+        raise TerraformImportError(
+            f"Mapping file {path} must contain a 'mappings:' table of pattern: type"
+        )
+    for pattern, target in rules.items():
+        if not isinstance(pattern, str) or not (target is None or isinstance(target, str)):
+            raise TerraformImportError(
+                f"Mapping file {path}: '{pattern}' must map to a type string or null"
+            )
+        if target is not None:
+            try:
+                ServiceDef(type=target, label=pattern)
+            except ValidationError:
+                raise TerraformImportError(
+                    f"Mapping file {path}: invalid type '{target}' for '{pattern}'. "
+                    "Expected 'category.ClassName'."
+                )
+    return rules
+
+
+@functools.lru_cache(maxsize=None)
+def default_mapper() -> TypeMapper:
+    return TypeMapper(TERRAFORM_TO_DIAGRAMS, TERRAFORM_RULES)
+
+
+def build_mapper(override_files: list[str | Path] = ()) -> TypeMapper:
+    """The built-in rules with ``override_files`` merged on top, in order."""
+    if not override_files:
+        return default_mapper()
+    overrides = [load_mapping_file(path) for path in override_files]
+    return TypeMapper(TERRAFORM_TO_DIAGRAMS, TERRAFORM_RULES, *overrides)
@@ -0,0 +1,160 @@
+"""Read raw Terraform state files (format version 4) without Terraform.
+
+A state pulled from a backend is one JSON object whose ``resources`` array
+holds every resource with its instances. ``iter_state_resources`` walks that
+array with an incremental decoder, so memory is bounded by the largest
+single resource rather than the whole file, and yields one resource per
+instance in the same shape as ``terraform show -json`` output.
+"""
+
+import json
+import re
+from collections.abc import Iterator
+from pathlib import Path
+
+from ..errors import TerraformImportError
+
+SUPPORTED_STATE_VERSION = 4
+CHUNK_SIZE = 1 << 20
+
+_RAW_STATE_HEADER = re.compile(rb'^\s*\{\s*"version"\s*:\s*(\d+)')
+_WHITESPACE = " \t\n\r"
+
+
+def raw_state_version(path: str | Path) -> int | None:
+    """Return the state format version if ``path`` is a raw state file, else None.
+
+    Terraform always writes ``version`` as the first key of a raw state,
+    while ``terraform show -json`` output starts with ``format_version``.
+    """
+    with open(path, "rb") as f:
+        match = _RAW_STATE_HEADER.match(f.read(256))
+    return int(match.group(1)) if match else None
+
+
+def is_raw_state(data: dict) -> bool:
+    """Whether already-loaded JSON is a raw state rather than show -json output."""
+    return isinstance(data.get("version"), int) and isinstance(data.get("resources"), list)
+
+
+def state_resources(data: dict) -> Iterator[dict]:
+    """Yield one resource per instance from an already-loaded raw state."""
+    _check_version(data.get("version"))
+    for resource in data["resources"]:
+        yield from _instances(resource)
+
+
+def iter_state_resources(path: str | Path, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Stream one resource per instance out of a raw state file."""
+    version = raw_state_version(path)
+    _check_version(version)
+    try:
+        with open(path, encoding="utf-8") as f:
+            stream = _JsonStream(f, chunk_size)
+            stream.expect("{")
+            while not stream.consume("}"):
+                key = stream.value()
+                stream.expect(":")
+                if key == "resources":
+                    stream.expect("[")
+                    while not stream.consume("]"):
+                        yield from _instances(stream.value())
+                        stream.consume(",")
+                else:
+                    stream.value()  # decoded and dropped, e.g. a large outputs block
+                stream.consume(",")
+    except (json.JSONDecodeError, OSError, UnicodeDecodeError) as e:
+        raise TerraformImportError(f"Failed to read Terraform state {path}: {e}")
+
+
+def _check_version(version: object) -> None:
+    if version != SUPPORTED_STATE_VERSION:
+        raise TerraformImportError(
+            f"Unsupported Terraform state version {version}; only version "
+            f"{SUPPORTED_STATE_VERSION} (Terraform 0.12 and later) can be read directly. "
+            "Use 'terraform show -json' output for older states."
+        )
+
+
+def _instances(resource: dict) -> Iterator[dict]:
+    """Flatten a state resource into ``show -json``-style resources, one per instance."""
+    if not isinstance(resource, dict):
+        raise TerraformImportError("Malformed Terraform state: resource is not an object")
+    mode = resource.get("mode", "managed")
+    res_type = resource.get("type", "")
+    name = resource.get("name", "unnamed")
+    base = f"{res_type}.{name}" if mode == "managed" else f"data.{res_type}.{name}"
+    if resource.get("module"):
+        base = f"{resource['module']}.{base}"
+
+    for instance in resource.get("instances") or []:
+        index = instance.get("index_key")
+        address = base if index is None else f"{base}[{json.dumps(index)}]"
+        yield {
+            "address": address,
+            "mode": mode,
+            "type": res_type,
+            "name": name,
+            "index": index,
+            "values": instance.get("attributes") or {},
+        }
+
+
+class _JsonStream:
+    """Just enough of an incremental JSON reader to walk one array lazily."""
+
+    def __init__(self, f, chunk_size: int):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, size: int) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill(self._chunk_size):
+                raise json.JSONDecodeError("Unexpected end of file", self._buf, self._pos)
+
+    def consume(self, char: str) -> bool:
+        if self._peek() == char:
+            self._pos += 1
+            return True
+        return False
+
+    def expect(self, char: str) -> None:
+        if not self.consume(char):
+            raise json.JSONDecodeError(f"Expected '{char}'", self._buf, self._pos)
+
+    def value(self) -> object:
+        """Decode the next complete value, reading more input until it fits."""
+        self._peek()
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+                # A number ending exactly at the buffer edge may continue in the next chunk.
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            if not self._fill(size):
+                continue
+            size *= 2
@@ -0,0 +1,223 @@
+"""Tiled raster output: one layout, many small bitmaps drawn in parallel.
+
+A single PNG of a very large diagram makes Graphviz allocate one huge
+bitmap. render_tiles() runs ``dot`` once to position the graph, then splits
+its bounding box into an N x N grid. It draws each cell in its own
+``neato -n2`` process restricted to that cell with Graphviz's ``viewport``
+attribute, so peak memory per process is bounded by the tile size.
+Alongside the tiles it writes ``tiles.json`` and an ``index.html`` that
+shows them as one pannable, zoomable image.
+"""
+
+import html
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from .errors import GraphvizNotFoundError, RenderError
+from .icons import IconCache
+from .metrics import timed
+from .models import DiagramDef
+from .packing import run_graphviz
+from .quality import DEFAULT_QUALITY
+from .renderer import to_dot
+from .resolver import check_graphviz
+
+MANIFEST_NAME = "tiles.json"
+VIEWER_NAME = "index.html"
+TILE_FORMAT = "png"
+DEFAULT_DPI = 96
+
+_BB = re.compile(r'\bbb="?\s*([-\d.e+]+),([-\d.e+]+),([-\d.e+]+),([-\d.e+]+)')
+
+
+class Tile(BaseModel):
+    row: int
+    column: int
+    file: str
+
+
+class TileManifest(BaseModel):
+    """Grid geometry in pixels, tiles listed row by row from the top left."""
+
+    name: str
+    format: str = TILE_FORMAT
+    rows: int
+    columns: int
+    tile_width: int
+    tile_height: int
+    width: int
+    height: int
+    dpi: int
+    tiles: list[Tile]
+
+
+def render_tiles(
+    diagram_def: DiagramDef,
+    output_dir: str | Path,
+    tiles: int,
+    jobs: int | None = None,
+    icon_cache: IconCache | None = None,
+    dpi: int = DEFAULT_DPI,
+    quality: str = DEFAULT_QUALITY,
+) -> str:
+    """Render ``diagram_def`` as a ``tiles`` x ``tiles`` grid of PNGs in ``output_dir``.
+
+    ``quality`` selects the layout preset; the tiles are drawn at ``dpi``.
+    Returns the path of the HTML viewer.
+    """
+    if tiles < 1:
+        raise RenderError("Tile count must be at least 1")
+    check_graphviz()
+    if shutil.which("neato") is None:
+        raise GraphvizNotFoundError(
+            "Graphviz 'neato' not found on PATH; it is required for tiled output."
+        )
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Layout runs once; every tile reuses the computed positions.
+    with timed("layout"):
+        laid_out = run_graphviz(["dot", "-Tdot"], to_dot(diagram_def, icon_cache=icon_cache, quality=quality))
+    llx, lly, urx, ury = bounding_box(laid_out)
+    cell_w = (urx - llx) / tiles
+    cell_h = (ury - lly) / tiles
+
+    cells = [
+        Tile(row=row, column=column, file=f"tile_{row}_{column}.{TILE_FORMAT}")
+        for row in range(tiles)
+        for column in range(tiles)
+    ]
+
+    def _draw(tile: Tile) -> None:
+        # Graphviz y grows upwards; row 0 is the top of the drawing.
+        x = llx + (tile.column + 0.5) * cell_w
+        y = ury - (tile.row + 0.5) * cell_h
+        run_graphviz(
+            [
+                "neato",
+                "-s",
+                "-n2",
+                f"-T{TILE_FORMAT}",
+                f"-Gdpi={dpi}",
+                "-Gpad=0",
+                f"-Gviewport={cell_w:.2f},{cell_h:.2f},1,{x:.2f},{y:.2f}",
+                "-o",
+                str(output_dir / tile.file),
+            ],
+            laid_out,
+        )
+
+    with timed("raster"), ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        list(pool.map(_draw, cells))
+
+    tile_width = round(cell_w * dpi / 72)
+    tile_height = round(cell_h * dpi / 72)
+    manifest = TileManifest(
+        name=diagram_def.name,
+        rows=tiles,
+        columns=tiles,
+        tile_width=tile_width,
+        tile_height=tile_height,
+        width=tile_width * tiles,
+        height=tile_height * tiles,
+        dpi=dpi,
+        tiles=cells,
+    )
+    try:
+        (output_dir / MANIFEST_NAME).write_text(manifest.model_dump_json(indent=2))
+        viewer = output_dir / VIEWER_NAME
+        viewer.write_text(viewer_html(manifest))
+    except OSError as e:
+        raise RenderError(f"Failed to write tile manifest in {output_dir}: {e}")
+    return str(viewer)
+
+
+def bounding_box(dot_source: str) -> tuple[float, float, float, float]:
+    """The root graph's ``bb`` from laid-out DOT; Graphviz writes it first."""
+    match = _BB.search(dot_source)
+    if match is None:
+        raise RenderError("Graphviz layout has no bounding box")
+    llx, lly, urx, ury = (float(v) for v in match.groups())
+    if urx <= llx or ury <= lly:
+        raise RenderError("Graphviz layout is empty")
+    return llx, lly, urx, ury
+
+
+def viewer_html(manifest: TileManifest) -> str:
+    """A dependency-free page that shows the tiles as one zoomable image."""
+    images = "\n".join(
+        f'    <img src="{html.escape(t.file)}" width="{manifest.tile_width}" '
+        f'height="{manifest.tile_height}" loading="lazy" alt="">'
+        for t in manifest.tiles
+    )
+    return _VIEWER.format(
+        title=html.escape(manifest.name),
+        columns=manifest.columns,
+        width=manifest.width,
+        height=manifest.height,
+        images=images,
+        manifest=MANIFEST_NAME,
+    )
+
+
+_VIEWER = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+  body {{ margin: 0; font-family: sans-serif; }}
+  header {{ position: fixed; top: 0; left: 0; right: 0; padding: 6px 10px;
+           background: #fff; border-bottom: 1px solid #ddd; z-index: 1; }}
+  main {{ position: absolute; top: 40px; bottom: 0; left: 0; right: 0; overflow: auto; }}
+  #grid {{ display: grid; grid-template-columns: repeat({columns}, auto);
+          width: {width}px; height: {height}px; }}
+  #grid img {{ display: block; }}
+</style>
+</head>
+<body>
+<header>
+  <strong>{title}</strong>
+  <button data-zoom="0.8">&minus;</button>
+  <button data-zoom="1.25">+</button>
+  <button data-zoom="0">Fit</button>
+  <small><a href="{manifest}">{manifest}</a></small>
+</header>
+<main>
+  <div id="grid">
+{images}
+  </div>
+</main>
+<script>
+  const grid = document.getElementById("grid");
+  const main = document.querySelector("main");
+  let scale = 1;
+  function zoom(factor) {{
+    scale = factor ? scale * factor
+      : Math.min(main.clientWidth / {width}, main.clientHeight / {height});
+    grid.style.zoom = scale;
+  }}
+  for (const button of document.querySelectorAll("button")) {{
+    button.addEventListener("click", () => zoom(Number(button.dataset.zoom)));
+  }}
+  let drag = null;
+  main.addEventListener("mousedown", (e) => {{
+    drag = {{ x: e.clientX, y: e.clientY, left: main.scrollLeft, top: main.scrollTop }};
+    e.preventDefault();
+  }});
+  window.addEventListener("mouseup", () => {{ drag = null; }});
+  window.addEventListener("mousemove", (e) => {{
+    if (!drag) return;
+    main.scrollLeft = drag.left - (e.clientX - drag.x);
+    main.scrollTop = drag.top - (e.clientY - drag.y);
+  }});
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,267 @@
+"""Validate many diagram files at once and report every problem found.
+
+Files are parsed in a process pool; each worker reports schema and
+reference errors for every document of its file rather than stopping at
+the first, plus the service types the file uses, and hands back the metrics
+it recorded. Types are then resolved in the parent process, so each distinct type is imported once for the whole
+run however many files use it. Reports render as text, JSON or SARIF 2.1.0.
+"""
+
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from pydantic import BaseModel, ValidationError
+
+from . import __version__
+from .cache import ParseCache, parse_cached
+from .errors import AwsDiagramError, ServiceReferenceError, TypeResolutionError, YamlLoadError
+from .formats import YAML_SUFFIXES
+from .metrics import REGISTRY, timed
+from .models import DiagramDef
+from .parser import load_fragment, load_yaml_documents_string, parse_document, read_text
+
+REPORT_FORMATS = ("text", "json", "sarif")
+_FRAGMENT_KEYS = {"include", "services", "groups", "connections"}
+
+
+class ValidationIssue(BaseModel):
+    """One problem in one file."""
+
+    file: str
+    rule: str
+    message: str
+    location: str | None = None
+
+
+class FileResult(BaseModel):
+    file: str
+    issues: list[ValidationIssue] = []
+    # Service type -> the IDs that use it, resolved after parsing.
+    types: dict[str, list[str]] = {}
+
+
+def expand_inputs(inputs: list[str]) -> list[Path]:
+    """Expand files, directories (recursively) and glob patterns into YAML files.
+
+    Explicit files are kept whatever their suffix; directories and globs
+    contribute only ``.yaml``/``.yml`` files. The result is sorted and
+    de-duplicated. A directory without YAML files, or a pattern that matches
+    none, raises YamlLoadError, so a mistyped path fails like a missing file.
+    """
+    found: set[Path] = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            files = [p for p in path.rglob("*") if p.is_file() and p.suffix in YAML_SUFFIXES]
+            if not files:
+                raise YamlLoadError(f"No YAML files under: {item}")
+            found.update(files)
+        elif path.is_file():
+            found.add(path)
+        else:
+            matches = [Path(m) for m in glob.glob(item, recursive=True)]
+            files = [m for m in matches if m.is_file() and m.suffix in YAML_SUFFIXES]
+            if not files:
+                raise YamlLoadError(f"No files match: {item}")
+            found.update(files)
+    return sorted(found)
+
+
+def validate_files(
+    files: list[Path], cache: ParseCache | None = None, jobs: int | None = None
+) -> list[FileResult]:
+    """Validate ``files``, in parallel when there is more than one.
+
+    Workers open their own handle on ``cache``'s directory.
+    """
+    cache_dir = str(cache.directory.parent) if cache is not None else None
+    tasks = [(str(f), cache_dir) for f in files]
+    workers = min(jobs or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        results = [_validate_task(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        results = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result, metrics in pool.map(_pool_task, tasks, chunksize=chunksize):
+                REGISTRY.merge(metrics)
+                results.append(result)
+
+    _check_types(results)
+    return results
+
+
+def _validate_task(task: tuple[str, str | None]) -> FileResult:
+    file, cache_dir = task
+    return validate_file(file, ParseCache(cache_dir) if cache_dir is not None else None)
+
+
+def _pool_task(task: tuple[str, str | None]) -> tuple[FileResult, dict]:
+    # A forked worker inherits the parent's registry; report only this task.
+    REGISTRY.reset()
+    result = _validate_task(task)
+    return result, REGISTRY.drain()
+
+
+def validate_file(file: str | Path, cache: ParseCache | None = None) -> FileResult:
+    """Collect schema and reference issues in one file, without resolving types."""
+    result = FileResult(file=str(file))
+    try:
+        diagrams = parse_cached(file, cache)
+    except AwsDiagramError:
+        # Failures are never cached: re-parse document by document for every issue.
+        diagrams = _collect_issues(result)
+    for diagram in diagrams:
+        for sid, sdef in diagram.services.items():
+            result.types.setdefault(sdef.type, []).append(sid)
+    return result
+
+
+def _collect_issues(result: FileResult) -> list[DiagramDef]:
+    try:
+        text = read_text(result.file)
+        documents = load_yaml_documents_string(text, result.file)
+    except AwsDiagramError as e:
+        result.issues.append(_issue(result.file, e))
+        return []
+
+    if not any("diagram" in d or "diagrams" in d for d in documents):
+        if all(d.keys() & _FRAGMENT_KEYS for d in documents):
+            try:
+                fragment = load_fragment(result.file)
+            except AwsDiagramError as e:
+                result.issues.extend(_issues(result.file, e, None))
+                return []
+            # Fragment types are checked here too, not only where they are included.
+            for sid, sdef in fragment.services.items():
+                result.types.setdefault(sdef.type, []).append(sid)
+            return []
+
+    diagrams = []
+    for i, data in enumerate(documents, 1):
+        location = f"document {i}" if len(documents) > 1 else None
+        try:
+            diagrams.extend(parse_document(data, result.file))
+        except AwsDiagramError as e:
+            result.issues.extend(_issues(result.file, e, location))
+    return diagrams
+
+
+def _issues(file: str, error: AwsDiagramError, location: str | None) -> list[ValidationIssue]:
+    """Split an error that bundles several problems into one issue per problem."""
+    cause = error.__cause__
+    if isinstance(cause, ValidationError):
+        return [
+            _issue(
+                file,
+                error,
+                ".".join(filter(None, [location, *(str(part) for part in detail["loc"])])),
+                detail["msg"],
+            )
+            for detail in cause.errors()
+        ]
+    if isinstance(error, ServiceReferenceError):
+        header, *lines = str(error).split("\n  ")
+        if lines:
+            context = header.split(": ", 1)[0] if header.startswith("Diagram '") else None
+            return [
+                _issue(file, error, location, f"{context}: {line}" if context else line)
+                for line in lines
+            ]
+    return [_issue(file, error, location)]
+
+
+def _issue(
+    file: str, error: AwsDiagramError, location: str | None = None, message: str | None = None
+) -> ValidationIssue:
+    return ValidationIssue(
+        file=file, rule=type(error).__name__, message=message or str(error), location=location
+    )
+
+
+def _check_types(results: list[FileResult]) -> None:
+    from .resolver import resolve_type
+
+    failures: dict[str, str] = {}
+    with timed("resolve"):
+        for stype in sorted({t for r in results for t in r.types}):
+            try:
+                resolve_type(stype)
+            except TypeResolutionError as e:
+                failures[stype] = str(e)
+
+    for result in results:
+        for stype, sids in result.types.items():
+            if stype in failures:
+                for sid in sids:
+                    result.issues.append(
+                        ValidationIssue(
+                            file=result.file,
+                            rule=TypeResolutionError.__name__,
+                            message=f"{sid}: {failures[stype]}",
+                            location=f"services.{sid}.type",
+                        )
+                    )
+
+
+def format_report(results: list[FileResult], fmt: str) -> str:
+    """Render results as one of REPORT_FORMATS."""
+    if fmt == "json":
+        return json.dumps(
+            {
+                "files": len(results),
+                "invalid": sum(1 for r in results if r.issues),
+                "issues": [i.model_dump() for r in results for i in r.issues],
+            },
+            indent=2,
+        )
+    if fmt == "sarif":
+        return json.dumps(to_sarif(results), indent=2)
+
+    lines = []
+    for result in results:
+        if not result.issues:
+            lines.append(f"Valid: {result.file}")
+        for issue in result.issues:
+            where = f" [{issue.location}]" if issue.location else ""
+            lines.append(f"Error: {issue.file}{where}: {issue.message}")
+    return "\n".join(lines)
+
+
+def to_sarif(results: list[FileResult]) -> dict:
+    """A SARIF 2.1.0 log with one rule per error class."""
+    issues = [i for r in results for i in r.issues]
+    rules = sorted({i.rule for i in issues})
+    sarif_results = []
+    for issue in issues:
+        location: dict = {"physicalLocation": {"artifactLocation": {"uri": Path(issue.file).as_posix()}}}
+        if issue.location:
+            location["logicalLocations"] = [{"fullyQualifiedName": issue.location}]
+        sarif_results.append(
+            {
+                "ruleId": issue.rule,
+                "ruleIndex": rules.index(issue.rule),
+                "level": "error",
+                "message": {"text": issue.message},
+                "locations": [location],
+            }
+        )
+    return {
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "version": "2.1.0",
+        "runs": [
+            {
+                "tool": {
+                    "driver": {
+                        "name": "awsdiagram",
+                        "version": __version__,
+                        "rules": [{"id": rule} for rule in rules],
+                    }
+                },
+                "results": sarif_results,
+            }
+        ],
+    }
@@ -0,0 +1,225 @@
+"""Derived views of a DiagramDef: focus neighborhoods, level-of-detail, components."""
+
+from collections import Counter, deque
+from collections.abc import Hashable, Iterable
+
+from .errors import ServiceReferenceError
+from .models import ConnectionDef, DiagramDef, GroupDef, ServiceDef
+
+
+def build_adjacency(diagram: DiagramDef) -> dict[str, set[str]]:
+    """Map each service ID to the services it is connected to, in either direction."""
+    adjacency: dict[str, set[str]] = {sid: set() for sid in diagram.services}
+    for conn in diagram.connections:
+        targets = conn.to if isinstance(conn.to, list) else [conn.to]
+        for target in targets:
+            adjacency[conn.from_].add(target)
+            adjacency[target].add(conn.from_)
+    return adjacency
+
+
+def neighborhood(diagram: DiagramDef, focus: list[str], radius: int) -> set[str]:
+    """Return the IDs of every service within ``radius`` hops of ``focus``."""
+    unknown = [sid for sid in focus if sid not in diagram.services]
+    if unknown:
+        raise ServiceReferenceError(
+            f"Unknown focus service(s): {', '.join(unknown)}"
+        )
+
+    adjacency = build_adjacency(diagram)
+    seen = set(focus)
+    queue = deque((sid, 0) for sid in focus)
+    while queue:
+        sid, depth = queue.popleft()
+        if depth == radius:
+            continue
+        for neighbor in adjacency[sid]:
+            if neighbor not in seen:
+                seen.add(neighbor)
+                queue.append((neighbor, depth + 1))
+    return seen
+
+
+class DisjointSet:
+    """Union-find over hashable items, with path halving."""
+
+    def __init__(self, items: Iterable[Hashable]):
+        self._parent = {item: item for item in items}
+
+    def find(self, item: Hashable) -> Hashable:
+        parent = self._parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: Hashable, b: Hashable) -> None:
+        self._parent[self.find(a)] = self.find(b)
+
+
+def components(diagram: DiagramDef) -> list[list[str]]:
+    """Split the services into independently layoutable components.
+
+    Two services share a component when a connection joins them or when
+    they sit under the same top-level group, since a cluster can't be split
+    across separate layouts. Components are ordered by their first service.
+    """
+    sets = DisjointSet(diagram.services)
+    for conn in diagram.connections:
+        targets = conn.to if isinstance(conn.to, list) else [conn.to]
+        for target in targets:
+            sets.union(conn.from_, target)
+
+    for group in diagram.groups:
+        members = _group_services(group)
+        for sid in members[1:]:
+            sets.union(members[0], sid)
+
+    grouped: dict[str, list[str]] = {}
+    for sid in diagram.services:
+        grouped.setdefault(sets.find(sid), []).append(sid)
+    return list(grouped.values())
+
+
+def focus_view(diagram: DiagramDef, focus: list[str], radius: int = 1) -> DiagramDef:
+    """Cut a DiagramDef down to the neighborhood of the focus services.
+
+    Only the groups that (transitively) contain a kept service survive, and
+    only connections between kept services are retained.
+    """
+    return subset(diagram, neighborhood(diagram, focus, radius))
+
+
+def subset(diagram: DiagramDef, keep: set[str]) -> DiagramDef:
+    """Return a DiagramDef containing only the services in ``keep``."""
+    services = {sid: sdef for sid, sdef in diagram.services.items() if sid in keep}
+
+    connections = []
+    for conn in diagram.connections:
+        if conn.from_ not in keep:
+            continue
+        if isinstance(conn.to, list):
+            targets = [t for t in conn.to if t in keep]
+            if targets:
+                connections.append(ConnectionDef(from_=conn.from_, to=targets, label=conn.label))
+        elif conn.to in keep:
+            connections.append(conn)
+
+    return DiagramDef(
+        name=diagram.name,
+        services=services,
+        groups=_prune_groups(diagram.groups, keep),
+        connections=connections,
+    )
+
+
+def _prune_groups(groups: list[GroupDef], keep: set[str]) -> list[GroupDef]:
+    """Drop services outside ``keep`` and any group left with nothing in it."""
+    pruned = []
+    for group in groups:
+        services = [sid for sid in group.services if sid in keep]
+        children = _prune_groups(group.children, keep)
+        if services or children:
+            pruned.append(GroupDef(name=group.name, services=services, children=children))
+    return pruned
+
+
+def collapse_view(diagram: DiagramDef, max_depth: int) -> DiagramDef:
+    """Replace every group nested deeper than ``max_depth`` with a summary node.
+
+    Top-level groups are at depth 1, so ``max_depth=0`` collapses them all.
+    Each summary node takes the dominant service type of the group it
+    replaces, connections are rewired to it, and the resulting duplicate
+    and intra-group edges are dropped.
+    """
+    services: dict[str, ServiceDef] = {}
+    replaced: dict[str, str] = {}
+
+    def _visit(groups: list[GroupDef], depth: int, path: str) -> tuple[list[GroupDef], list[str]]:
+        kept_groups = []
+        summary_ids = []
+        for i, group in enumerate(groups):
+            gpath = f"{path}_{i}"
+            if depth > max_depth:
+                summary_ids.append(_summarize(group, gpath, diagram, services, replaced))
+                continue
+            children, summaries = _visit(group.children, depth + 1, gpath)
+            kept_groups.append(
+                GroupDef(name=group.name, services=group.services + summaries, children=children)
+            )
+        return kept_groups, summary_ids
+
+    groups, _ = _visit(diagram.groups, 1, "group")
+    # A service listed in both a kept and a collapsed group now lives in the summary.
+    groups = _drop_services(groups, set(replaced))
+
+    kept = {sid: sdef for sid, sdef in diagram.services.items() if sid not in replaced}
+    kept.update(services)
+
+    connections = []
+    seen: dict[tuple[str, str], int] = {}
+    for conn in diagram.connections:
+        src = replaced.get(conn.from_, conn.from_)
+        targets = conn.to if isinstance(conn.to, list) else [conn.to]
+        for target in targets:
+            dst = replaced.get(target, target)
+            if src == dst and src in services:
+                continue
+            index = seen.get((src, dst))
+            if index is None:
+                seen[(src, dst)] = len(connections)
+                connections.append(ConnectionDef(from_=src, to=dst, label=conn.label))
+            elif connections[index].label != conn.label:
+                # Merged edges with differing labels keep no label at all.
+                connections[index].label = None
+
+    return DiagramDef(
+        name=diagram.name,
+        services=kept,
+        groups=groups,
+        connections=connections,
+    )
+
+
+def _summarize(
+    group: GroupDef,
+    gpath: str,
+    diagram: DiagramDef,
+    services: dict[str, ServiceDef],
+    replaced: dict[str, str],
+) -> str:
+    """Add a summary node standing in for ``group`` and its descendants."""
+    members = _group_services(group)
+    sid = gpath
+    while sid in diagram.services:
+        sid = f"_{sid}"
+
+    counts = Counter(diagram.services[m].type for m in members)
+    dominant = counts.most_common(1)[0][0] if counts else "general.General"
+    top = ", ".join(f"{n}x {t.split('.', 1)[1]}" for t, n in counts.most_common(2))
+    noun = "service" if len(members) == 1 else "services"
+    label = f"{group.name}\n{len(members)} {noun}" + (f"\n{top}" if top else "")
+
+    services[sid] = ServiceDef(type=dominant, label=label)
+    for member in members:
+        replaced.setdefault(member, sid)
+    return sid
+
+
+def _group_services(group: GroupDef) -> list[str]:
+    """All service IDs in a group and its descendants, in order, without repeats."""
+    found = dict.fromkeys(group.services)
+    for child in group.children:
+        found.update(dict.fromkeys(_group_services(child)))
+    return list(found)
+
+
+def _drop_services(groups: list[GroupDef], drop: set[str]) -> list[GroupDef]:
+    return [
+        GroupDef(
+            name=group.name,
+            services=[sid for sid in group.services if sid not in drop],
+            children=_drop_services(group.children, drop),
+        )
+        for group in groups
+    ]
@@ -8,6 +8,12 @@ import pytest
 import yaml
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep CLI parse caches out of the working tree."""
+    monkeypatch.setenv("AWSDIAGRAM_CACHE_DIR", str(tmp_path / ".awsdiagram-cache"))
+
+
 @pytest.fixture
 def valid_yaml_dict():
     """Minimal valid YAML DSL as a dict."""
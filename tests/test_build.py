@@ -0,0 +1,168 @@
+"""Tests for incremental builds."""
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from awsdiagram.build import MANIFEST_NAME, build
+from awsdiagram.pipeline import RenderOptions
+
+JSON_OPTIONS = RenderOptions(outformat="json")
+
+
+@pytest.fixture
+def tree(tmp_path, valid_yaml_dict, nested_yaml_dict, sample_terraform_plan):
+    src = tmp_path / "src"
+    (src / "team").mkdir(parents=True)
+    (src / "app.yaml").write_text(yaml.dump(valid_yaml_dict))
+    (src / "team" / "nested.yaml").write_text(yaml.dump(nested_yaml_dict))
+    (src / "infra.tfplan.json").write_text(json.dumps(sample_terraform_plan))
+    (src / "notes.txt").write_text("ignored")
+    return src
+
+
+class TestBuild:
+    def test_first_build_renders_everything(self, tree, tmp_path):
+        out = tmp_path / "out"
+        report = build(tree, out, JSON_OPTIONS)
+        assert sorted(report.built) == ["app.yaml", "infra.tfplan.json", "team/nested.yaml"]
+        assert (out / "app.json").exists()
+        assert (out / "team" / "nested.json").exists()
+        assert json.loads((out / "infra.json").read_text())["name"] == "Imported Infrastructure"
+        assert (out / MANIFEST_NAME).exists()
+
+    def test_second_build_skips_everything(self, tree, tmp_path):
+        out = tmp_path / "out"
+        build(tree, out, JSON_OPTIONS)
+        report = build(tree, out, JSON_OPTIONS)
+        assert report.built == []
+        assert len(report.skipped) == 3
+
+    def test_only_changed_source_rebuilds(self, tree, tmp_path, valid_yaml_dict):
+        out = tmp_path / "out"
+        build(tree, out, JSON_OPTIONS)
+        valid_yaml_dict["diagram"]["name"] = "Changed"
+        (tree / "app.yaml").write_text(yaml.dump(valid_yaml_dict))
+        report = build(tree, out, JSON_OPTIONS)
+        assert report.built == ["app.yaml"]
+        assert json.loads((out / "app.json").read_text())["name"] == "Changed"
+
+    def test_option_change_rebuilds(self, tree, tmp_path):
+        out = tmp_path / "out"
+        build(tree, out, JSON_OPTIONS)
+        report = build(tree, out, RenderOptions(outformat="json", max_depth=0))
+        assert len(report.built) == 3
+
+    def test_missing_output_rebuilds(self, tree, tmp_path):
+        out = tmp_path / "out"
+        build(tree, out, JSON_OPTIONS)
+        (out / "app.json").unlink()
+        assert build(tree, out, JSON_OPTIONS).built == ["app.yaml"]
+
+    def test_deleted_source_removes_orphan(self, tree, tmp_path):
+        out = tmp_path / "out"
+        build(tree, out, JSON_OPTIONS)
+        (tree / "app.yaml").unlink()
+        report = build(tree, out, JSON_OPTIONS)
+        assert report.removed == ["app.json"]
+        assert not (out / "app.json").exists()
+
+    def test_force_still_removes_orphans(self, tree, tmp_path):
+        out = tmp_path / "out"
+        build(tree, out, JSON_OPTIONS)
+        (tree / "app.yaml").unlink()
+        report = build(tree, out, JSON_OPTIONS, force=True)
+        assert len(report.built) == 2
+        assert report.removed == ["app.json"]
+        assert not (out / "app.json").exists()
+
+    def test_sources_sharing_an_output_name_fail(self, tree, tmp_path, sample_terraform_plan):
+        out = tmp_path / "out"
+        build(tree, out, JSON_OPTIONS)
+        (tree / "app.tfplan.json").write_text(json.dumps(sample_terraform_plan))
+        report = build(tree, out, JSON_OPTIONS)
+        assert set(report.failed) == {"app.yaml", "app.tfplan.json"}
+        assert "app.tfplan.json" in report.failed["app.yaml"]
+        assert json.loads((out / "app.json").read_text())["name"] == "Test Diagram"
+
+        (tree / "app.tfplan.json").unlink()
+        report = build(tree, out, JSON_OPTIONS)
+        assert report.built == ["app.yaml"]
+        assert report.removed == []
+
+    def test_format_change_removes_old_outputs(self, tree, tmp_path):
+        out = tmp_path / "out"
+        build(tree, out, JSON_OPTIONS)
+        build(tree, out, RenderOptions(outformat="mermaid"))
+        assert (out / "app.mmd").exists()
+        assert not (out / "app.json").exists()
+
+    def test_fragment_edit_rebuilds_includer(self, tree, tmp_path):
+        (tree / "shared.yaml").write_text(
+            yaml.dump({"services": {"logs": {"type": "management.Cloudwatch", "label": "Logs"}}})
+        )
+        (tree / "uses.yaml").write_text(
+            yaml.dump({"diagram": {"name": "Uses", "include": "shared.yaml", "services": {}}})
+        )
+        out = tmp_path / "out"
+        report = build(tree, out, JSON_OPTIONS)
+        assert "shared.yaml" in report.built
+        assert not (out / "shared.json").exists()
+
+        (tree / "shared.yaml").write_text(
+            yaml.dump({"services": {"logs2": {"type": "management.Cloudwatch", "label": "Logs"}}})
+        )
+        report = build(tree, out, JSON_OPTIONS)
+        assert sorted(report.built) == ["shared.yaml", "uses.yaml"]
+
+    def test_failure_is_reported_and_retried(self, tree, tmp_path):
+        out = tmp_path / "out"
+        build(tree, out, JSON_OPTIONS)
+        (tree / "app.yaml").write_text(yaml.dump({"diagram": {"name": "Broken"}}))
+        report = build(tree, out, JSON_OPTIONS)
+        assert "app.yaml" in report.failed
+        assert (out / "app.json").exists()
+        assert "app.yaml" in build(tree, out, JSON_OPTIONS).failed
+
+    def test_multi_diagram_source(self, tmp_path, valid_yaml_dict, nested_yaml_dict):
+        src = tmp_path / "src"
+        src.mkdir()
+        (src / "views.yaml").write_text(yaml.dump_all([valid_yaml_dict, nested_yaml_dict]))
+        out = tmp_path / "out"
+        build(src, out, JSON_OPTIONS)
+        assert (out / "views" / "test-diagram.json").exists()
+        assert (out / "views" / "nested-test.json").exists()
+
+    def test_views_sharing_a_name_get_suffixes(self, tmp_path, valid_yaml_dict):
+        src = tmp_path / "src"
+        src.mkdir()
+        (src / "views.yaml").write_text(yaml.dump_all([valid_yaml_dict, valid_yaml_dict]))
+        out = tmp_path / "out"
+        report = build(src, out, JSON_OPTIONS)
+        assert not report.failed
+        manifest = json.loads((out / MANIFEST_NAME).read_text())
+        assert manifest["entries"]["views.yaml"]["outputs"] == [
+            "views/test-diagram.json",
+            "views/test-diagram-2.json",
+        ]
+        assert (out / "views" / "test-diagram-2.json").exists()
+
+    def test_raster_formats_use_the_renderer(self, tree, tmp_path):
+        def _fake_render(diagram, output, outformat, icon_cache=None, quality="final"):
+            Path(output).write_bytes(b"png")
+            return output
+
+        with patch("awsdiagram.renderer.render", side_effect=_fake_render) as mock_render:
+            build(tree, tmp_path / "out", RenderOptions())
+        assert mock_render.call_count == 3
+        assert (tmp_path / "out" / "app.png").read_bytes() == b"png"
+
+    def test_output_dir_inside_source_tree_is_skipped(self, tree):
+        out = tree / "_build"
+        build(tree, out, RenderOptions(outformat="mermaid"))
+        (out / "stray.yaml").write_text("not: a diagram")
+        report = build(tree, out, RenderOptions(outformat="mermaid"))
+        assert report.built == []
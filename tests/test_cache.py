@@ -0,0 +1,75 @@
+"""Tests for the persistent parse cache."""
+
+import json
+import pickle
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from awsdiagram.cache import ParseCache, parse_cached
+from awsdiagram.errors import SchemaValidationError
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ParseCache(tmp_path / "cache")
+
+
+class TestParseCache:
+    def test_second_parse_is_a_hit(self, cache, yaml_file):
+        first = parse_cached(yaml_file, cache)
+        with patch("awsdiagram.cache.parse_all_string") as mock_parse:
+            second = parse_cached(yaml_file, cache)
+        mock_parse.assert_not_called()
+        assert second == first
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_edit_invalidates(self, cache, yaml_file, valid_yaml_dict):
+        parse_cached(yaml_file, cache)
+        valid_yaml_dict["diagram"]["name"] = "Renamed"
+        yaml_file.write_text(yaml.dump(valid_yaml_dict))
+        assert parse_cached(yaml_file, cache)[0].name == "Renamed"
+        assert cache.hits == 0
+
+    def test_corrupt_entry_is_a_miss(self, cache, yaml_file):
+        parse_cached(yaml_file, cache)
+        [entry] = list(cache.directory.iterdir())
+        entry.write_bytes(b"\x80\x05garbage")
+        assert parse_cached(yaml_file, cache)[0].name == "Test Diagram"
+        assert cache.hits == 0
+
+    def test_entries_are_plain_json(self, cache, yaml_file):
+        parse_cached(yaml_file, cache)
+        [entry] = list(cache.directory.iterdir())
+        payload = json.loads(entry.read_text())
+        assert payload["diagrams"][0]["name"] == "Test Diagram"
+
+    def test_pickled_entries_are_never_loaded(self, cache, yaml_file):
+        key = cache.key(yaml_file, yaml_file.read_text())
+        cache.directory.mkdir(parents=True)
+        (cache.directory / f"{key}.pickle").write_bytes(pickle.dumps({"deps": {}, "diagrams": []}))
+        assert parse_cached(yaml_file, cache)[0].name == "Test Diagram"
+        assert cache.hits == 0
+
+    def test_errors_are_not_cached(self, cache, tmp_path):
+        p = tmp_path / "bad.yaml"
+        p.write_text(yaml.dump({"diagram": {"name": "Bad"}}))
+        for _ in range(2):
+            with pytest.raises(SchemaValidationError):
+                parse_cached(p, cache)
+        assert not cache.directory.exists() or not list(cache.directory.iterdir())
+
+    def test_size_is_bounded(self, tmp_path, valid_yaml_dict):
+        cache = ParseCache(tmp_path / "cache", max_bytes=2000)
+        for i in range(20):
+            valid_yaml_dict["diagram"]["name"] = f"Diagram {i}"
+            p = tmp_path / f"d{i}.yaml"
+            p.write_text(yaml.dump(valid_yaml_dict))
+            parse_cached(p, cache)
+        total = sum(e.stat().st_size for e in cache.directory.iterdir())
+        assert total <= 2000
+        assert 0 < len(list(cache.directory.iterdir())) < 20
+
+    def test_without_cache(self, yaml_file):
+        assert parse_cached(yaml_file, None)[0].name == "Test Diagram"
@@ -1,6 +1,7 @@
 """Tests for the CLI."""
 
 import json
+from unittest.mock import patch
 
 import pytest
 import yaml
@@ -25,6 +26,45 @@ class TestRenderCommand:
         result = runner.invoke(main, ["render", str(p)])
         assert result.exit_code != 0
 
+    def test_render_tiles_requires_png(self, runner, yaml_file):
+        result = runner.invoke(main, ["render", str(yaml_file), "--tiles", "2", "-f", "svg"])
+        assert result.exit_code != 0
+        assert "--tiles" in result.output
+
+    def test_render_tiles_default_directory(self, runner, yaml_file, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        with patch("awsdiagram.tiles.render_tiles", side_effect=lambda d, out, n, *a, **kw: f"{out}/index.html") as tiles:
+            result = runner.invoke(main, ["render", str(yaml_file), "--tiles", "2"])
+        assert result.exit_code == 0
+        assert tiles.call_args.args[1] == "test-diagram-tiles"
+        assert "test-diagram-tiles/index.html" in result.output
+
+    def test_render_quality(self, runner, yaml_file, tmp_path):
+        with patch("awsdiagram.renderer.render", return_value="out.png") as render:
+            result = runner.invoke(main, ["render", str(yaml_file), "-o", str(tmp_path / "out.png"), "--quality", "draft"])
+        assert result.exit_code == 0
+        assert render.call_args.kwargs["quality"] == "draft"
+
+    def test_render_unknown_quality(self, runner, yaml_file):
+        result = runner.invoke(main, ["render", str(yaml_file), "--quality", "best"])
+        assert result.exit_code != 0
+        assert "--quality" in result.output
+
+    def test_render_unknown_focus(self, runner, yaml_file):
+        result = runner.invoke(main, ["render", str(yaml_file), "--focus", "ghost"])
+        assert result.exit_code != 0
+        assert "ghost" in result.output
+
+
+    def test_render_multi_diagram_file(self, runner, valid_yaml_dict, nested_yaml_dict, tmp_path):
+        p = tmp_path / "multi.yaml"
+        p.write_text(yaml.dump_all([valid_yaml_dict, nested_yaml_dict]))
+        with patch("awsdiagram.renderer.render", side_effect=lambda d, out, fmt, **kw: out):
+            result = runner.invoke(main, ["render", str(p), "-o", str(tmp_path / "out")])
+        assert result.exit_code == 0
+        assert "test-diagram.png" in result.output
+        assert "nested-test.png" in result.output
+
 
 class TestValidateCommand:
     def test_validate_valid_file(self, runner, yaml_file):
@@ -32,10 +72,28 @@ class TestValidateCommand:
         assert result.exit_code == 0
         assert "Valid" in result.output
 
+    def test_validate_uses_parse_cache(self, runner, yaml_file, tmp_path):
+        cache_dir = tmp_path / "cli-cache"
+        args = ["--cache-dir", str(cache_dir), "validate", str(yaml_file)]
+        assert runner.invoke(main, args).exit_code == 0
+        assert list((cache_dir / "parse").iterdir())
+        assert runner.invoke(main, args).exit_code == 0
+
+    def test_validate_no_cache(self, runner, yaml_file, tmp_path):
+        cache_dir = tmp_path / "cli-cache"
+        args = ["--cache-dir", str(cache_dir), "--no-cache", "validate", str(yaml_file)]
+        assert runner.invoke(main, args).exit_code == 0
+        assert not cache_dir.exists()
+
     def test_validate_missing_file(self, runner):
         result = runner.invoke(main, ["validate", "nonexistent.yaml"])
         assert result.exit_code != 0
 
+    def test_validate_empty_directory(self, runner, tmp_path):
+        result = runner.invoke(main, ["validate", str(tmp_path)])
+        assert result.exit_code == 1
+        assert "No YAML files" in result.output
+
     def test_validate_bad_schema(self, runner, tmp_path):
         p = tmp_path / "bad.yaml"
         p.write_text(yaml.dump({"diagram": {"name": "Bad"}}))
@@ -58,6 +116,76 @@ class TestValidateCommand:
         assert "ghost" in result.output
 
 
+    def test_validate_directory_sarif(self, runner, yaml_file, tmp_path):
+        (tmp_path / "bad.yaml").write_text(yaml.dump({"diagram": {"name": "Bad"}}))
+        result = runner.invoke(main, ["validate", str(tmp_path), "-f", "sarif", "-j", "1"])
+        assert result.exit_code == 1
+        sarif = json.loads(result.output)
+        [finding] = sarif["runs"][0]["results"]
+        assert finding["ruleId"] == "SchemaValidationError"
+
+
+class TestExportCommand:
+    def test_export_json(self, runner, yaml_file, tmp_path):
+        out = tmp_path / "out.json"
+        result = runner.invoke(main, ["export", str(yaml_file), "-f", "json", "-o", str(out)])
+        assert result.exit_code == 0
+        assert "Exported" in result.output
+        assert json.loads(out.read_text())["name"] == "Test Diagram"
+
+    def test_export_views_sharing_a_name(self, runner, valid_yaml_dict, tmp_path):
+        path = tmp_path / "views.yaml"
+        path.write_text(yaml.dump_all([valid_yaml_dict, valid_yaml_dict]))
+        out = tmp_path / "out"
+        result = runner.invoke(main, ["export", str(path), "-f", "json", "-o", str(out)])
+        assert result.exit_code == 0
+        assert sorted(p.name for p in out.iterdir()) == ["test-diagram-2.json", "test-diagram.json"]
+
+    def test_export_requires_format(self, runner, yaml_file):
+        result = runner.invoke(main, ["export", str(yaml_file)])
+        assert result.exit_code != 0
+
+
+class TestBuildCommand:
+    def test_build_then_up_to_date(self, runner, yaml_file, tmp_path):
+        args = ["build", str(yaml_file.parent), "-o", str(tmp_path / "out"), "-f", "json"]
+        result = runner.invoke(main, args)
+        assert result.exit_code == 0
+        assert "1 built" in result.output
+        result = runner.invoke(main, args)
+        assert result.exit_code == 0
+        assert "0 built, 1 up to date" in result.output
+
+    def test_build_reports_failures(self, runner, tmp_path):
+        src = tmp_path / "src"
+        src.mkdir()
+        (src / "bad.yaml").write_text(yaml.dump({"diagram": {"name": "Bad"}}))
+        result = runner.invoke(main, ["build", str(src), "-o", str(tmp_path / "out"), "-f", "json"])
+        assert result.exit_code == 1
+        assert "Error: bad.yaml" in result.output
+
+
+class TestStatsCommand:
+    def test_stats_text(self, runner, yaml_file):
+        result = runner.invoke(main, ["stats", str(yaml_file)])
+        assert result.exit_code == 0
+        assert "Services:" in result.output
+        assert "Predicted render:    ~" in result.output
+        assert "(uncalibrated)" in result.output
+
+    def test_stats_json(self, runner, yaml_file):
+        result = runner.invoke(main, ["stats", str(yaml_file), "--json"])
+        assert result.exit_code == 0
+        [stats] = json.loads(result.output)
+        assert stats["services"] > 0
+        assert "seconds" in stats["estimate"]
+
+    def test_render_has_no_cost_limit(self, runner, yaml_file):
+        result = runner.invoke(main, ["render", str(yaml_file), "--max-cost", "0"])
+        assert result.exit_code != 0
+        assert "No such option" in result.output
+
+
 class TestImportCommand:
     def test_import_terraform(self, runner, terraform_plan_file, tmp_path):
         out = tmp_path / "result.yaml"
@@ -71,6 +199,44 @@ class TestImportCommand:
         data = yaml.safe_load(out.read_text())
         assert "diagram" in data
 
+    def test_import_terraform_report_unmapped(self, runner, sample_terraform_plan, tmp_path):
+        resources = sample_terraform_plan["planned_values"]["root_module"]["resources"]
+        resources.append({"type": "aws_made_up", "name": "x", "values": {}})
+        plan = tmp_path / "plan.json"
+        plan.write_text(json.dumps(sample_terraform_plan))
+        result = runner.invoke(
+            main,
+            ["import", "terraform", str(plan), "-o", str(tmp_path / "out.yaml"), "--report-unmapped"],
+        )
+        assert result.exit_code == 0
+        assert "aws_made_up" in result.output
+
+    def test_import_terraform_incremental(self, runner, terraform_plan_file, tmp_path):
+        out = tmp_path / "infra.yaml"
+        args = ["import", "terraform", str(terraform_plan_file), "-o", str(out), "--incremental"]
+        assert runner.invoke(main, args).exit_code == 0
+        result = runner.invoke(main, args)
+        assert result.exit_code == 0
+        assert "0 added, 0 updated, 0 removed" in result.output
+        assert (tmp_path / "infra.tfids.json").exists()
+
+    def test_import_terraform_changes(self, runner, tmp_path):
+        plan = tmp_path / "plan.json"
+        change = {"actions": ["create"], "before": None, "after": {"tags": {"Name": "Web"}}}
+        plan.write_text(json.dumps({"resource_changes": [
+            {"address": "aws_instance.web", "type": "aws_instance", "name": "web", "change": change}
+        ]}))
+        out = tmp_path / "changes.yaml"
+        result = runner.invoke(main, ["import", "terraform", str(plan), "-o", str(out), "--changes"])
+        assert result.exit_code == 0
+        assert "(create)" in out.read_text()
+
+    def test_import_terraform_changes_rejects_incremental(self, runner, terraform_plan_file):
+        args = ["import", "terraform", str(terraform_plan_file), "--changes", "--incremental"]
+        result = runner.invoke(main, args)
+        assert result.exit_code != 0
+        assert "--incremental" in result.output
+
     def test_import_terraform_missing_file(self, runner):
         result = runner.invoke(main, ["import", "terraform", "nope.json"])
         assert result.exit_code != 0
@@ -0,0 +1,102 @@
+"""Tests for layout-free exporters."""
+
+import json
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from awsdiagram.errors import RenderError
+from awsdiagram.models import ConnectionDef, DiagramDef, GroupDef, ServiceDef
+from awsdiagram.exporters import export, to_drawio, to_json, to_mermaid
+
+
+@pytest.fixture
+def diagram():
+    return DiagramDef(
+        name="Shop",
+        services={
+            "lb": ServiceDef(type="network.ELB", label="Load Balancer"),
+            "web": ServiceDef(type="compute.EC2", label='Web "A"'),
+            "end": ServiceDef(type="database.RDS", label="DB"),
+            "q": ServiceDef(type="integration.SQS", label="Queue"),
+        },
+        groups=[
+            GroupDef(
+                name="VPC",
+                services=["lb"],
+                children=[GroupDef(name="Private", services=["web", "end"])],
+            )
+        ],
+        connections=[
+            ConnectionDef(from_="lb", to="web"),
+            ConnectionDef(from_="web", to=["end", "q"], label="SQL"),
+        ],
+    )
+
+
+class TestMermaid:
+    def test_flowchart_with_nested_subgraphs(self, diagram):
+        text = to_mermaid(diagram)
+        assert "flowchart TB" in text
+        assert 'subgraph group_0["VPC"]' in text
+        assert 'subgraph group_0_0["Private"]' in text
+        assert text.index("group_0_0") < text.index('web["')
+
+    def test_escapes_and_reserved_ids(self, diagram):
+        text = to_mermaid(diagram)
+        assert 'web["Web #quot;A#quot;"]' in text
+        assert 'n_end["DB"]' in text
+        assert "web -->|SQL| n_end" in text
+        assert "lb --> web" in text
+
+
+class TestDrawio:
+    def test_groups_are_containers(self, diagram):
+        root = ET.fromstring(to_drawio(diagram))
+        cells = {c.get("id"): c for c in root.iter("mxCell")}
+        assert "swimlane" in cells["group_0"].get("style")
+        assert cells["group_0_0"].get("parent") == "group_0"
+        assert cells["svc:web"].get("parent") == "group_0_0"
+        assert cells["svc:q"].get("parent") == "1"
+
+    def test_parents_precede_children(self, diagram):
+        ids = [c.get("id") for c in ET.fromstring(to_drawio(diagram)).iter("mxCell")]
+        assert ids.index("group_0") < ids.index("group_0_0") < ids.index("svc:web")
+
+    def test_edges_reference_service_cells(self, diagram):
+        edges = [c for c in ET.fromstring(to_drawio(diagram)).iter("mxCell") if c.get("edge")]
+        assert [(e.get("source"), e.get("target")) for e in edges] == [
+            ("svc:lb", "svc:web"),
+            ("svc:web", "svc:end"),
+            ("svc:web", "svc:q"),
+        ]
+
+
+class TestJson:
+    def test_normalized_graph(self, diagram):
+        graph = json.loads(to_json(diagram))
+        nodes = {n["id"]: n for n in graph["nodes"]}
+        assert nodes["web"]["group"] == "group_0_0"
+        assert nodes["q"]["group"] is None
+        assert graph["groups"][1]["parent"] == "group_0"
+        assert {"from": "web", "to": "q", "label": "SQL"} in graph["edges"]
+        assert len(graph["edges"]) == 3
+
+
+class TestExport:
+    def test_unknown_format(self, diagram):
+        with pytest.raises(RenderError, match="Unsupported export format"):
+            export(diagram, "visio")
+
+    def test_export_does_not_import_diagrams(self, yaml_file, tmp_path):
+        code = (
+            "import sys\n"
+            "from awsdiagram.cli import main\n"
+            f"main(['export', {str(yaml_file)!r}, '-f', 'mermaid', '-o', {str(tmp_path / 'out.mmd')!r}],"
+            " standalone_mode=False)\n"
+            "assert 'diagrams' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+        assert (tmp_path / "out.mmd").read_text().startswith("---")
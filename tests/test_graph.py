@@ -0,0 +1,64 @@
+"""Tests for the compact graph representation."""
+
+import gc
+import tracemalloc
+
+from awsdiagram.graph import CompactGraph
+from awsdiagram.models import ConnectionDef, DiagramDef, GroupDef, RootModel, ServiceDef
+
+
+def _big(services: int) -> DiagramDef:
+    sids = [f"svc-{i}" for i in range(services)]
+    return DiagramDef(
+        name="Big",
+        services={sid: ServiceDef(type="compute.EC2", label=sid.upper()) for sid in sids},
+        groups=[GroupDef(name="VPC", services=sids[: services // 2])],
+        connections=[
+            ConnectionDef(from_=sids[i], to=sids[(i + 1) % services], label="tcp")
+            for i in range(services)
+        ],
+    )
+
+
+class TestCompactGraph:
+    def test_structure(self, nested_yaml_dict):
+        diagram = RootModel.model_validate(nested_yaml_dict).diagram
+        graph = CompactGraph.from_diagram(diagram)
+        assert graph.ids == list(diagram.services)
+        assert graph.groups[0].name == diagram.groups[0].name
+        child = graph.groups[0].children[0]
+        assert [graph.ids[i] for i in child.members] == diagram.groups[0].children[0].services
+
+    def test_list_and_single_targets(self):
+        diagram = DiagramDef(
+            name="Fan",
+            services={sid: ServiceDef(type="compute.EC2", label=sid) for sid in "abc"},
+            connections=[
+                ConnectionDef(from_="a", to=["b", "c"], label="x"),
+                ConnectionDef(from_="b", to="c"),
+                ConnectionDef(from_="c", to=["a"]),
+            ],
+        )
+        graph = CompactGraph.from_diagram(diagram)
+        assert list(graph.edges()) == [(0, 1), (0, 2), (1, 2), (2, 0)]
+        assert list(graph.connection_targets(0)) == [1, 2]
+
+    def test_indices(self):
+        graph = CompactGraph.from_diagram(_big(10))
+        assert len(graph) == 10
+        assert graph.index("svc-3") == 3
+        assert list(graph.groups[0].members) == [0, 1, 2, 3, 4]
+
+    def test_uses_much_less_memory(self):
+        def _retained(build):
+            gc.collect()
+            tracemalloc.start()
+            obj = build()
+            gc.collect()
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            return obj, size
+
+        diagram, full = _retained(lambda: _big(2000))
+        _, compact = _retained(lambda: CompactGraph.from_diagram(diagram))
+        assert compact * 4 < full
@@ -0,0 +1,103 @@
+"""Tests for the pre-scaled icon cache."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from diagrams.aws.compute import EC2, Lambda
+from diagrams.aws.database import RDS
+
+from awsdiagram.icons import ICON_CACHE_ENV, IconCache, icon_size, user_cache_dir
+from awsdiagram.models import DiagramDef, ServiceDef
+from awsdiagram.renderer import to_dot
+
+
+def _fake_scale(source, target, size):
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(b"png")
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return IconCache(tmp_path, size=64)
+
+
+class TestCacheLocation:
+    def test_env_override(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(ICON_CACHE_ENV, str(tmp_path))
+        assert user_cache_dir() == tmp_path
+
+    def test_xdg_cache_home(self, tmp_path, monkeypatch):
+        monkeypatch.delenv(ICON_CACHE_ENV, raising=False)
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        with patch("awsdiagram.icons.sys.platform", "linux"):
+            assert user_cache_dir() == tmp_path / "awsdiagram" / "icons"
+
+    def test_keyed_by_diagrams_version_and_size(self, tmp_path):
+        with patch("awsdiagram.icons._diagrams_version", return_value="9.9"):
+            cache = IconCache(tmp_path, size=134)
+        assert cache.directory == tmp_path / "diagrams-9.9" / "134px"
+
+    def test_icon_size_follows_dpi(self):
+        assert icon_size() == 134
+        assert icon_size(192) == 269
+
+
+class TestIconCache:
+    def test_scales_once_then_hits(self, cache):
+        with patch("awsdiagram.icons._scale", side_effect=_fake_scale) as scale:
+            first = cache.path(EC2)
+            second = cache.path(EC2)
+        assert first == second
+        assert Path(first).is_relative_to(cache.directory)
+        assert first.endswith("ec2.png")
+        assert scale.call_count == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_falls_back_without_pillow(self, cache):
+        with patch("awsdiagram.icons._scale", side_effect=ImportError("No module named 'PIL'")):
+            path = cache.path(EC2)
+        assert Path(path).exists()
+        assert not Path(path).is_relative_to(cache.directory)
+
+    def test_iconless_class(self, cache):
+        assert cache.path(object) is None
+
+    def test_images_scale_each_class_once(self, cache):
+        type_map = {"a": EC2, "b": EC2, "c": RDS, "d": object}
+        with patch("awsdiagram.icons._scale", side_effect=_fake_scale) as scale:
+            images = cache.images(type_map)
+        assert set(images) == {"a", "b", "c"}
+        assert images["a"] == images["b"]
+        assert scale.call_count == 2
+
+    def test_real_scaling(self, cache):
+        Image = pytest.importorskip("PIL.Image")
+        with Image.open(cache.path(Lambda)) as image:
+            assert max(image.size) == 64
+
+
+class TestRendererIntegration:
+    def _diagram(self, **attrs):
+        return DiagramDef(
+            name="Icons",
+            services={
+                "web": ServiceDef(type="compute.EC2", label="Web"),
+                "db": ServiceDef(type="database.RDS", label="DB", attrs=attrs),
+            },
+        )
+
+    def test_dot_points_at_cached_icons(self, cache):
+        with patch("awsdiagram.icons._scale", side_effect=_fake_scale):
+            dot = to_dot(self._diagram(), icon_cache=cache)
+        assert str(cache.directory / "resources" / "aws" / "compute" / "ec2.png") in dot
+        assert "rds.png" in dot
+
+    def test_default_dot_is_unchanged(self, cache):
+        assert str(cache.directory) not in to_dot(self._diagram())
+
+    def test_service_attrs_are_kept_alongside_the_icon(self, cache):
+        with patch("awsdiagram.icons._scale", side_effect=_fake_scale):
+            dot = to_dot(self._diagram(color="red"), icon_cache=cache)
+        assert "rds.png" in dot
+        assert "color=red" in dot
@@ -0,0 +1,145 @@
+"""Tests for include: fragments."""
+
+import os
+
+import pytest
+import yaml
+
+from awsdiagram.cache import ParseCache, parse_cached
+from awsdiagram.errors import IncludeError, ServiceReferenceError
+from awsdiagram.parser import load_fragment, parse, parse_all, parse_string
+
+
+def _write(path, data):
+    path.write_text(yaml.dump(data))
+    return path
+
+
+@pytest.fixture
+def logging_fragment(tmp_path):
+    return _write(
+        tmp_path / "logging.yaml",
+        {
+            "services": {
+                "logs": {"type": "management.Cloudwatch", "label": "Logs"},
+                "trail": {"type": "management.Cloudtrail", "label": "Trail"},
+            },
+            "groups": [{"name": "Logging", "services": ["logs", "trail"]}],
+            "connections": [{"from": "trail", "to": "logs"}],
+        },
+    )
+
+
+def _diagram(include, **extra):
+    block = {
+        "name": "App",
+        "include": include,
+        "services": {"web": {"type": "compute.EC2", "label": "Web"}},
+        "connections": [{"from": "web", "to": "logs"}],
+    }
+    block.update(extra)
+    return {"diagram": block}
+
+
+class TestIncludes:
+    def test_merges_fragment(self, tmp_path, logging_fragment):
+        p = _write(tmp_path / "app.yaml", _diagram("logging.yaml"))
+        diagram = parse(p)
+        assert set(diagram.services) == {"logs", "trail", "web"}
+        assert [g.name for g in diagram.groups] == ["Logging"]
+        pairs = [(c.from_, c.to) for c in diagram.connections]
+        assert pairs == [("trail", "logs"), ("web", "logs")]
+
+    def test_nested_and_diamond_includes(self, tmp_path, logging_fragment):
+        for name in ("a", "b"):
+            _write(
+                tmp_path / f"{name}.yaml",
+                {
+                    "include": "logging.yaml",
+                    "services": {name: {"type": "compute.EC2", "label": name}},
+                },
+            )
+        p = _write(tmp_path / "app.yaml", _diagram(["a.yaml", "b.yaml"]))
+        assert set(parse(p).services) == {"logs", "trail", "a", "b", "web"}
+
+    def test_includes_relative_to_including_file(self, tmp_path, logging_fragment):
+        sub = tmp_path / "shared"
+        sub.mkdir()
+        _write(sub / "net.yaml", {"include": "../logging.yaml"})
+        p = _write(tmp_path / "app.yaml", _diagram("shared/net.yaml"))
+        assert "logs" in parse(p).services
+
+    def test_cycle_detected(self, tmp_path):
+        _write(tmp_path / "a.yaml", {"include": "b.yaml"})
+        _write(tmp_path / "b.yaml", {"include": "a.yaml"})
+        p = _write(tmp_path / "app.yaml", _diagram("a.yaml"))
+        with pytest.raises(IncludeError, match="Include cycle"):
+            parse(p)
+
+    def test_conflict_names_both_files(self, tmp_path, logging_fragment):
+        other = {"services": {"logs": {"type": "storage.S3", "label": "Logs"}}}
+        _write(tmp_path / "other.yaml", other)
+        p = _write(tmp_path / "app.yaml", _diagram(["logging.yaml", "other.yaml"]))
+        with pytest.raises(IncludeError, match="logging.yaml and .*other.yaml"):
+            parse(p)
+
+    def test_own_service_conflicts_with_fragment(self, tmp_path, logging_fragment):
+        data = _diagram("logging.yaml")
+        data["diagram"]["services"]["logs"] = {"type": "storage.S3", "label": "Mine"}
+        p = _write(tmp_path / "app.yaml", data)
+        with pytest.raises(IncludeError, match="'logs'.*already defined in included"):
+            parse(p)
+
+    def test_missing_fragment(self, tmp_path):
+        p = _write(tmp_path / "app.yaml", _diagram("nope.yaml"))
+        with pytest.raises(IncludeError, match="not found"):
+            parse(p)
+
+    def test_references_still_checked(self, tmp_path, logging_fragment):
+        data = _diagram("logging.yaml", connections=[{"from": "web", "to": "ghost"}])
+        p = _write(tmp_path / "app.yaml", data)
+        with pytest.raises(ServiceReferenceError, match="ghost"):
+            parse(p)
+
+    def test_shared_services_include(self, tmp_path):
+        _write(
+            tmp_path / "shared.yaml",
+            {"services": {"logs": {"type": "management.Cloudwatch", "label": "Logs"}}},
+        )
+        data = {"include": "shared.yaml", "diagrams": [{"name": "Logs"}]}
+        p = _write(tmp_path / "views.yaml", data)
+        assert set(parse_all(p)[0].services) == {"logs"}
+
+    def test_shared_include_with_groups_is_rejected(self, tmp_path, logging_fragment):
+        data = {"include": "logging.yaml", "diagrams": [{"name": "Logs"}]}
+        p = _write(tmp_path / "views.yaml", data)
+        with pytest.raises(IncludeError, match="only define services"):
+            parse_all(p)
+
+    def test_rejected_without_a_file(self):
+        with pytest.raises(IncludeError, match="only supported"):
+            parse_string(yaml.dump(_diagram("logging.yaml")))
+
+
+class TestFragmentCache:
+    def test_fragment_loaded_once(self, logging_fragment):
+        assert load_fragment(logging_fragment) is load_fragment(logging_fragment)
+
+    def test_reloaded_after_change(self, logging_fragment):
+        first = load_fragment(logging_fragment)
+        _write(logging_fragment, {"services": {"x": {"type": "compute.EC2", "label": "X"}}})
+        stat = logging_fragment.stat()
+        os.utime(logging_fragment, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert set(load_fragment(logging_fragment).services) == {"x"}
+        assert first is not load_fragment(logging_fragment)
+
+    def test_parse_cache_misses_when_fragment_changes(self, tmp_path, logging_fragment):
+        cache = ParseCache(tmp_path / "cache")
+        p = _write(tmp_path / "app.yaml", _diagram("logging.yaml"))
+        parse_cached(p, cache)
+        parse_cached(p, cache)
+        assert cache.hits == 1
+        stat = logging_fragment.stat()
+        os.utime(logging_fragment, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        parse_cached(p, cache)
+        assert cache.hits == 1
@@ -0,0 +1,107 @@
+"""Tests for the interactive HTML output."""
+
+import html
+import json
+import re
+from unittest.mock import patch
+
+import pytest
+
+from awsdiagram.interactive import ROOT_VIEW, build_views, render_interactive
+from awsdiagram.models import DiagramDef, GroupDef
+from awsdiagram.pipeline import RenderOptions, render_view
+
+
+def _fake_graphviz(cmd, source):
+    name = re.search(r'label="?([^"\n]*)"?', source).group(1)
+    return (
+        '<?xml version="1.0"?>\n<!DOCTYPE svg>\n'
+        '<svg xmlns="http://www.w3.org/2000/svg"><g class="graph">'
+        f"<title>{html.escape(name)}</title></g></svg>"
+    )
+
+
+@pytest.fixture
+def nested(nested_yaml_dict):
+    return DiagramDef.model_validate(nested_yaml_dict["diagram"])
+
+
+@pytest.fixture
+def graphviz(monkeypatch):
+    monkeypatch.setattr("awsdiagram.interactive.check_graphviz", lambda: None)
+    with patch("awsdiagram.interactive.run_graphviz", side_effect=_fake_graphviz) as run:
+        yield run
+
+
+class TestBuildViews:
+    def test_depth_one_collapses_subnets(self, nested):
+        views, diagrams = build_views(nested, 1)
+        assert list(views) == [ROOT_VIEW, "group_0_0", "group_0_1"]
+        assert views[ROOT_VIEW].expands == {"group_0_0": "group_0_0", "group_0_1": "group_0_1"}
+        assert set(diagrams[ROOT_VIEW].services) == {"group_0_0", "group_0_1"}
+        assert set(diagrams["group_0_0"].services) == {"lb", "web"}
+        assert views["group_0_0"].parent == ROOT_VIEW
+        assert views["group_0_0"].title == "Public Subnet"
+
+    def test_group_views_keep_internal_connections(self, nested):
+        _, diagrams = build_views(nested, 1)
+        assert [(c.from_, c.to) for c in diagrams["group_0_0"].connections] == [("lb", "web")]
+
+    def test_depth_zero_expands_level_by_level(self, nested):
+        views, diagrams = build_views(nested, 0)
+        assert views[ROOT_VIEW].expands == {"group_0": "group_0"}
+        assert views["group_0"].expands == {"group_0_0": "group_0_0", "group_0_1": "group_0_1"}
+        assert views["group_0_1"].parent == "group_0"
+        assert diagrams["group_0"].groups[0].name == "AWS Cloud"
+
+    def test_empty_groups_are_not_expandable(self, nested):
+        nested.groups[0].children[0].children.append(GroupDef(name="Empty"))
+        nested.groups[0].children.append(GroupDef(name="Also Empty"))
+        views, diagrams = build_views(nested, 1)
+        assert list(views) == [ROOT_VIEW, "group_0_0", "group_0_1"]
+        assert "group_0_2" in diagrams[ROOT_VIEW].services
+        assert views["group_0_0"].expands == {}
+        assert set(diagrams["group_0_0"].services) == {"lb", "web", "group_0_0"}
+
+    def test_fully_expanded(self, nested):
+        views, _ = build_views(nested, 5)
+        assert list(views) == [ROOT_VIEW]
+
+
+class TestRenderInteractive:
+    def test_writes_page_and_lazy_group_scripts(self, nested, graphviz, tmp_path):
+        page = render_interactive(nested, str(tmp_path / "nested"), 1)
+
+        assert page == str(tmp_path / "nested.html")
+        assert graphviz.call_count == 3
+        assets = tmp_path / "nested_files"
+        assert sorted(p.name for p in assets.iterdir()) == ["group_0_0.js", "group_0_1.js"]
+        script = (assets / "group_0_0.js").read_text()
+        assert script.startswith('awsdiagramView("group_0_0", ')
+        assert "<?xml" not in script
+
+        page_text = (tmp_path / "nested.html").read_text()
+        views = json.loads(re.search(r"const views = (.*);", page_text).group(1))
+        assert views["group_0_1"]["script"] == "nested_files/group_0_1.js"
+        assert views[ROOT_VIEW]["script"] is None
+        assert "<title>Nested Test</title>" in page_text
+
+    def test_no_groups_writes_only_the_page(self, graphviz, tmp_path, valid_yaml_dict):
+        diagram = DiagramDef.model_validate(valid_yaml_dict["diagram"])
+        render_interactive(diagram, str(tmp_path / "flat.html"))
+        assert [p.name for p in tmp_path.iterdir()] == ["flat.html"]
+
+    def test_script_end_tags_are_escaped(self, nested, graphviz, tmp_path):
+        nested.groups[0].children[0].name = "</script><b>"
+        render_interactive(nested, str(tmp_path / "x.html"))
+        assert "</script><b>" not in (tmp_path / "x.html").read_text()
+
+
+class TestPipeline:
+    @patch("awsdiagram.interactive.render_interactive", return_value="out.html")
+    def test_max_depth_sets_initial_levels(self, mock_render, nested):
+        render_view(nested, "out.html", RenderOptions(outformat="html", max_depth=0))
+        diagram, output, depth = mock_render.call_args.args[:3]
+        # The tree reaches the renderer intact; max_depth only chooses the first view.
+        assert diagram.groups[0].children
+        assert (output, depth) == ("out.html", 0)
@@ -0,0 +1,161 @@
+"""Tests for metrics recording and export."""
+
+import json
+
+import pytest
+import yaml
+from click.testing import CliRunner
+
+from awsdiagram.cache import ParseCache, parse_cached
+from awsdiagram.cli import main
+from awsdiagram.errors import MetricsError
+from awsdiagram.metrics import REGISTRY, MetricsRegistry, record_diagram
+from awsdiagram.models import ConnectionDef, DiagramDef, ServiceDef
+
+STAGE = "awsdiagram_stage_duration_seconds"
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    REGISTRY.reset()
+    yield
+    REGISTRY.reset()
+
+
+class TestRegistry:
+    def test_counters_accumulate_per_label_set(self, registry):
+        registry.inc("awsdiagram_cache_requests", cache="parse", result="hit")
+        registry.inc("awsdiagram_cache_requests", cache="parse", result="hit")
+        registry.inc("awsdiagram_cache_requests", result="miss", cache="parse")
+        assert registry.counter_value("awsdiagram_cache_requests", cache="parse", result="hit") == 2
+        assert registry.counter_value("awsdiagram_cache_requests", cache="parse", result="miss") == 1
+
+    def test_timed_observes_even_on_error(self, registry):
+        with pytest.raises(ValueError):
+            with registry.timed("parse"):
+                raise ValueError("boom")
+        assert registry.histogram_count(STAGE, stage="parse") == 1
+
+    def test_unknown_or_mistyped_metric(self, registry):
+        with pytest.raises(MetricsError, match="Unknown metric"):
+            registry.inc("nope")
+        with pytest.raises(MetricsError, match="not a counter"):
+            registry.inc(STAGE)
+
+
+    def test_drain_and_merge(self, registry):
+        registry.inc("awsdiagram_diagrams_rendered", format="png")
+        registry.observe("awsdiagram_diagram_services", 30)
+        data = registry.drain()
+        assert registry.counter_value("awsdiagram_diagrams_rendered", format="png") == 0
+
+        parent = MetricsRegistry()
+        parent.inc("awsdiagram_diagrams_rendered", format="png")
+        parent.merge(data)
+        parent.merge(data)
+        assert parent.counter_value("awsdiagram_diagrams_rendered", format="png") == 3
+        assert parent.histogram_count("awsdiagram_diagram_services") == 2
+        assert "awsdiagram_diagram_services_sum 60" in parent.to_openmetrics()
+
+
+class TestOpenMetrics:
+    def test_histogram_buckets_are_cumulative(self, registry):
+        registry.observe("awsdiagram_diagram_services", 30)
+        registry.observe("awsdiagram_diagram_services", 300)
+        text = registry.to_openmetrics()
+        assert 'awsdiagram_diagram_services_bucket{le="25.0"} 0' in text
+        assert 'awsdiagram_diagram_services_bucket{le="50.0"} 1' in text
+        assert 'awsdiagram_diagram_services_bucket{le="500.0"} 2' in text
+        assert 'awsdiagram_diagram_services_bucket{le="+Inf"} 2' in text
+        assert "awsdiagram_diagram_services_sum 330" in text
+        assert "awsdiagram_diagram_services_count 2" in text
+
+    def test_counter_family_and_eof(self, registry):
+        registry.inc("awsdiagram_graphviz_failures", reason="timeout")
+        text = registry.to_openmetrics()
+        assert "# TYPE awsdiagram_graphviz_failures counter" in text
+        assert 'awsdiagram_graphviz_failures_total{reason="timeout"} 1' in text
+        assert text.endswith("# EOF\n")
+
+    def test_prometheus_text_format(self, registry):
+        registry.inc("awsdiagram_graphviz_failures", reason="error")
+        text = registry.to_openmetrics(prometheus=True)
+        assert "# TYPE awsdiagram_graphviz_failures_total counter" in text
+        assert "# EOF" not in text
+
+    def test_label_values_are_escaped(self, registry):
+        registry.inc("awsdiagram_diagrams_rendered", format='a"b\\c\nd')
+        assert 'format="a\\"b\\\\c\\nd"' in registry.to_openmetrics()
+
+    def test_every_family_listed_when_empty(self, registry):
+        text = registry.to_openmetrics()
+        assert text.count("# TYPE ") == 6
+
+
+class TestWrite:
+    def test_textfile_is_replaced(self, registry, tmp_path):
+        path = tmp_path / "awsdiagram.prom"
+        path.write_text("stale")
+        registry.write(path, "prometheus", "render")
+        assert path.read_text().startswith("# HELP")
+        assert [p.name for p in tmp_path.iterdir()] == ["awsdiagram.prom"]
+
+    def test_jsonl_appends_one_line_per_job(self, registry, tmp_path):
+        path = tmp_path / "metrics.jsonl"
+        registry.inc("awsdiagram_diagrams_rendered", format="png")
+        registry.write(path, "jsonl", "render")
+        registry.write(path, "jsonl", "validate")
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["job"] for line in lines] == ["render", "validate"]
+        assert lines[0]["counters"]["awsdiagram_diagrams_rendered"] == [
+            {"labels": {"format": "png"}, "value": 1.0}
+        ]
+
+    def test_unwritable(self, registry, tmp_path):
+        with pytest.raises(MetricsError):
+            registry.write(tmp_path / "missing" / "m.prom", "openmetrics", "render")
+
+
+class TestInstrumentation:
+    def test_record_diagram(self):
+        diagram = DiagramDef(
+            name="D",
+            services={sid: ServiceDef(type="compute.EC2", label=sid) for sid in "abc"},
+            connections=[ConnectionDef(from_="a", to=["b", "c"])],
+        )
+        record_diagram(diagram, "svg")
+        text = REGISTRY.to_openmetrics()
+        assert "awsdiagram_diagram_services_sum 3" in text
+        assert "awsdiagram_diagram_edges_sum 2" in text
+        assert REGISTRY.counter_value("awsdiagram_diagrams_rendered", format="svg") == 1
+
+    def test_parse_cache_and_stages(self, yaml_file, tmp_path):
+        cache = ParseCache(tmp_path / "cache")
+        parse_cached(yaml_file, cache)
+        parse_cached(yaml_file, cache)
+        assert REGISTRY.counter_value("awsdiagram_cache_requests", cache="parse", result="miss") == 1
+        assert REGISTRY.counter_value("awsdiagram_cache_requests", cache="parse", result="hit") == 1
+        assert REGISTRY.histogram_count(STAGE, stage="parse") == 1
+        assert REGISTRY.histogram_count(STAGE, stage="validate") == 1
+
+    def test_cli_writes_metrics_on_exit(self, yaml_file, tmp_path):
+        path = tmp_path / "metrics.jsonl"
+        args = ["--no-cache", "--metrics-file", str(path), "--metrics-format", "jsonl", "validate", str(yaml_file)]
+        result = CliRunner().invoke(main, args)
+        assert result.exit_code == 0
+        line = json.loads(path.read_text())
+        assert line["job"] == "validate"
+        assert {h["labels"]["stage"] for h in line["histograms"][STAGE]} >= {"parse", "validate", "resolve"}
+
+    def test_cli_writes_metrics_after_failure(self, tmp_path):
+        bad = tmp_path / "bad.yaml"
+        bad.write_text(yaml.dump({"diagram": {"name": "x", "services": {"a": {"type": "compute.Nope", "label": "A"}}}}))
+        path = tmp_path / "awsdiagram.prom"
+        result = CliRunner().invoke(main, ["--metrics-file", str(path), "render", str(bad)])
+        assert result.exit_code != 0
+        assert "awsdiagram_stage_duration_seconds_count" in path.read_text()
@@ -29,10 +29,34 @@ class TestServiceDef:
         with pytest.raises(ValidationError, match="category.ClassName"):
             ServiceDef(type="Compute.EC2", label="Web")
 
+    def test_provider_prefix(self):
+        assert ServiceDef(type="onprem:network.Nginx", label="Proxy").type == "onprem:network.Nginx"
+
+    def test_invalid_empty_provider(self):
+        with pytest.raises(ValidationError, match="provider"):
+            ServiceDef(type=":network.Nginx", label="Proxy")
+
     def test_label_required(self):
         with pytest.raises(ValidationError):
             ServiceDef(type="compute.EC2")
 
+    @pytest.mark.parametrize("key", ["label", "nodeid"])
+    def test_reserved_attrs(self, key):
+        with pytest.raises(ValidationError, match="Reserved"):
+            ServiceDef(type="compute.EC2", label="Web", attrs={key: "x"})
+
+    @pytest.mark.parametrize("key", ["image", "shapefile", "fontpath", "URL"])
+    def test_file_and_link_attrs_are_rejected(self, key):
+        with pytest.raises(ValidationError, match="Unsupported attribute"):
+            ServiceDef(type="compute.EC2", label="Web", attrs={key: "/etc/passwd"})
+
+    def test_style_attrs_allowed(self):
+        attrs = {"color": "red", "style": "dashed", "fontcolor": "#333333"}
+        assert ServiceDef(type="compute.EC2", label="Web", attrs=attrs).attrs == attrs
+
+    def test_attrs_default_empty(self):
+        assert ServiceDef(type="compute.EC2", label="Web").attrs == {}
+
 
 class TestGroupDef:
     def test_basic_group(self):
@@ -0,0 +1,82 @@
+"""Tests for parallel per-component layout."""
+
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from awsdiagram.errors import GraphvizNotFoundError, RenderError
+from awsdiagram.models import ConnectionDef, DiagramDef, GroupDef, ServiceDef
+from awsdiagram.packing import render_packed
+
+
+def _islands():
+    """Two accounts with no edges between them."""
+    services = {
+        sid: ServiceDef(type="compute.EC2", label=sid) for sid in ("a1", "a2", "b1", "b2")
+    }
+    return DiagramDef(
+        name="Estate",
+        services=services,
+        groups=[
+            GroupDef(name="Account A", services=["a1", "a2"]),
+            GroupDef(name="Account B", services=["b1", "b2"]),
+        ],
+        connections=[ConnectionDef(from_="b1", to="b2")],
+    )
+
+
+def _fake_run(cmd, input, **kwargs):
+    return subprocess.CompletedProcess(cmd, 0, stdout=f"{cmd[0]}({len(input)})", stderr="")
+
+
+@pytest.fixture
+def graphviz_tools(monkeypatch):
+    monkeypatch.setattr("awsdiagram.packing.check_graphviz", lambda: None)
+    monkeypatch.setattr("awsdiagram.packing.shutil.which", lambda tool: f"/usr/bin/{tool}")
+
+
+class TestRenderPacked:
+    def test_lays_out_each_component_then_packs(self, graphviz_tools, tmp_path):
+        with patch("awsdiagram.packing.subprocess.run", side_effect=_fake_run) as run:
+            result = render_packed(_islands(), str(tmp_path / "out.png"))
+
+        assert result == str(tmp_path / "out.png")
+        tools = [c.args[0][0] for c in run.call_args_list]
+        assert tools == ["dot", "dot", "gvpack", "neato"]
+
+        sources = [c.kwargs["input"] for c in run.call_args_list[:2]]
+        assert "a1" in sources[0] and "b1" not in sources[0]
+        assert "cluster_c1_0" in sources[1]
+
+        neato = run.call_args_list[-1].args[0]
+        assert "-n2" in neato
+        assert "-Glabel=Estate" in neato
+        assert run.call_args_list[-1].kwargs["input"].startswith("gvpack(")
+
+    def test_draft_quality(self, graphviz_tools, tmp_path):
+        with patch("awsdiagram.packing.subprocess.run", side_effect=_fake_run) as run:
+            render_packed(_islands(), str(tmp_path / "out.png"), quality="draft")
+        assert "splines=line" in run.call_args_list[0].kwargs["input"]
+        assert "-Gdpi=48" in run.call_args_list[-1].args[0]
+
+    def test_single_component_uses_regular_render(self, graphviz_tools):
+        diagram = DiagramDef(
+            name="One",
+            services={"web": ServiceDef(type="compute.EC2", label="Web")},
+        )
+        with patch("awsdiagram.packing.render", return_value="one.png") as render:
+            assert render_packed(diagram, "one.png") == "one.png"
+        render.assert_called_once_with(diagram, "one.png", "png", icon_cache=None, quality="final")
+
+    def test_missing_gvpack(self, monkeypatch):
+        monkeypatch.setattr("awsdiagram.packing.check_graphviz", lambda: None)
+        monkeypatch.setattr("awsdiagram.packing.shutil.which", lambda tool: None)
+        with pytest.raises(GraphvizNotFoundError, match="gvpack"):
+            render_packed(_islands(), "out.png")
+
+    def test_graphviz_failure(self, graphviz_tools):
+        failed = subprocess.CompletedProcess(["dot"], 1, stdout="", stderr="syntax error")
+        with patch("awsdiagram.packing.subprocess.run", return_value=failed):
+            with pytest.raises(RenderError, match="syntax error"):
+                render_packed(_islands(), "out.png")
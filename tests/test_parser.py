@@ -8,7 +8,7 @@ from awsdiagram.errors import (
     ServiceReferenceError,
     YamlLoadError,
 )
-from awsdiagram.parser import load_yaml, parse
+from awsdiagram.parser import load_yaml, parse, parse_all, parse_string
 
 
 class TestLoadYaml:
@@ -94,3 +94,72 @@ class TestParse:
         diagram = parse(nested_yaml_file)
         assert len(diagram.groups) == 1
         assert len(diagram.groups[0].children) == 2
+
+
+class TestParseString:
+    def test_valid_parse(self, valid_yaml_dict):
+        diagram = parse_string(yaml.dump(valid_yaml_dict))
+        assert diagram.name == "Test Diagram"
+
+    def test_invalid_yaml_names_source(self):
+        with pytest.raises(YamlLoadError, match="request body"):
+            parse_string("not: valid: yaml: [", source="request body")
+
+
+class TestParseAll:
+    def test_single_diagram(self, yaml_file):
+        diagrams = parse_all(yaml_file)
+        assert [d.name for d in diagrams] == ["Test Diagram"]
+
+    def test_multi_document(self, valid_yaml_dict, nested_yaml_dict, tmp_path):
+        p = tmp_path / "multi.yaml"
+        p.write_text(yaml.dump_all([valid_yaml_dict, nested_yaml_dict]))
+        diagrams = parse_all(p)
+        assert [d.name for d in diagrams] == ["Test Diagram", "Nested Test"]
+
+    def test_shared_services_views(self, tmp_path):
+        data = {
+            "services": {
+                "web": {"type": "compute.EC2", "label": "Web"},
+                "db": {"type": "database.RDS", "label": "DB"},
+                "cache": {"type": "database.ElastiCache", "label": "Cache"},
+            },
+            "diagrams": [
+                {"name": "Data", "connections": [{"from": "web", "to": "db"}]},
+                {
+                    "name": "Extra",
+                    "services": {"q": {"type": "integration.SQS", "label": "Q"}},
+                    "groups": [{"name": "G", "services": ["cache", "q"]}],
+                },
+                {"name": "All"},
+            ],
+        }
+        p = tmp_path / "views.yaml"
+        p.write_text(yaml.dump(data))
+        data_view, extra, everything = parse_all(p)
+        assert set(data_view.services) == {"web", "db"}
+        assert set(extra.services) == {"cache", "q"}
+        assert set(everything.services) == {"web", "db", "cache"}
+        assert data_view.services["web"] is everything.services["web"]
+
+    def test_view_bad_reference_names_view(self, tmp_path):
+        data = {
+            "services": {"web": {"type": "compute.EC2", "label": "Web"}},
+            "diagrams": [{"name": "Broken", "connections": [{"from": "web", "to": "ghost"}]}],
+        }
+        p = tmp_path / "views.yaml"
+        p.write_text(yaml.dump(data))
+        with pytest.raises(ServiceReferenceError, match="(?s)Diagram 'Broken'.*ghost"):
+            parse_all(p)
+
+    def test_error_names_document(self, valid_yaml_dict, tmp_path):
+        p = tmp_path / "multi.yaml"
+        p.write_text(yaml.dump_all([valid_yaml_dict, {"diagram": {"name": "Bad"}}]))
+        with pytest.raises(SchemaValidationError, match="Document 2"):
+            parse_all(p)
+
+    def test_non_mapping_document(self, valid_yaml_dict, tmp_path):
+        p = tmp_path / "multi.yaml"
+        p.write_text(yaml.dump_all([valid_yaml_dict, ["a", "b"]]))
+        with pytest.raises(YamlLoadError, match="document 2"):
+            parse_all(p)
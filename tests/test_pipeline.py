@@ -0,0 +1,74 @@
+"""Tests for the shared render pipeline."""
+
+from pathlib import Path
+from unittest.mock import ANY, patch
+
+from awsdiagram.icons import IconCache
+from awsdiagram.models import ConnectionDef, DiagramDef, GroupDef, ServiceDef
+from awsdiagram.pipeline import RenderOptions, render_many, render_view
+
+
+def _diagram(name="Test"):
+    return DiagramDef(
+        name=name,
+        services={
+            "web": ServiceDef(type="compute.EC2", label="Web"),
+            "db": ServiceDef(type="database.RDS", label="DB"),
+            "q": ServiceDef(type="integration.SQS", label="Q"),
+        },
+        groups=[GroupDef(name="VPC", children=[GroupDef(name="Subnet", services=["web", "db"])])],
+        connections=[ConnectionDef(from_="web", to="db")],
+    )
+
+
+class TestRenderView:
+    @patch("awsdiagram.renderer.render", return_value="out.png")
+    def test_default_options_render_as_is(self, mock_render):
+        diagram = _diagram()
+        assert render_view(diagram, "out.png", RenderOptions()) == "out.png"
+        mock_render.assert_called_once_with(diagram, "out.png", "png", icon_cache=ANY, quality="final")
+        assert isinstance(mock_render.call_args.kwargs["icon_cache"], IconCache)
+
+    @patch("awsdiagram.tiles.render_tiles", return_value="out/index.html")
+    def test_tiles(self, mock_tiles):
+        assert render_view(_diagram(), "out", RenderOptions(tiles=3)) == "out/index.html"
+        assert mock_tiles.call_args.args[1:3] == ("out", 3)
+
+    @patch("awsdiagram.renderer.render", return_value="out.png")
+    def test_original_icons(self, mock_render):
+        render_view(_diagram(), "out.png", RenderOptions(scale_icons=False))
+        assert mock_render.call_args.kwargs["icon_cache"] is None
+
+    @patch("awsdiagram.renderer.render", return_value="out.png")
+    def test_draft_quality_skips_the_icon_cache(self, mock_render):
+        render_view(_diagram(), "out.png", RenderOptions(quality="draft"))
+        assert mock_render.call_args.kwargs == {"icon_cache": None, "quality": "draft"}
+
+    @patch("awsdiagram.tiles.render_tiles", return_value="out/index.html")
+    def test_tiles_follow_the_quality_dpi(self, mock_tiles):
+        render_view(_diagram(), "out", RenderOptions(tiles=2, quality="draft"))
+        assert mock_tiles.call_args.kwargs["dpi"] == 48
+        assert mock_tiles.call_args.kwargs["quality"] == "draft"
+
+    @patch("awsdiagram.renderer.render", return_value="out.png")
+    def test_applies_focus_and_max_depth(self, mock_render):
+        render_view(_diagram(), "out.png", RenderOptions(focus=["web"], max_depth=1))
+        rendered = mock_render.call_args[0][0]
+        assert "q" not in rendered.services
+        assert rendered.groups[0].children == []
+
+
+class TestRenderMany:
+    def test_renders_each_diagram_into_directory(self, tmp_path):
+        diagrams = [_diagram("Network"), _diagram("Data Flow"), _diagram("Network")]
+        with patch("awsdiagram.renderer.render", side_effect=lambda d, out, fmt, **kw: out) as mock_render:
+            results = render_many(diagrams, tmp_path / "out", RenderOptions(outformat="svg"), jobs=2)
+        assert [Path(r).name for r in results] == ["network.svg", "data-flow.svg", "network-2.svg"]
+        assert (tmp_path / "out").is_dir()
+        assert mock_render.call_count == 3
+
+    def test_tiled_outputs_are_directories(self, tmp_path):
+        diagrams = [_diagram("Network"), _diagram("Network")]
+        with patch("awsdiagram.tiles.render_tiles", side_effect=lambda d, out, *a, **kw: out):
+            results = render_many(diagrams, tmp_path, RenderOptions(tiles=2))
+        assert [Path(r).name for r in results] == ["network-tiles", "network-tiles-2"]
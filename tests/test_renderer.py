@@ -1,11 +1,13 @@
 """Tests for diagram renderer."""
 
+import shutil
 from unittest.mock import MagicMock, call, patch
 
 import pytest
 
+from awsdiagram.errors import RenderError
 from awsdiagram.models import ConnectionDef, DiagramDef, GroupDef, ServiceDef
-from awsdiagram.renderer import render
+from awsdiagram.renderer import render, to_dot
 
 
 def _make_diagram(
@@ -27,10 +29,11 @@ def _make_diagram(
     )
 
 
-def _mock_node_class(label):
+def _mock_node_class(label, nodeid=None, **attrs):
     """Return a MagicMock that acts like a diagrams node."""
     node = MagicMock()
     node.label = label
+    node.nodeid = nodeid
     return node
 
 
@@ -92,3 +95,92 @@ class TestRender:
         render(diagram, "/tmp/test.png")
         # db is orphaned — should still be instantiated
         assert mock_cls.call_count == 2
+
+    def test_render_svg_format(self, mock_check, mock_diagram, mock_validate):
+        mock_cls = MagicMock(side_effect=_mock_node_class)
+        mock_validate.return_value = {"web": mock_cls, "db": mock_cls}
+        result = render(_make_diagram(), "/tmp/output.svg", outformat="svg")
+        assert result == "/tmp/output.svg"
+        assert mock_diagram.call_args[1]["filename"] == "/tmp/output"
+        assert mock_diagram.call_args[1]["outformat"] == "svg"
+
+    def test_render_unknown_format(self, mock_check, mock_diagram, mock_validate):
+        with pytest.raises(RenderError, match="Unsupported output format"):
+            render(_make_diagram(), "/tmp/output.gif", outformat="gif")
+
+    def test_node_ids_are_service_ids(self, mock_check, mock_diagram, mock_validate):
+        mock_cls = MagicMock(side_effect=_mock_node_class)
+        mock_validate.return_value = {"web": mock_cls, "db": mock_cls}
+        render(_make_diagram(), "/tmp/test.png")
+        assert mock_cls.call_args_list == [call("Web", nodeid="web"), call("DB", nodeid="db")]
+
+    def test_service_attrs_reach_the_node(self, mock_check, mock_diagram, mock_validate):
+        mock_cls = MagicMock(side_effect=_mock_node_class)
+        mock_validate.return_value = {"web": mock_cls}
+        services = {"web": ServiceDef(type="compute.EC2", label="Web", attrs={"color": "red"})}
+        render(_make_diagram(services=services), "/tmp/test.png")
+        mock_cls.assert_called_once_with("Web", nodeid="web", color="red")
+
+    def test_draft_quality(self, mock_check, mock_diagram, mock_validate):
+        mock_cls = MagicMock(side_effect=_mock_node_class)
+        mock_validate.return_value = {"web": mock_cls}
+        services = {"web": ServiceDef(type="compute.EC2", label="Web", attrs={"color": "red"})}
+        icon_cache = MagicMock()
+        render(_make_diagram(services=services), "/tmp/test.png", icon_cache=icon_cache, quality="draft")
+
+        graph_attr = mock_diagram.call_args.kwargs["graph_attr"]
+        assert graph_attr["splines"] == "line"
+        assert graph_attr["dpi"] == "48"
+        icon_cache.images.assert_not_called()
+        attrs = mock_cls.call_args.kwargs
+        assert (attrs["shape"], attrs["image"], attrs["color"]) == ("box", "", "red")
+
+    def test_final_quality_keeps_defaults(self, mock_check, mock_diagram, mock_validate):
+        mock_cls = MagicMock(side_effect=_mock_node_class)
+        mock_validate.return_value = {"web": mock_cls, "db": mock_cls}
+        render(_make_diagram(), "/tmp/test.svg", "svg")
+        assert mock_diagram.call_args.kwargs["graph_attr"] == {"fontname": "Inter", "fontsize": "12"}
+
+    def test_unknown_quality(self, mock_check, mock_diagram, mock_validate):
+        with pytest.raises(RenderError, match="Unknown quality"):
+            render(_make_diagram(), "/tmp/test.png", quality="best")
+
+
+class TestToDot:
+    def test_repeat_builds_are_byte_identical(self, nested_yaml_dict):
+        diagram = DiagramDef.model_validate(nested_yaml_dict["diagram"])
+        assert to_dot(diagram) == to_dot(diagram)
+
+    def test_uses_service_ids_and_positional_cluster_ids(self, nested_yaml_dict):
+        source = to_dot(DiagramDef.model_validate(nested_yaml_dict["diagram"]))
+        assert "subgraph cluster_0_1 {" in source
+        assert "\tlb -> web " in source
+        assert "web -> db " in source
+
+    def test_groups_with_the_same_name_stay_separate(self):
+        diagram = _make_diagram(
+            groups=[
+                GroupDef(name="Subnet", services=["web"]),
+                GroupDef(name="Subnet", services=["db"]),
+            ]
+        )
+        source = to_dot(diagram)
+        assert "subgraph cluster_0 {" in source
+        assert "subgraph cluster_1 {" in source
+
+    def test_draft_has_no_icons_or_dpi(self):
+        source = to_dot(_make_diagram(), quality="draft")
+        assert "splines=line" in source
+        assert "mclimit=0.1" in source
+        assert ".png" not in source
+        assert "dpi" not in source
+
+
+@pytest.mark.skipif(shutil.which("dot") is None, reason="Graphviz not installed")
+class TestByteStableOutput:
+    def test_two_renders_produce_identical_svg(self, tmp_path):
+        diagram = _make_diagram(connections=[ConnectionDef(from_="web", to="db")])
+        first = render(diagram, str(tmp_path / "a.svg"), outformat="svg")
+        second = render(diagram, str(tmp_path / "b.svg"), outformat="svg")
+        with open(first, "rb") as a, open(second, "rb") as b:
+            assert a.read() == b.read()
@@ -1,10 +1,13 @@
 """Tests for type resolver."""
 
+import subprocess
+import sys
+
 import pytest
 
 from awsdiagram.errors import GraphvizNotFoundError, TypeResolutionError
 from awsdiagram.models import ServiceDef
-from awsdiagram.resolver import check_graphviz, resolve_type, validate_all_types
+from awsdiagram.resolver import catalog, check_graphviz, resolve_type, split_type, validate_all_types
 
 
 class TestResolveType:
@@ -33,6 +36,45 @@ class TestResolveType:
             resolve_type("just_a_string")
 
 
+class TestProviders:
+    def test_split_defaults_to_aws(self):
+        assert split_type("compute.EC2") == ("aws", "compute", "EC2")
+        assert split_type("k8s:compute.Pod") == ("k8s", "compute", "Pod")
+
+    @pytest.mark.parametrize(
+        "type_str, module",
+        [
+            ("onprem:network.Nginx", "diagrams.onprem.network"),
+            ("k8s:compute.Pod", "diagrams.k8s.compute"),
+            ("saas:chat.Slack", "diagrams.saas.chat"),
+            ("aws:compute.EC2", "diagrams.aws.compute"),
+        ],
+    )
+    def test_resolves_other_providers(self, type_str, module):
+        assert resolve_type(type_str).__module__ == module
+
+    def test_unknown_provider(self):
+        with pytest.raises(TypeResolutionError, match="Unknown provider 'gcp'"):
+            resolve_type("gcp:compute.GCE")
+
+    def test_unknown_category_lists_provider_categories(self):
+        with pytest.raises(TypeResolutionError, match="diagrams.onprem.nope.*network"):
+            resolve_type("onprem:nope.Thing")
+
+    def test_catalog_is_memoized(self):
+        assert catalog("k8s") is catalog("k8s")
+
+    def test_aws_diagrams_do_not_load_other_providers(self):
+        code = (
+            "import sys\n"
+            "from awsdiagram.resolver import resolve_type\n"
+            "resolve_type('compute.EC2')\n"
+            "print(sorted(m for m in sys.modules if m.startswith('diagrams.') and m.count('.') == 1))\n"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        assert out.strip() == "['diagrams.aws']"
+
+
 class TestCheckGraphviz:
     def test_graphviz_available(self):
         # Should not raise on systems with Graphviz installed
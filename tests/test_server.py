@@ -0,0 +1,192 @@
+"""Tests for the local HTTP render service."""
+
+import http.client
+import json
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from awsdiagram.renderer import to_dot
+from awsdiagram.server import RenderCache, make_server
+
+
+_SVG = (
+    '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">'
+    '<title>{name}</title><image xlink:href="{icon}" width="100px" height="100px"/></svg>'
+)
+
+
+def _fake_render(diagram_def, output, outformat="png", icon_cache=None):
+    path = f"{output}.{outformat}"
+    if outformat == "svg":
+        icon = Path(output).with_name("icon.png")
+        icon.write_bytes(b"\x89PNG")
+        Path(path).write_text(_SVG.format(name=diagram_def.name, icon=icon))
+    else:
+        Path(path).write_bytes(f"{outformat}:{diagram_def.name}".encode())
+    return path
+
+
+@pytest.fixture
+def server():
+    with patch("awsdiagram.server.render", side_effect=_fake_render) as mock_render:
+        srv = make_server(port=0, workers=2, cache_size=4)
+        thread = threading.Thread(target=srv.serve_forever, daemon=True)
+        thread.start()
+        srv.mock_render = mock_render
+        yield srv
+        srv.shutdown()
+        srv.server_close()
+        thread.join()
+
+
+def _request(server, path, body=None, headers=None):
+    host, port = server.server_address[:2]
+    req = urllib.request.Request(
+        f"http://{host}:{port}{path}",
+        data=body,
+        headers=headers or {},
+        method="POST" if body is not None else "GET",
+    )
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status, dict(resp.headers), resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+class TestRenderCache:
+    def test_evicts_least_recently_used(self):
+        cache = RenderCache(max_entries=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.get("a")
+        cache.put("c", b"3")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"1"
+        assert cache.get("c") == b"3"
+
+    def test_zero_size_disables_cache(self):
+        cache = RenderCache(max_entries=0)
+        cache.put("a", b"1")
+        assert cache.get("a") is None
+
+
+class TestServer:
+    def test_health(self, server):
+        status, _, body = _request(server, "/health")
+        assert status == 200
+        assert json.loads(body)["status"] == "ok"
+
+    def test_metrics(self, server, valid_yaml_dict):
+        _request(server, "/render?format=svg", yaml.dump(valid_yaml_dict).encode())
+        status, headers, body = _request(server, "/metrics")
+        assert status == 200
+        assert headers["Content-Type"].startswith("application/openmetrics-text")
+        text = body.decode()
+        assert 'awsdiagram_diagrams_rendered_total{format="svg"}' in text
+        assert 'awsdiagram_cache_requests_total{cache="render",result="miss"}' in text
+        assert text.endswith("# EOF\n")
+
+    def test_render_yaml_svg(self, server, valid_yaml_dict):
+        status, headers, body = _request(
+            server, "/render?format=svg", yaml.dump(valid_yaml_dict).encode()
+        )
+        assert status == 200
+        assert headers["Content-Type"] == "image/svg+xml"
+        assert b"<title>Test Diagram</title>" in body
+        assert headers["ETag"].startswith('"')
+
+    def test_svg_icons_are_inlined(self, server, valid_yaml_dict):
+        _, _, body = _request(server, "/render?format=svg", yaml.dump(valid_yaml_dict).encode())
+        assert b"data:image/png;base64," in body
+        assert b"icon.png" not in body
+        assert b"awsdiagram-" not in body
+
+    def test_render_terraform_json(self, server, sample_terraform_plan):
+        status, headers, body = _request(
+            server,
+            "/render",
+            json.dumps(sample_terraform_plan).encode(),
+            {"Content-Type": "application/json"},
+        )
+        assert status == 200
+        assert headers["Content-Type"] == "image/png"
+        assert body == b"png:Imported Infrastructure"
+
+    def test_repeat_is_served_from_cache(self, server, valid_yaml_dict):
+        payload = yaml.dump(valid_yaml_dict).encode()
+        _request(server, "/render", payload)
+        _request(server, "/render", payload)
+        assert server.mock_render.call_count == 1
+        assert server.service.cache.hits == 1
+
+    def test_if_none_match_returns_304(self, server, valid_yaml_dict):
+        payload = yaml.dump(valid_yaml_dict).encode()
+        _, headers, _ = _request(server, "/render", payload)
+        status, _, body = _request(
+            server, "/render", payload, {"If-None-Match": headers["ETag"]}
+        )
+        assert status == 304
+        assert body == b""
+
+    def test_invalid_yaml_returns_json_error(self, server):
+        status, headers, body = _request(server, "/render", b"not: valid: yaml: [")
+        assert status == 422
+        assert headers["Content-Type"] == "application/json"
+        assert json.loads(body)["type"] == "YamlLoadError"
+
+    def test_bad_reference_returns_json_error(self, server):
+        data = {
+            "diagram": {
+                "name": "Bad",
+                "services": {"web": {"type": "compute.EC2", "label": "Web"}},
+                "connections": [{"from": "web", "to": "ghost"}],
+            }
+        }
+        status, _, body = _request(server, "/render", yaml.dump(data).encode())
+        assert status == 422
+        assert "ghost" in json.loads(body)["error"]
+
+    def test_file_reading_attrs_are_rejected(self, server, valid_yaml_dict):
+        valid_yaml_dict["diagram"]["services"]["web"]["attrs"] = {"image": "/etc/passwd"}
+        status, _, body = _request(server, "/render", yaml.dump(valid_yaml_dict).encode())
+        assert status == 422
+        assert "image" in json.loads(body)["error"]
+        server.mock_render.assert_not_called()
+
+    def test_html_like_labels_are_drawn_literally(self, server, valid_yaml_dict):
+        valid_yaml_dict["diagram"]["services"]["web"]["label"] = '<<IMG SRC="/etc/passwd"/>>'
+        status, _, _ = _request(server, "/render", yaml.dump(valid_yaml_dict).encode())
+        assert status == 200
+        diagram = server.mock_render.call_args.args[0]
+        source = to_dot(diagram)
+        assert 'label="<<IMG SRC=\\"/etc/passwd\\"/>>"' in source
+        assert "label=<<IMG" not in source
+
+    def test_unknown_format(self, server, valid_yaml_dict):
+        status, _, _ = _request(
+            server, "/render?format=gif", yaml.dump(valid_yaml_dict).encode()
+        )
+        assert status == 400
+
+    @pytest.mark.parametrize("length", ["abc", "-5"])
+    def test_invalid_content_length(self, server, length):
+        host, port = server.server_address[:2]
+        conn = http.client.HTTPConnection(host, port)
+        conn.putrequest("POST", "/render")
+        conn.putheader("Content-Length", length)
+        conn.endheaders()
+        resp = conn.getresponse()
+        assert resp.status == 400
+        assert "Content-Length" in json.loads(resp.read())["error"]
+        conn.close()
+
+    def test_unknown_route(self, server):
+        status, _, _ = _request(server, "/nope")
+        assert status == 404
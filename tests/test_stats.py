@@ -0,0 +1,90 @@
+"""Tests for complexity metrics and render-cost limits."""
+
+import pytest
+
+from awsdiagram.errors import CostLimitError
+from awsdiagram.graph import CompactGraph
+from awsdiagram.models import ConnectionDef, DiagramDef, GroupDef, ServiceDef
+from awsdiagram.stats import compute_stats, estimate, fit_cost
+
+
+def _estate(accounts: int = 3, per_account: int = 4) -> DiagramDef:
+    """Accounts holding a VPC each, every service calling a shared hub."""
+    services = {"hub": ServiceDef(type="network.ELB", label="Hub")}
+    groups = []
+    for a in range(accounts):
+        sids = [f"a{a}s{i}" for i in range(per_account)]
+        services.update({sid: ServiceDef(type="compute.EC2", label=sid) for sid in sids})
+        vpc = GroupDef(name=f"VPC {a}", services=sids)
+        groups.append(GroupDef(name=f"Account {a}", children=[vpc]))
+    connections = [
+        ConnectionDef(from_=sid, to="hub") for sid in services if sid != "hub"
+    ]
+    connections.append(ConnectionDef(from_="a0s0", to=["a0s1", f"a0s{per_account - 1}"]))
+    return DiagramDef(name="Estate", services=services, groups=groups, connections=connections)
+
+
+class TestComputeStats:
+    def test_counts(self):
+        stats = compute_stats(_estate())
+        assert stats.services == 13
+        assert stats.edges == 14
+        assert stats.clusters == 6
+        assert stats.max_depth == 2
+        assert stats.components == 1
+
+    def test_fan_in_and_out(self):
+        stats = compute_stats(_estate())
+        assert (stats.max_fan_in, stats.max_fan_in_service) == (12, "hub")
+        assert (stats.max_fan_out, stats.max_fan_out_service) == (3, "a0s0")
+
+    def test_cross_cluster_edges(self):
+        # Every edge to the ungrouped hub crosses; edges inside VPC 0 don't.
+        assert compute_stats(_estate()).cross_cluster_edges == 12
+
+    def test_ungrouped_diagram(self):
+        diagram = DiagramDef(
+            name="Flat", services={"a": ServiceDef(type="compute.EC2", label="A")}
+        )
+        stats = compute_stats(diagram)
+        assert stats.clusters == stats.max_depth == stats.edges == 0
+        assert stats.max_fan_in_service is None
+
+    def test_empty_graph(self):
+        stats = compute_stats(CompactGraph("Empty"))
+        assert (stats.services, stats.components, stats.max_fan_in) == (0, 0, 0)
+        assert stats.max_fan_out_service is None
+
+    def test_estimate_grows_with_size(self):
+        small = compute_stats(_estate(2, 2)).estimate
+        large = compute_stats(_estate(20, 50)).estimate
+        assert large.seconds > small.seconds
+        assert large.memory_mb > small.memory_mb
+
+
+class TestFitCost:
+    def test_within_budget_is_unchanged(self):
+        diagram = _estate()
+        assert fit_cost(diagram, 3600) is diagram
+
+    def test_refuses_over_budget(self):
+        diagram = _estate()
+        limit = compute_stats(diagram).estimate.seconds / 2
+        with pytest.raises(CostLimitError, match="Estate"):
+            fit_cost(diagram, limit)
+
+    def test_degrade_collapses_groups(self):
+        diagram = _estate(20, 50)
+        collapsed_cost = compute_stats(_collapsed(diagram)).estimate.seconds
+        result = fit_cost(diagram, collapsed_cost + 0.01, degrade=True)
+        assert len(result.services) < len(diagram.services)
+
+    def test_degrade_gives_up_when_nothing_fits(self):
+        with pytest.raises(CostLimitError):
+            fit_cost(_estate(), estimate(0, 0, 0).seconds / 2, degrade=True)
+
+
+def _collapsed(diagram: DiagramDef) -> DiagramDef:
+    from awsdiagram.views import collapse_view
+
+    return collapse_view(diagram, 0)
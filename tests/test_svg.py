@@ -0,0 +1,89 @@
+"""Tests for SVG post-processing."""
+
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from awsdiagram.errors import RenderError
+from awsdiagram.svg import SVG_NS, XLINK_NS, optimize_svg, optimize_svg_file
+
+
+def _graphviz_svg(icon_path, count=3):
+    """A trimmed-down SVG in the shape Graphviz emits for icon nodes."""
+    return _graphviz_svg_for([icon_path] * count)
+
+
+def _graphviz_svg_for(icon_paths):
+    nodes = "".join(
+        f"""
+<!-- n{i} -->
+<g id="node{i}" class="node">
+<title>n{i}</title>
+<image xlink:href="{icon_path}" width="101px" height="101px" preserveAspectRatio="xMinYMin meet" x="{i * 120}" y="-150"/>
+<text text-anchor="start" x="{i * 120}" y="-20" font-family="Inter" font-size="12.00" stroke="none">Node {i}</text>
+</g>"""
+        for i, icon_path in enumerate(icon_paths)
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1//EN" "http://www.w3.org/Graphics/SVG/1.1/DTD/svg11.dtd">
+<svg width="400pt" height="200pt" viewBox="0 0 400 200"
+ xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">
+<g id="graph0" class="graph">{nodes}
+</g>
+</svg>
+"""
+
+
+@pytest.fixture
+def icon(tmp_path):
+    p = tmp_path / "ec2.png"
+    p.write_bytes(b"\x89PNG fake icon")
+    return p
+
+
+class TestOptimizeSvg:
+    def test_icons_become_one_symbol(self, icon):
+        root = ET.fromstring(optimize_svg(_graphviz_svg(icon)))
+        symbols = root.findall(f".//{{{SVG_NS}}}symbol")
+        uses = root.findall(f".//{{{SVG_NS}}}use")
+        assert len(symbols) == 1
+        assert len(uses) == 3
+        assert not root.findall(f".//{{{SVG_NS}}}g/{{{SVG_NS}}}image")
+        assert {u.get(f"{{{XLINK_NS}}}href") for u in uses} == {"#icon0"}
+        assert uses[1].get("x") == "120"
+
+    def test_distinct_icons_get_distinct_symbols(self, icon, tmp_path):
+        other = tmp_path / "rds.png"
+        other.write_bytes(b"rds")
+        root = ET.fromstring(optimize_svg(_graphviz_svg_for([icon, other, icon])))
+        assert len(root.findall(f".//{{{SVG_NS}}}symbol")) == 2
+
+    def test_drops_comments_and_default_attributes(self, icon):
+        result = optimize_svg(_graphviz_svg(icon))
+        assert "<!--" not in result
+        assert 'stroke="none"' not in result
+        assert 'text-anchor="start"' not in result
+        assert 'font-family="Inter"' in result
+
+    def test_output_is_smaller(self, icon):
+        svg = _graphviz_svg(icon, 50)
+        assert len(optimize_svg(svg)) < len(svg)
+
+    def test_inline_icons(self, icon):
+        result = optimize_svg(_graphviz_svg(icon), inline_icons=True)
+        assert result.count("data:image/png;base64,") == 1
+        assert str(icon) not in result
+
+    def test_inline_missing_icon(self, tmp_path):
+        with pytest.raises(RenderError, match="Failed to inline icon"):
+            optimize_svg(_graphviz_svg(tmp_path / "missing.png"), inline_icons=True)
+
+    def test_invalid_svg(self):
+        with pytest.raises(RenderError, match="Invalid SVG"):
+            optimize_svg("<svg")
+
+    def test_optimize_file_in_place(self, icon, tmp_path):
+        p = tmp_path / "out.svg"
+        p.write_text(_graphviz_svg(icon))
+        optimize_svg_file(p)
+        assert "<symbol" in p.read_text()
@@ -0,0 +1,101 @@
+"""Tests for templates: and for_each instances."""
+
+import pytest
+
+from awsdiagram.errors import SchemaValidationError, ServiceReferenceError
+from awsdiagram.parser import parse_data
+
+
+def _diagram(instances, services=None, templates=None):
+    return {
+        "diagram": {
+            "name": "Templated",
+            "templates": templates
+            or {
+                "stack": {
+                    "services": {
+                        "svc": {"type": "compute.ECS", "label": "${key} service"},
+                        "queue": {"type": "integration.SQS", "label": "${key} queue"},
+                    },
+                    "groups": [{"name": "${key} workers", "services": ["svc"]}],
+                    "connections": [{"from": "queue", "to": "svc", "label": "${key}"}],
+                }
+            },
+            "services": services or {"alb": {"type": "network.ELB", "label": "ALB"}},
+            "instances": instances,
+        }
+    }
+
+
+class TestTemplates:
+    def test_expands_each_key(self):
+        diagram = parse_data(_diagram([{"template": "stack", "for_each": ["a", "b"]}]))
+        assert list(diagram.services) == ["alb", "a_svc", "a_queue", "b_svc", "b_queue"]
+        assert diagram.services["b_queue"].label == "b queue"
+        assert [g.name for g in diagram.groups] == ["a workers", "b workers"]
+        assert diagram.groups[1].services == ["b_svc"]
+        assert [(c.from_, c.to, c.label) for c in diagram.connections] == [
+            ("a_queue", "a_svc", "a"),
+            ("b_queue", "b_svc", "b"),
+        ]
+
+    def test_variables_from_mapping(self):
+        templates = {
+            "db": {"services": {"table": {"type": "database.Dynamodb", "label": "${key} (${tier})"}}}
+        }
+        data = _diagram(
+            [{"template": "db", "for_each": {"orders": {"tier": "gold"}}}], templates=templates
+        )
+        assert parse_data(data).services["orders_table"].label == "orders (gold)"
+
+    def test_instance_connections_reach_outer_services(self):
+        instances = [
+            {"template": "stack", "for_each": ["a"], "connections": [{"from": "alb", "to": "svc"}]}
+        ]
+        diagram = parse_data(_diagram(instances))
+        assert (diagram.connections[-1].from_, diagram.connections[-1].to) == ("alb", "a_svc")
+
+    def test_group_wraps_each_instance(self):
+        instances = [{"template": "stack", "for_each": ["a"], "group": "Team ${key}"}]
+        [group] = parse_data(_diagram(instances)).groups
+        assert group.name == "Team a"
+        assert group.services == ["a_queue"]
+        assert group.children[0].services == ["a_svc"]
+
+    def test_custom_id_format(self):
+        instances = [{"template": "stack", "for_each": ["a"], "id_format": "${id}-${key}"}]
+        assert "svc-a" in parse_data(_diagram(instances)).services
+
+    def test_generated_id_collision(self):
+        services = {"a_svc": {"type": "compute.EC2", "label": "Taken"}}
+        with pytest.raises(SchemaValidationError, match="a_svc"):
+            parse_data(_diagram([{"template": "stack", "for_each": ["a"]}], services=services))
+
+    def test_unknown_template(self):
+        with pytest.raises(SchemaValidationError, match="unknown template 'nope'"):
+            parse_data(_diagram([{"template": "nope", "for_each": ["a"]}]))
+
+    def test_undefined_variable(self):
+        templates = {"t": {"services": {"x": {"type": "compute.EC2", "label": "${missing}"}}}}
+        with pytest.raises(SchemaValidationError, match="missing"):
+            parse_data(_diagram([{"template": "t", "for_each": ["a"]}], templates=templates))
+
+    def test_template_types_are_validated(self):
+        templates = {"t": {"services": {"x": {"type": "not a type", "label": "X"}}}}
+        with pytest.raises(SchemaValidationError, match="Invalid type format"):
+            parse_data(_diagram([{"template": "t", "for_each": ["a"]}], templates=templates))
+
+    def test_unknown_outer_reference(self):
+        templates = {
+            "t": {
+                "services": {"x": {"type": "compute.EC2", "label": "X"}},
+                "connections": [{"from": "x", "to": "ghost"}],
+            }
+        }
+        with pytest.raises(ServiceReferenceError, match="ghost"):
+            parse_data(_diagram([{"template": "t", "for_each": ["a"]}], templates=templates))
+
+    def test_many_instances(self):
+        keys = [f"svc{i}" for i in range(500)]
+        diagram = parse_data(_diagram([{"template": "stack", "for_each": keys}]))
+        assert len(diagram.services) == 1 + 2 * len(keys)
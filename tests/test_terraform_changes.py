@@ -0,0 +1,169 @@
+"""Tests for change-scoped Terraform plan diagrams."""
+
+import json
+from collections import Counter
+
+import pytest
+import yaml
+
+from awsdiagram.errors import TerraformImportError
+from awsdiagram.parser import parse
+from awsdiagram.terraform.changes import (
+    ACTION_STYLES,
+    import_terraform_changes,
+    import_terraform_changes_data,
+    plan_action,
+)
+
+
+def _change(name, res_type="aws_instance", actions=("no-op",), before=None, after=None):
+    return {
+        "address": f"{res_type}.{name}",
+        "mode": "managed",
+        "type": res_type,
+        "name": name,
+        "change": {"actions": list(actions), "before": before, "after": after},
+    }
+
+
+def _config(address, *refs):
+    return {"address": address, "expressions": {"x": {"references": list(refs)}}}
+
+
+@pytest.fixture
+def plan():
+    """lb -> web -> db -> bucket chain; only web changes."""
+    return {
+        "resource_changes": [
+            _change("lb", "aws_lb", before={"id": "lb-1"}, after={"id": "lb-1", "tags": {"Name": "LB"}}),
+            _change(
+                "web",
+                actions=["update"],
+                before={"id": "i-1", "subnet_id": "subnet-a"},
+                after={"id": "i-1", "subnet_id": "subnet-a", "tags": {"Name": "Web"}},
+            ),
+            _change("db", "aws_db_instance", before={"id": "db-1"}, after={"id": "db-1"}),
+            _change("bucket", "aws_s3_bucket", before={"id": "b-1"}, after={"id": "b-1"}),
+        ],
+        "configuration": {
+            "root_module": {
+                "resources": [
+                    _config("aws_lb.lb", "aws_instance.web.id", "aws_instance.web", "var.name"),
+                    _config("aws_instance.web", "aws_db_instance.db.address"),
+                    _config("aws_db_instance.db", "aws_s3_bucket.bucket.arn"),
+                ]
+            }
+        },
+    }
+
+
+def _diagram(text):
+    return yaml.safe_load(text)["diagram"]
+
+
+class TestPlanAction:
+    @pytest.mark.parametrize(
+        "actions, expected",
+        [
+            (["create"], "create"),
+            (["update"], "update"),
+            (["delete"], "delete"),
+            (["delete", "create"], "replace"),
+            (["create", "delete"], "replace"),
+            (["no-op"], "no-op"),
+            (["read"], "no-op"),
+        ],
+    )
+    def test_actions(self, actions, expected):
+        assert plan_action(actions) == expected
+
+
+class TestChangeScope:
+    def test_radius_one_keeps_direct_neighbours(self, plan):
+        diagram = _diagram(import_terraform_changes_data(plan))
+        assert set(diagram["services"]) == {"lb", "web", "db"}
+        assert diagram["connections"] == [{"from": "lb", "to": ["web"]}, {"from": "web", "to": ["db"]}]
+
+    def test_radius_zero_keeps_only_changes(self, plan):
+        diagram = _diagram(import_terraform_changes_data(plan, radius=0))
+        assert set(diagram["services"]) == {"web"}
+        assert diagram["connections"] == []
+
+    def test_radius_two_reaches_further(self, plan):
+        diagram = _diagram(import_terraform_changes_data(plan, radius=2))
+        assert set(diagram["services"]) == {"lb", "web", "db", "bucket"}
+
+    def test_value_references_without_configuration(self, plan):
+        del plan["configuration"]
+        plan["resource_changes"][0]["change"]["after"]["target"] = "i-1"
+        diagram = _diagram(import_terraform_changes_data(plan))
+        assert set(diagram["services"]) == {"lb", "web"}
+
+    def test_module_references(self):
+        change = _change("web", actions=["create"], after={})
+        change["address"] = "module.app.aws_instance.web[0]"
+        db = _change("db", "aws_db_instance")
+        db["address"] = "module.app.aws_db_instance.db"
+        plan = {
+            "resource_changes": [change, db],
+            "configuration": {
+                "root_module": {
+                    "module_calls": {
+                        "app": {"module": {"resources": [_config("aws_instance.web", "aws_db_instance.db")]}}
+                    }
+                }
+            },
+        }
+        diagram = _diagram(import_terraform_changes_data(plan))
+        assert diagram["connections"] == [{"from": "web", "to": ["db"]}]
+
+
+class TestStyling:
+    def test_changed_nodes_labelled_and_styled(self, plan):
+        services = _diagram(import_terraform_changes_data(plan))["services"]
+        assert services["web"]["label"] == "Web\n(update)"
+        assert services["web"]["attrs"] == ACTION_STYLES["update"]
+        assert services["lb"]["label"] == "LB"
+        assert services["lb"]["attrs"] == ACTION_STYLES["no-op"]
+
+    def test_deleted_resource_uses_before_values(self):
+        plan = {
+            "resource_changes": [
+                _change("old", actions=["delete"], before={"tags": {"Name": "Old"}, "subnet_id": "subnet-a"}),
+            ]
+        }
+        diagram = _diagram(import_terraform_changes_data(plan))
+        assert diagram["services"]["old"]["label"] == "Old\n(delete)"
+        assert diagram["groups"][0]["children"][0]["services"] == ["old"]
+
+    def test_output_parses(self, plan, tmp_path):
+        out = tmp_path / "changes.yaml"
+        out.write_text(import_terraform_changes_data(plan))
+        diagram = parse(out)
+        assert diagram.services["web"].attrs["style"] == "rounded,bold"
+
+
+class TestErrors:
+    def test_missing_resource_changes(self, sample_terraform_plan):
+        with pytest.raises(TerraformImportError, match="resource_changes"):
+            import_terraform_changes_data(sample_terraform_plan)
+
+    def test_no_changes(self, plan):
+        plan["resource_changes"][1]["change"]["actions"] = ["no-op"]
+        with pytest.raises(TerraformImportError, match="no changes"):
+            import_terraform_changes_data(plan)
+
+    def test_unmapped_counted(self, plan):
+        plan["resource_changes"].append(_change("x", "aws_made_up_thing", actions=["create"]))
+        unmapped = Counter()
+        import_terraform_changes_data(plan, unmapped=unmapped)
+        assert unmapped == Counter({"aws_made_up_thing": 1})
+
+    def test_from_file(self, plan, tmp_path):
+        path = tmp_path / "plan.json"
+        path.write_text(json.dumps(plan))
+        assert "web" in _diagram(import_terraform_changes(path))["services"]
+
+    def test_file_not_found(self, tmp_path):
+        with pytest.raises(TerraformImportError, match="not found"):
+            import_terraform_changes(tmp_path / "nope.json")
@@ -0,0 +1,161 @@
+"""Tests for incremental Terraform re-import."""
+
+import json
+
+import pytest
+import yaml
+
+from awsdiagram.parser import parse
+from awsdiagram.terraform.incremental import id_map_path, reimport_terraform
+
+
+def _resource(name, res_type="aws_instance", **values):
+    return {"address": f"{res_type}.{name}", "type": res_type, "name": name, "values": values}
+
+
+def _write_plan(path, resources):
+    path.write_text(json.dumps({"planned_values": {"root_module": {"resources": resources}}}))
+    return path
+
+
+@pytest.fixture
+def plan(tmp_path):
+    return _write_plan(
+        tmp_path / "plan.json",
+        [
+            _resource("web", tags={"Name": "Web"}, subnet_id="subnet-aaa"),
+            _resource("web", "aws_s3_bucket", tags={"Name": "Assets"}),
+            _resource("db", "aws_db_instance", tags={"Name": "DB"}, vpc_id="vpc-1"),
+        ],
+    )
+
+
+def _load(output):
+    return yaml.safe_load(output.read_text())["diagram"]
+
+
+class TestReimport:
+    def test_first_import_writes_yaml_and_id_map(self, plan, tmp_path):
+        output = tmp_path / "infra.yaml"
+        report = reimport_terraform(plan, output)
+        assert (report.added, report.unchanged) == (3, 0)
+        assert set(_load(output)["services"]) == {"web", "web_2", "db"}
+        ids = json.loads(id_map_path(output).read_text())["resources"]
+        assert ids["aws_s3_bucket.web"]["id"] == "web_2"
+        parse(output)
+
+    def test_outputs_are_world_readable(self, plan, tmp_path):
+        output = tmp_path / "infra.yaml"
+        reimport_terraform(plan, output)
+        assert output.stat().st_mode & 0o777 == 0o644
+        assert id_map_path(output).stat().st_mode & 0o777 == 0o644
+
+    def test_unchanged_reimport_touches_nothing(self, plan, tmp_path):
+        output = tmp_path / "infra.yaml"
+        reimport_terraform(plan, output)
+        report = reimport_terraform(plan, output)
+        assert (report.added, report.updated, report.removed, report.unchanged) == (0, 0, 0, 3)
+
+    def test_inserted_resource_keeps_existing_ids(self, plan, tmp_path):
+        output = tmp_path / "infra.yaml"
+        reimport_terraform(plan, output)
+        _write_plan(
+            plan,
+            [
+                _resource("web", "aws_lambda_function", tags={"Name": "Fn"}),
+                _resource("web", tags={"Name": "Web"}, subnet_id="subnet-aaa"),
+                _resource("web", "aws_s3_bucket", tags={"Name": "Assets"}),
+                _resource("db", "aws_db_instance", tags={"Name": "DB"}, vpc_id="vpc-1"),
+            ],
+        )
+        report = reimport_terraform(plan, output)
+        assert (report.added, report.unchanged) == (1, 3)
+        services = _load(output)["services"]
+        assert services["web"]["label"] == "Web"
+        assert services["web_2"]["label"] == "Assets"
+        assert services["web_3"]["label"] == "Fn"
+
+    def test_hand_edits_survive(self, plan, tmp_path):
+        output = tmp_path / "infra.yaml"
+        reimport_terraform(plan, output)
+        document = yaml.safe_load(output.read_text())
+        document["diagram"]["connections"] = [{"from": "web", "to": ["db", "web_2"]}]
+        document["diagram"]["services"]["db"]["label"] = "Primary DB"
+        output.write_text(yaml.dump(document))
+
+        reimport_terraform(plan, output)
+        block = _load(output)
+        assert block["connections"] == [{"from": "web", "to": ["db", "web_2"]}]
+        assert block["services"]["db"]["label"] == "Primary DB"
+
+    def test_changed_resource_moves_group(self, plan, tmp_path):
+        output = tmp_path / "infra.yaml"
+        reimport_terraform(plan, output)
+        _write_plan(
+            plan,
+            [
+                _resource("web", tags={"Name": "Web v2"}, subnet_id="subnet-bbb"),
+                _resource("web", "aws_s3_bucket", tags={"Name": "Assets"}),
+                _resource("db", "aws_db_instance", tags={"Name": "DB"}, vpc_id="vpc-1"),
+            ],
+        )
+        report = reimport_terraform(plan, output)
+        assert report.updated == 1
+        block = _load(output)
+        assert block["services"]["web"]["label"] == "Web v2"
+        [cloud] = block["groups"]
+        members = {child["name"]: child["services"] for child in cloud["children"]}
+        assert members == {"VPC (vpc-1...)": ["db"], "Subnet (subnet-bbb...)": ["web"]}
+
+    def test_hand_made_groups_survive_changes(self, plan, tmp_path):
+        output = tmp_path / "infra.yaml"
+        reimport_terraform(plan, output)
+        document = yaml.safe_load(output.read_text())
+        document["diagram"]["groups"].append({"name": "Frontend", "services": ["web", "web_2"]})
+        output.write_text(yaml.dump(document))
+
+        resources = [
+            _resource("web", tags={"Name": "Web v2"}, subnet_id="subnet-aaa"),
+            _resource("web", "aws_s3_bucket", tags={"Name": "Assets v2"}),
+            _resource("db", "aws_db_instance", tags={"Name": "DB"}, vpc_id="vpc-1"),
+        ]
+        assert reimport_terraform(_write_plan(plan, resources), output).updated == 2
+        cloud, frontend = _load(output)["groups"]
+        assert frontend == {"name": "Frontend", "services": ["web", "web_2"]}
+        assert cloud["children"][0] == {"name": "Subnet (subnet-aaa...)", "services": ["web"]}
+
+        resources[0] = _resource("web", tags={"Name": "Web v2"}, subnet_id="subnet-bbb")
+        reimport_terraform(_write_plan(plan, resources), output)
+        cloud, frontend = _load(output)["groups"]
+        assert frontend["services"] == ["web", "web_2"]
+        members = {child["name"]: child["services"] for child in cloud["children"]}
+        assert members == {"VPC (vpc-1...)": ["db"], "Subnet (subnet-bbb...)": ["web"]}
+
+    def test_removed_resource_is_dropped_with_its_connections(self, plan, tmp_path):
+        output = tmp_path / "infra.yaml"
+        reimport_terraform(plan, output)
+        document = yaml.safe_load(output.read_text())
+        document["diagram"]["connections"] = [
+            {"from": "web", "to": "db"},
+            {"from": "web_2", "to": ["db", "web"]},
+        ]
+        output.write_text(yaml.dump(document))
+        _write_plan(
+            plan,
+            [
+                _resource("web", "aws_s3_bucket", tags={"Name": "Assets"}),
+                _resource("db", "aws_db_instance", tags={"Name": "DB"}, vpc_id="vpc-1"),
+            ],
+        )
+        report = reimport_terraform(plan, output)
+        assert report.removed == 1
+        block = _load(output)
+        assert "web" not in block["services"]
+        assert block["connections"] == [{"from": "web_2", "to": ["db"]}]
+        parse(output)
+
+    def test_unreadable_id_map_starts_over(self, plan, tmp_path):
+        output = tmp_path / "infra.yaml"
+        reimport_terraform(plan, output)
+        id_map_path(output).write_text("{broken")
+        assert reimport_terraform(plan, output).added == 3
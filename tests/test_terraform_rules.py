@@ -0,0 +1,109 @@
+"""Tests for the Terraform type-mapping rule engine."""
+
+import itertools
+import re
+from collections import Counter
+
+import pytest
+import yaml
+
+from awsdiagram.errors import TerraformImportError
+from awsdiagram.resolver import resolve_type
+from awsdiagram.terraform.importer import import_terraform_data
+from awsdiagram.terraform.mappings import TERRAFORM_RULES
+from awsdiagram.terraform.rules import TypeMapper, build_mapper, default_mapper, load_mapping_file
+
+
+class TestTypeMapper:
+    def test_exact_beats_prefix_beats_glob(self):
+        mapper = TypeMapper(
+            {"aws_lambda_function": "compute.Lambda", "aws_lambda_*": "compute.EC2", "aws_*_x": "storage.S3"}
+        )
+        assert mapper.lookup("aws_lambda_function") == "compute.Lambda"
+        assert mapper.lookup("aws_lambda_layer_version") == "compute.EC2"
+        assert mapper.lookup("aws_lambda_x") == "compute.EC2"
+        assert mapper.lookup("aws_foo_x") == "storage.S3"
+        assert mapper.lookup("aws_foo") is None
+
+    def test_globs_with_several_stars(self):
+        mapper = TypeMapper({"aws_*_x_*_y": "storage.S3", "aws_*_a_*_b_*": "compute.ECS", "aws_*_x_*": "compute.EC2"})
+        assert mapper.lookup("aws_foo_x_bar_y") == "storage.S3"
+        assert mapper.lookup("aws_1_a_2_b_3") == "compute.ECS"
+        assert mapper.lookup("aws_foo_x_bar") == "compute.EC2"
+
+    def test_python310_fnmatch_groups(self, monkeypatch):
+        # 3.10's fnmatch.translate names groups g0, g1, ... from a process-wide
+        # counter, one for each '*' after the first.
+        numbers = itertools.count()
+
+        def translate(pattern):
+            head, *rest = pattern.split("*")
+            parts = [re.escape(head)]
+            for piece in rest[:-1]:
+                i = next(numbers)
+                parts.append(f"(?=(?P<g{i}>.*?{re.escape(piece)}))(?P=g{i})")
+            parts.append(".*" + re.escape(rest[-1]))
+            return "(?s:" + "".join(parts) + r")\Z"
+
+        monkeypatch.setattr("awsdiagram.terraform.rules.fnmatch.translate", translate)
+        mapper = TypeMapper({"aws_*_x_*_y": "storage.S3", "aws_*_a_*_b_*": "compute.ECS"})
+        assert mapper.lookup("aws_foo_x_bar_y") == "storage.S3"
+        assert mapper.lookup("aws_1_a_2_b_3") == "compute.ECS"
+
+    def test_longest_prefix_wins(self):
+        mapper = TypeMapper({"aws_*": "general.General", "aws_ecs_*": "compute.ECS"})
+        assert mapper.lookup("aws_ecs_capacity_provider") == "compute.ECS"
+        assert mapper.lookup("aws_other") == "general.General"
+
+    def test_later_sources_override(self):
+        mapper = TypeMapper(
+            {"aws_a": "compute.EC2", "aws_b_*": "compute.EC2", "aws_?_c": "compute.EC2"},
+            {"aws_a": "compute.ECS", "aws_b_*": None, "aws_?_c": "compute.ECS"},
+        )
+        assert mapper.lookup("aws_a") == "compute.ECS"
+        assert mapper.lookup("aws_b_thing") is None
+        assert mapper.covers("aws_b_thing")
+        assert mapper.lookup("aws_x_c") == "compute.ECS"
+
+    def test_ignore_rules_count_as_covered(self):
+        mapper = default_mapper()
+        assert mapper.lookup("aws_s3_bucket_policy") is None
+        assert mapper.covers("aws_s3_bucket_policy")
+        assert not mapper.covers("aws_made_up")
+
+    def test_default_rules_resolve(self):
+        for target in filter(None, TERRAFORM_RULES.values()):
+            resolve_type(target)
+
+
+class TestMappingFiles:
+    def test_merged_over_defaults(self, tmp_path):
+        p = tmp_path / "map.yaml"
+        p.write_text(yaml.dump({"mappings": {"aws_instance": "compute.Lambda", "acme_*": "compute.EC2"}}))
+        mapper = build_mapper([p])
+        assert mapper.lookup("aws_instance") == "compute.Lambda"
+        assert mapper.lookup("acme_widget") == "compute.EC2"
+        assert mapper.lookup("aws_s3_bucket") == "storage.S3"
+
+    @pytest.mark.parametrize(
+        "content",
+        [{"aws_x": "compute.EC2"}, {"mappings": {"aws_x": "not-a-type"}}, {"mappings": {"aws_x": 3}}],
+    )
+    def test_invalid_files(self, tmp_path, content):
+        p = tmp_path / "map.yaml"
+        p.write_text(yaml.dump(content))
+        with pytest.raises(TerraformImportError):
+            load_mapping_file(p)
+
+
+class TestUnmappedReport:
+    def test_counts_dropped_types(self):
+        resources = [
+            {"type": "aws_instance", "name": "web"},
+            {"type": "aws_made_up", "name": "a"},
+            {"type": "aws_made_up", "name": "b"},
+            {"type": "aws_s3_bucket_policy", "name": "ignored"},
+        ]
+        unmapped: Counter = Counter()
+        import_terraform_data({"values": {"root_module": {"resources": resources}}}, unmapped=unmapped)
+        assert unmapped == Counter({"aws_made_up": 2})
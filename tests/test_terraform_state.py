@@ -0,0 +1,102 @@
+"""Tests for reading raw Terraform state files."""
+
+import json
+
+import pytest
+import yaml
+
+from awsdiagram.errors import TerraformImportError
+from awsdiagram.terraform.importer import import_terraform, import_terraform_data
+from awsdiagram.terraform.state import iter_state_resources, raw_state_version, state_resources
+
+
+@pytest.fixture
+def raw_state():
+    return {
+        "version": 4,
+        "terraform_version": "1.7.5",
+        "serial": 1234567,
+        "lineage": "3f0c1e6e-0000-0000-0000-000000000000",
+        "outputs": {"big": {"value": ["x" * 50] * 100, "type": ["list", "string"]}},
+        "resources": [
+            {
+                "mode": "managed",
+                "type": "aws_instance",
+                "name": "web",
+                "provider": 'provider["registry.terraform.io/hashicorp/aws"]',
+                "instances": [
+                    {"index_key": 0, "attributes": {"tags": {"Name": "Web 0"}, "subnet_id": "subnet-1"}},
+                    {"index_key": 1, "attributes": {"tags": {"Name": "Web 1"}, "subnet_id": "subnet-1"}},
+                ],
+            },
+            {
+                "mode": "managed",
+                "module": "module.data[\"eu\"]",
+                "type": "aws_db_instance",
+                "name": "main",
+                "instances": [{"schema_version": 2, "attributes": {"tags": None}}],
+            },
+            {
+                "mode": "data",
+                "type": "aws_s3_bucket",
+                "name": "logs",
+                "instances": [{"index_key": "a b", "attributes": {}}],
+            },
+        ],
+        "check_results": None,
+    }
+
+
+@pytest.fixture
+def raw_state_file(raw_state, tmp_path):
+    p = tmp_path / "terraform.tfstate"
+    p.write_text(json.dumps(raw_state, indent=2))
+    return p
+
+
+class TestStateResources:
+    def test_flattens_instances_with_addresses(self, raw_state):
+        resources = list(state_resources(raw_state))
+        assert [r["address"] for r in resources] == [
+            "aws_instance.web[0]",
+            "aws_instance.web[1]",
+            'module.data["eu"].aws_db_instance.main',
+            'data.aws_s3_bucket.logs["a b"]',
+        ]
+        assert resources[0]["values"]["subnet_id"] == "subnet-1"
+        assert resources[2]["index"] is None
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+    def test_streaming_matches_loaded(self, raw_state, raw_state_file, chunk_size):
+        streamed = list(iter_state_resources(raw_state_file, chunk_size=chunk_size))
+        assert streamed == list(state_resources(raw_state))
+
+    def test_detects_raw_state(self, raw_state_file, terraform_plan_file):
+        assert raw_state_version(raw_state_file) == 4
+        assert raw_state_version(terraform_plan_file) is None
+
+    def test_rejects_old_versions(self, tmp_path):
+        p = tmp_path / "old.tfstate"
+        p.write_text(json.dumps({"version": 3, "modules": []}))
+        with pytest.raises(TerraformImportError, match="version 3"):
+            list(iter_state_resources(p))
+
+    def test_truncated_file(self, raw_state_file):
+        text = raw_state_file.read_text()
+        raw_state_file.write_text(text[: len(text) // 2])
+        with pytest.raises(TerraformImportError, match="Failed to read"):
+            list(iter_state_resources(raw_state_file, chunk_size=64))
+
+
+class TestImportRawState:
+    def test_import_file(self, raw_state_file):
+        data = yaml.safe_load(import_terraform(raw_state_file))
+        services = data["diagram"]["services"]
+        labels = sorted(s["label"] for s in services.values())
+        assert labels == ["Logs", "Main", "Web 0", "Web 1"]
+        [cloud] = data["diagram"]["groups"]
+        assert len(cloud["children"][0]["services"]) == 2
+
+    def test_import_loaded_data(self, raw_state):
+        data = yaml.safe_load(import_terraform_data(raw_state))
+        assert len(data["diagram"]["services"]) == 4
@@ -0,0 +1,103 @@
+"""Tests for tiled raster output."""
+
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from awsdiagram.errors import GraphvizNotFoundError, RenderError
+from awsdiagram.models import ConnectionDef, DiagramDef, ServiceDef
+from awsdiagram.tiles import MANIFEST_NAME, bounding_box, render_tiles
+
+LAID_OUT = 'digraph { graph [bb="0,0,400,200", label=Estate]; web [pos="10,10"]; }'
+
+
+def _diagram():
+    return DiagramDef(
+        name="Estate",
+        services={
+            "web": ServiceDef(type="compute.EC2", label="Web"),
+            "db": ServiceDef(type="database.RDS", label="DB"),
+        },
+        connections=[ConnectionDef(from_="web", to="db")],
+    )
+
+
+def _fake_graphviz(cmd, source):
+    if cmd[0] == "dot":
+        return LAID_OUT
+    Path(cmd[cmd.index("-o") + 1]).write_bytes(b"png")
+    return ""
+
+
+@pytest.fixture
+def graphviz(monkeypatch):
+    monkeypatch.setattr("awsdiagram.tiles.check_graphviz", lambda: None)
+    monkeypatch.setattr("awsdiagram.tiles.shutil.which", lambda tool: f"/usr/bin/{tool}")
+    with patch("awsdiagram.tiles.run_graphviz", side_effect=_fake_graphviz) as run:
+        yield run
+
+
+class TestRenderTiles:
+    def test_layout_once_then_one_process_per_tile(self, graphviz, tmp_path):
+        viewer = render_tiles(_diagram(), tmp_path / "out", 2)
+
+        assert viewer == str(tmp_path / "out" / "index.html")
+        tools = [c.args[0][0] for c in graphviz.call_args_list]
+        assert tools == ["dot", "neato", "neato", "neato", "neato"]
+        # Every tile draws from the same positioned graph.
+        assert all(c.args[1] == LAID_OUT for c in graphviz.call_args_list[1:])
+        assert sorted(p.name for p in (tmp_path / "out").glob("tile_*")) == [
+            "tile_0_0.png",
+            "tile_0_1.png",
+            "tile_1_0.png",
+            "tile_1_1.png",
+        ]
+
+    def test_viewports_cover_the_bounding_box(self, graphviz, tmp_path):
+        render_tiles(_diagram(), tmp_path, 2)
+        viewports = {
+            c.args[0][c.args[0].index("-o") + 1].rsplit("/", 1)[1]: next(
+                a for a in c.args[0] if a.startswith("-Gviewport=")
+            )
+            for c in graphviz.call_args_list[1:]
+        }
+        # Row 0 is the top of the drawing, where Graphviz y is largest.
+        assert viewports["tile_0_0.png"] == "-Gviewport=200.00,100.00,1,100.00,150.00"
+        assert viewports["tile_1_1.png"] == "-Gviewport=200.00,100.00,1,300.00,50.00"
+
+    def test_manifest_and_viewer(self, graphviz, tmp_path):
+        render_tiles(_diagram(), tmp_path, 2, dpi=72)
+        manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+        assert (manifest["rows"], manifest["columns"]) == (2, 2)
+        assert (manifest["tile_width"], manifest["tile_height"]) == (200, 100)
+        assert (manifest["width"], manifest["height"]) == (400, 200)
+        assert [t["file"] for t in manifest["tiles"]][:2] == ["tile_0_0.png", "tile_0_1.png"]
+        html = (tmp_path / "index.html").read_text()
+        assert html.count("<img ") == 4
+        assert "<title>Estate</title>" in html
+
+    def test_requires_neato(self, monkeypatch, tmp_path):
+        monkeypatch.setattr("awsdiagram.tiles.check_graphviz", lambda: None)
+        monkeypatch.setattr("awsdiagram.tiles.shutil.which", lambda tool: None)
+        with pytest.raises(GraphvizNotFoundError, match="neato"):
+            render_tiles(_diagram(), tmp_path, 2)
+
+
+class TestBoundingBox:
+    def test_reads_root_graph_bb(self):
+        assert bounding_box('digraph { graph [bb="0,0,1.5e3,20"]; subgraph c { graph [bb="1,1,2,2"]; } }') == (
+            0.0,
+            0.0,
+            1500.0,
+            20.0,
+        )
+
+    def test_missing(self):
+        with pytest.raises(RenderError, match="bounding box"):
+            bounding_box("digraph {}")
+
+    def test_empty(self):
+        with pytest.raises(RenderError, match="empty"):
+            bounding_box('digraph { graph [bb="0,0,0,0"]; }')
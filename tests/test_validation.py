@@ -0,0 +1,182 @@
+"""Tests for multi-file validation and its reports."""
+
+import json
+
+import pytest
+import yaml
+
+from awsdiagram.cache import ParseCache
+from awsdiagram.errors import YamlLoadError
+from awsdiagram.metrics import REGISTRY
+from awsdiagram.validation import expand_inputs, format_report, to_sarif, validate_files
+
+STAGE = "awsdiagram_stage_duration_seconds"
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.dump(data))
+    return path
+
+
+@pytest.fixture
+def repo(tmp_path, valid_yaml_dict):
+    _write(tmp_path / "good.yaml", valid_yaml_dict)
+    _write(
+        tmp_path / "sub" / "refs.yml",
+        {
+            "diagram": {
+                "name": "Refs",
+                "services": {"web": {"type": "compute.EC2", "label": "Web"}},
+                "groups": [{"name": "G", "services": ["ghost"]}],
+                "connections": [{"from": "web", "to": ["phantom", "web"]}],
+            }
+        },
+    )
+    _write(
+        tmp_path / "sub" / "schema.yaml",
+        {
+            "diagram": {
+                "name": "Schema",
+                "services": {
+                    "a": {"type": "bad type", "label": "A"},
+                    "b": {"type": "compute.EC2"},
+                },
+            }
+        },
+    )
+    (tmp_path / "notes.txt").write_text("not yaml")
+    return tmp_path
+
+
+def _by_file(results):
+    return {r.file.rsplit("/", 1)[-1]: r for r in results}
+
+
+class TestExpandInputs:
+    def test_directory_is_searched_recursively(self, repo):
+        names = [p.name for p in expand_inputs([str(repo)])]
+        assert names == ["good.yaml", "refs.yml", "schema.yaml"]
+
+    def test_glob_and_explicit_files_are_deduplicated(self, repo):
+        files = expand_inputs([str(repo / "**" / "*.yaml"), str(repo / "good.yaml")])
+        assert [p.name for p in files] == ["good.yaml", "schema.yaml"]
+
+    def test_directory_without_yaml(self, tmp_path):
+        (tmp_path / "notes.txt").write_text("x")
+        with pytest.raises(YamlLoadError, match="No YAML files under"):
+            expand_inputs([str(tmp_path)])
+
+    def test_unmatched_pattern(self, tmp_path):
+        with pytest.raises(YamlLoadError, match="No files match"):
+            expand_inputs([str(tmp_path / "*.yaml")])
+
+
+class TestValidateFiles:
+    def test_collects_every_reference_error(self, repo):
+        results = _by_file(validate_files(expand_inputs([str(repo)]), jobs=1))
+        assert results["good.yaml"].issues == []
+        messages = [i.message for i in results["refs.yml"].issues]
+        assert len(messages) == 2
+        assert any("ghost" in m for m in messages)
+        assert any("phantom" in m for m in messages)
+
+    def test_collects_every_schema_error(self, repo):
+        results = _by_file(validate_files(expand_inputs([str(repo)]), jobs=1))
+        issues = results["schema.yaml"].issues
+        assert {i.location for i in issues} == {
+            "diagram.services.a.type",
+            "diagram.services.b.label",
+        }
+        assert all(i.rule == "SchemaValidationError" for i in issues)
+
+    def test_multi_document_errors_name_the_document(self, tmp_path, valid_yaml_dict):
+        p = tmp_path / "multi.yaml"
+        bad = {"diagram": {"name": "Bad"}}
+        p.write_text(yaml.dump_all([valid_yaml_dict, bad, bad]))
+        [result] = validate_files([p])
+        locations = [i.location for i in result.issues]
+        assert locations == ["document 2.diagram.services", "document 3.diagram.services"]
+
+    def test_unknown_types_are_reported_per_service(self, tmp_path):
+        p = _write(
+            tmp_path / "types.yaml",
+            {
+                "diagram": {
+                    "name": "Types",
+                    "services": {
+                        "a": {"type": "compute.Nope", "label": "A"},
+                        "b": {"type": "compute.Nope", "label": "B"},
+                    },
+                }
+            },
+        )
+        [result] = validate_files([p])
+        assert [i.location for i in result.issues] == ["services.a.type", "services.b.type"]
+        assert all(i.rule == "TypeResolutionError" for i in result.issues)
+
+    def test_fragments_are_validated_as_fragments(self, tmp_path):
+        p = _write(
+            tmp_path / "shared.yaml",
+            {"services": {"logs": {"type": "management.Cloudwatch", "label": "Logs"}}},
+        )
+        [result] = validate_files([p])
+        assert result.issues == []
+
+    def test_fragment_types_are_resolved(self, tmp_path):
+        p = _write(
+            tmp_path / "shared.yaml",
+            {"services": {"logs": {"type": "management.Nope", "label": "Logs"}}},
+        )
+        [result] = validate_files([p])
+        assert [(i.rule, i.location) for i in result.issues] == [("TypeResolutionError", "services.logs.type")]
+
+    def test_process_pool_matches_serial(self, repo, tmp_path):
+        files = expand_inputs([str(repo)])
+        cache = ParseCache(tmp_path / "cache")
+        serial = validate_files(files, cache, jobs=1)
+        parallel = validate_files(files, cache, jobs=2)
+        assert parallel == serial
+        assert list((tmp_path / "cache" / "parse").iterdir())
+
+
+    def test_worker_metrics_reach_the_parent(self, repo):
+        files = expand_inputs([str(repo)])
+        assert len(files) > 2
+        REGISTRY.reset()
+        try:
+            validate_files(files, jobs=1)
+            serial = REGISTRY.histogram_count(STAGE, stage="parse")
+            REGISTRY.reset()
+            validate_files(files, jobs=3)
+            assert REGISTRY.histogram_count(STAGE, stage="parse") == serial > 0
+        finally:
+            REGISTRY.reset()
+
+
+class TestReports:
+    def test_json(self, repo):
+        results = validate_files(expand_inputs([str(repo)]), jobs=1)
+        report = json.loads(format_report(results, "json"))
+        assert report["files"] == 3
+        assert report["invalid"] == 2
+        assert len(report["issues"]) == 4
+
+    def test_sarif(self, repo):
+        results = validate_files(expand_inputs([str(repo)]), jobs=1)
+        sarif = to_sarif(results)
+        assert sarif["version"] == "2.1.0"
+        run = sarif["runs"][0]
+        rules = [r["id"] for r in run["tool"]["driver"]["rules"]]
+        assert rules == ["SchemaValidationError", "ServiceReferenceError"]
+        result = run["results"][0]
+        assert result["level"] == "error"
+        assert rules[result["ruleIndex"]] == result["ruleId"]
+        uri = result["locations"][0]["physicalLocation"]["artifactLocation"]["uri"]
+        assert uri.endswith("sub/refs.yml")
+
+    def test_text(self, repo):
+        results = validate_files(expand_inputs([str(repo)]), jobs=1)
+        text = format_report(results, "text")
+        assert f"Valid: {repo / 'good.yaml'}" in text
+        assert "ghost" in text
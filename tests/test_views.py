@@ -0,0 +1,139 @@
+"""Tests for derived diagram views."""
+
+import pytest
+
+from awsdiagram.errors import ServiceReferenceError
+from awsdiagram.models import ConnectionDef, DiagramDef, GroupDef, ServiceDef
+from awsdiagram.views import (
+    build_adjacency,
+    collapse_view,
+    components,
+    focus_view,
+    neighborhood,
+)
+
+
+@pytest.fixture
+def chain():
+    """a -> b -> c -> d, with e unconnected; b and c share a nested group."""
+    services = {
+        sid: ServiceDef(type="compute.EC2", label=sid.upper()) for sid in "abcde"
+    }
+    return DiagramDef(
+        name="Chain",
+        services=services,
+        groups=[
+            GroupDef(
+                name="Outer",
+                services=["a"],
+                children=[GroupDef(name="Inner", services=["b", "c"])],
+            ),
+            GroupDef(name="Other", services=["d", "e"]),
+        ],
+        connections=[
+            ConnectionDef(from_="a", to="b"),
+            ConnectionDef(from_="b", to=["c", "e"], label="fan"),
+            ConnectionDef(from_="c", to="d"),
+        ],
+    )
+
+
+class TestAdjacency:
+    def test_is_undirected(self, chain):
+        adjacency = build_adjacency(chain)
+        assert adjacency["b"] == {"a", "c", "e"}
+        assert adjacency["d"] == {"c"}
+
+
+class TestNeighborhood:
+    def test_radius_zero_is_focus_only(self, chain):
+        assert neighborhood(chain, ["c"], 0) == {"c"}
+
+    def test_radius_one(self, chain):
+        assert neighborhood(chain, ["c"], 1) == {"b", "c", "d"}
+
+    def test_radius_two(self, chain):
+        assert neighborhood(chain, ["c"], 2) == {"a", "b", "c", "d", "e"}
+
+    def test_multiple_focus_services(self, chain):
+        assert neighborhood(chain, ["a", "d"], 0) == {"a", "d"}
+
+    def test_unknown_focus(self, chain):
+        with pytest.raises(ServiceReferenceError, match="ghost"):
+            neighborhood(chain, ["ghost"], 1)
+
+
+class TestFocusView:
+    def test_keeps_only_needed_groups(self, chain):
+        view = focus_view(chain, ["a"], 1)
+        assert set(view.services) == {"a", "b"}
+        assert len(view.groups) == 1
+        outer = view.groups[0]
+        assert outer.services == ["a"]
+        assert outer.children[0].services == ["b"]
+
+    def test_filters_connection_targets(self, chain):
+        view = focus_view(chain, ["e"], 1)
+        assert set(view.services) == {"b", "e"}
+        assert len(view.connections) == 1
+        assert view.connections[0].to == ["e"]
+        assert view.connections[0].label == "fan"
+
+    def test_drops_empty_groups(self, chain):
+        view = focus_view(chain, ["d"], 0)
+        assert [g.name for g in view.groups] == ["Other"]
+        assert view.groups[0].services == ["d"]
+        assert view.connections == []
+
+
+class TestCollapseView:
+    def test_depth_one_collapses_nested_groups(self, chain):
+        view = collapse_view(chain, 1)
+        outer = view.groups[0]
+        assert outer.children == []
+        assert outer.services == ["a", "group_0_0"]
+        assert "b" not in view.services and "c" not in view.services
+        summary = view.services["group_0_0"]
+        assert summary.type == "compute.EC2"
+        assert summary.label == "Inner\n2 services\n2x EC2"
+
+    def test_rewires_and_dedupes_connections(self, chain):
+        view = collapse_view(chain, 1)
+        pairs = [(c.from_, c.to) for c in view.connections]
+        assert pairs == [("a", "group_0_0"), ("group_0_0", "e"), ("group_0_0", "d")]
+
+    def test_depth_zero_collapses_everything(self, chain):
+        view = collapse_view(chain, 0)
+        assert view.groups == []
+        assert set(view.services) == {"group_0", "group_1"}
+        pairs = [(c.from_, c.to) for c in view.connections]
+        assert pairs == [("group_0", "group_1")]
+        assert view.connections[0].label is None
+
+    def test_deep_enough_is_unchanged(self, chain):
+        view = collapse_view(chain, 5)
+        assert view.services == chain.services
+        assert view.groups == chain.groups
+
+    def test_summary_id_avoids_existing_services(self, chain):
+        services = dict(chain.services)
+        services["group_0"] = ServiceDef(type="database.RDS", label="Clash")
+        diagram = chain.model_copy(update={"services": services})
+        view = collapse_view(diagram, 0)
+        assert "_group_0" in view.services
+        assert view.services["group_0"].label == "Clash"
+
+
+class TestComponents:
+    def test_connected_and_grouped_services_share_a_component(self, chain):
+        assert components(chain) == [["a", "b", "c", "d", "e"]]
+
+    def test_disconnected_islands(self):
+        services = {sid: ServiceDef(type="compute.EC2", label=sid) for sid in "abcd"}
+        diagram = DiagramDef(
+            name="Islands",
+            services=services,
+            groups=[GroupDef(name="G", services=["a", "c"])],
+            connections=[ConnectionDef(from_="b", to="d")],
+        )
+        assert components(diagram) == [["a", "c"], ["b", "d"]]